@@ -0,0 +1,143 @@
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import List, Dict, Callable, Optional
+from dependency_graph import DependencyGraph
+from graph_generator import SHAPES, write_repository, node_name
+
+
+# Этапы, для которых измеряются время и пиковая память
+STAGES = ('build_graph', 'reverse_dependencies', 'to_dot', 'print_graph')
+
+# Допустимое ухудшение относительно базовых значений и порог шума по времени (сек)
+DEFAULT_TOLERANCE = 0.25
+MIN_SECONDS = 0.05
+
+Results = Dict[str, Dict[str, Dict[str, float]]]
+
+
+def measure(stage: Callable[[], object]) -> Dict[str, float]:
+    """Время выполнения и пиковая память (tracemalloc) одного этапа; вывод этапа подавляется"""
+
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        stage()
+        seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] - base
+    return {'seconds': round(seconds, 4), 'peak_mb': round(max(peak, 0) / (1024 * 1024), 2)}
+
+
+def benchmark_repository(repo_path: str, nodes: int, compact: bool = False) -> Dict[str, Dict[str, float]]:
+    """Замер этапов конвейера на одном тестовом репозитории (корень N0)"""
+
+    root = node_name(0)
+    target = node_name(nodes - 1)
+    graph = DependencyGraph(repo_path, test_mode=True, compact=compact)
+
+    results = {}
+    tracemalloc.start()
+    try:
+        results['build_graph'] = measure(lambda: graph.build_graph(root))
+        results['reverse_dependencies'] = measure(lambda: graph.get_reverse_dependencies(target))
+        results['to_dot'] = measure(graph.to_dot)
+        with open(os.devnull, 'w', encoding='utf-8') as devnull:
+            results['print_graph'] = measure(lambda: graph.print_graph(root, None, devnull))
+    finally:
+        tracemalloc.stop()
+    return results
+
+
+def run_benchmarks(shapes: List[str], sizes: List[int], degree: int = 3, seed: int = 0,
+                   compact: bool = False, workdir: Optional[str] = None) -> Results:
+    """Генерация репозиториев и замер всех этапов: {"форма-узлы": {этап: {seconds, peak_mb}}}"""
+
+    results: Results = {}
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        for shape in shapes:
+            for nodes in sizes:
+                case = f"{shape}-{nodes}"
+                path = os.path.join(tmp, f"{case}.txt")
+                write_repository(path, shape, nodes, degree, seed)
+                print(f"Замер {case}...", file=sys.stderr)
+                results[case] = benchmark_repository(path, nodes, compact)
+    return results
+
+
+def compare(results: Results, baseline: Results, tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """Ухудшения относительно базовых значений (время - с учетом порога шума)"""
+
+    regressions = []
+    for case, stages in results.items():
+        for stage, values in stages.items():
+            reference = baseline.get(case, {}).get(stage)
+            if reference is None:
+                continue
+            seconds, base_seconds = values['seconds'], reference['seconds']
+            if seconds > base_seconds * (1 + tolerance) and seconds - base_seconds > MIN_SECONDS:
+                regressions.append(f"{case} {stage}: время {base_seconds:.3f} -> {seconds:.3f} с")
+            memory, base_memory = values['peak_mb'], reference['peak_mb']
+            if memory > base_memory * (1 + tolerance) and memory - base_memory > 1:
+                regressions.append(f"{case} {stage}: память {base_memory:.1f} -> {memory:.1f} МБ")
+    return regressions
+
+
+def print_results(results: Results) -> None:
+    print(f"{'случай':<20} {'этап':<22} {'время, с':>10} {'пик, МБ':>10}")
+    print("-" * 65)
+    for case, stages in results.items():
+        for stage in STAGES:
+            values = stages[stage]
+            print(f"{case:<20} {stage:<22} {values['seconds']:>10.3f} {values['peak_mb']:>10.1f}")
+    print("-" * 65)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Замер производительности построения и вывода графа зависимостей')
+    parser.add_argument('--shape', choices=SHAPES, action='append', default=None,
+                        help='Форма графа (можно повторять; по умолчанию - все)')
+    parser.add_argument('--nodes', '-n', type=int, action='append', default=None,
+                        help='Размер графа (можно повторять; по умолчанию: 1000 и 10000)')
+    parser.add_argument('--degree', type=int, default=3, help='Зависимостей на узел (по умолчанию: 3)')
+    parser.add_argument('--seed', type=int, default=0, help='Начальное значение генератора случайных чисел')
+    parser.add_argument('--compact', action='store_true', help='Компактное представление графа')
+    parser.add_argument('--baseline', '-b', default=None, help='Файл базовых значений (JSON) для сравнения')
+    parser.add_argument('--save-baseline', action='store_true', help='Сохранить результаты в файл --baseline')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help=f'Допустимое ухудшение, доля (по умолчанию: {DEFAULT_TOLERANCE})')
+    args = parser.parse_args()
+
+    if args.save_baseline and not args.baseline:
+        print("Ошибка: --save-baseline требует указания --baseline")
+        sys.exit(1)
+
+    results = run_benchmarks(args.shape or list(SHAPES), args.nodes or [1000, 10000],
+                             args.degree, args.seed, args.compact)
+    print_results(results)
+
+    if args.baseline and args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"Базовые значения сохранены в {args.baseline}")
+        return
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("Ухудшения относительно базовых значений:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("Ухудшений относительно базовых значений нет.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,49 @@
 import sys
 import os
+import contextlib
+import cProfile
 from config import parse_arguments, print_config
-from maven_repository import MavenRepository
-from test_repository import TestRepository
-from dependency_graph import DependencyGraph
-from visualizer import GraphvizExporter
+from dependency_graph import DependencyGraph, split_gav
+from graph_output import edge_label
+from pom_cache import PomCache
+from http_pool import HttpConnectionPool
+from metrics import registry
 
 
-def get_dependencies(config):
-    """Получение зависимостей пакета в соответствии с режимом работы приложения"""
+def create_cache(config):
+    """Создание постоянного кэша POM-файлов, если указан каталог"""
+    
+    if config.is_test_mode() or not config.cache_dir:
+        return None
+    return PomCache(config.cache_dir, config.cache_size * 1024 * 1024, config.offline)
+
+
+def create_pool(config):
+    """Создание пула keep-alive соединений к репозиторию"""
     
     if config.is_test_mode():
-        # Работа с тестовым репозиторием
-        test_repo = TestRepository(config.repo_url)
-        dependencies = test_repo.get_dependencies(config.package_name, config.version)
-    else:
-        # Работа с реальным Maven-репозиторием
-        maven_repo = MavenRepository(config.repo_url)
-        dependencies = maven_repo.get_dependencies(config.package_name, config.version)
+        return None
+    return HttpConnectionPool(config.pool_size, config.timeout, config.retries, config.rate)
+
+
+def create_graph(config, cache=None, pool=None):
+    """Создание графа - единой сессии разрешения зависимостей для всех корней"""
+    
+    graph = DependencyGraph(config.repositories, config.test_mode, config.jobs, cache, pool, config.compact,
+                            config.scopes)
+    if config.snapshot:
+        loaded = graph.load_snapshot(config.snapshot)
+        if loaded:
+            print(f"\nЗагружен снимок графа {config.snapshot}: {loaded} узлов")
+    return graph
+
+
+def get_dependencies(graph, package_name, version=None):
+    """Получение прямых зависимостей пакета через сессию графа
+
+       Результат запоминается, поэтому при построении графа POM корня повторно не загружается."""
     
-    return dependencies
+    return graph.get_direct_dependencies(package_name, version)
 
 
 def print_dependencies(package_name: str, dependencies: list) -> None:
@@ -32,63 +56,285 @@ def print_dependencies(package_name: str, dependencies: list) -> None:
         print("Зависимости не найдены")
         return
     
-    for i, (group_id, artifact_id, version) in enumerate(dependencies, 1):
-        full_name = f"{group_id}:{artifact_id}"
-        print(f"{i:2d}. {full_name:<40} {version}")
+    for i, dependency in enumerate(dependencies, 1):
+        full_name = f"{dependency.group}:{dependency.artifact}"
+        attributes = (dependency.scope, dependency.optional)
+        label = edge_label(attributes) if attributes != ('compile', False) else ""
+        print(f"{i:2d}. {full_name:<40} {dependency.version}{label}")
     
     print("-" * 50)
     print(f"Всего зависимостей: {len(dependencies)}")
 
 
-def build_dependency_graph(config):
-    """Построение полного графа зависимостей"""
+def build_dependency_graph(config, graph):
+    """Построение полного (объединённого) графа зависимостей"""
     
     print(f"\nПостроение полного графа зависимостей...")
     print(f"Максимальная глубина: {config.max_depth if config.max_depth else 'неограничена'}")
+    if config.jobs > 1:
+        print(f"Параллельная загрузка: {config.jobs} потоков")
     
-    graph = DependencyGraph(config.repo_url, config.test_mode)
-    graph.build_graph(config.package_name, config.version, config.max_depth)
+    graph.build_graphs(config.get_roots(), config.max_depth)
+    graph.print_memory_usage()
+    
+    if config.snapshot:
+        graph.print_refresh_summary()
+        saved = graph.save_snapshot(config.snapshot)
+        print(f"Снимок графа сохранён в {config.snapshot}: {saved} узлов")
     
     return graph
 
 
+def query_reverse_batch(config, graph, data_out):
+    """Обратные зависимости для всех целей из --reverse-file за один проход"""
+    
+    print(f"\nОбратные зависимости для {len(config.reverse_targets)} пакетов из {config.reverse_file}...")
+    if config.reverse_output:
+        with open(config.reverse_output, 'w', encoding='utf-8') as out:
+            found, lines = graph.write_reverse_dependencies(config.reverse_targets, out, config.max_depth)
+        print(f"Результаты сохранены в {config.reverse_output}")
+    else:
+        found, lines = graph.write_reverse_dependencies(config.reverse_targets, data_out, config.max_depth)
+    print(f"Найдено в графе: {found} из {len(config.reverse_targets)}, строк результата: {lines}")
+
+
+def find_dependency(config, graph):
+    """Поиск зависимости с ранней остановкой обхода (без построения полного графа)"""
+    
+    target_package, target_version = split_gav(config.find_package)
+    print(f"\nПоиск зависимости {config.find_package}...")
+    
+    for package_name, version in config.get_roots():
+        found = graph.contains(package_name, target_package, target_version, version, config.max_depth)
+        if found is None:
+            print(f"{package_name}: зависимость {config.find_package} не найдена")
+            continue
+        node_id, parent, depth = found
+        via = f" (через {parent})" if parent else ""
+        print(f"{package_name}: найдена {node_id} на глубине {depth}{via}")
+    
+    print(f"Загружено POM-файлов: {graph.fetches}")
+
+
+def find_paths(config, graph):
+    """Кратчайшие цепочки зависимостей от каждого корня до --path-to"""
+    
+    target_package, target_version = split_gav(config.path_to)
+    print(f"\nПоиск цепочек зависимостей до {config.path_to}...")
+    
+    for package_name, version in config.get_roots():
+        paths = graph.find_paths(package_name, target_package, target_version, version,
+                                 config.paths, config.max_depth)
+        graph.print_paths(package_name, config.path_to, paths)
+    
+    print(f"Загружено POM-файлов: {graph.fetches}")
+
+
+def print_cache_summary(cache: PomCache) -> None:
+    """Вывод статистики постоянного кэша"""
+    
+    print("\nСтатистика кэша:")
+    print("-" * 30)
+    for key, value in cache.summary().items():
+        print(f"{key}: {value}")
+    print("-" * 30)
+
+
+def print_pool_summary(pool: HttpConnectionPool) -> None:
+    """Вывод статистики пула HTTP-соединений"""
+    
+    print("\nСтатистика HTTP-соединений:")
+    print("-" * 30)
+    for key, value in pool.summary().items():
+        print(f"{key}: {value}")
+    print("-" * 30)
+
+
+def report_stats(config, graph, cache, pool):
+    """Метрики выполнения: сводка в выводе или JSON-файл (--stats)"""
+    
+    if config.stats is None:
+        return
+    
+    if config.stats != '-':
+        extra = {'graph': {'nodes': len(graph.graph), 'fetches': graph.fetches, 'memo_hits': graph.memo_hits}}
+        if cache is not None:
+            extra['cache'] = cache.summary()
+        if pool is not None:
+            extra['pool'] = pool.summary()
+        registry.write_json(config.stats, extra)
+        print(f"\nМетрики выполнения сохранены в {config.stats}")
+        return
+    
+    print("\nМетрики выполнения:")
+    for line in registry.summary_lines():
+        print(line)
+
+
 def main():
     """Парсинг аргументов, валидиция конфигурации и вывод построение графа зависимостей"""
     
-    try:
-        config = parse_arguments()
-        
-        print_config(config)
-        
-        # Получение зависимостей
-        print(f"\nПолучение зависимостей для пакета {config.package_name}...")
-        dependencies = get_dependencies(config)
+    config = parse_arguments()
+    
+    if config.output_format == 'tree':
+        messages = contextlib.nullcontext()
+    else:
+        # Машиночитаемый вывод: в stdout - только данные, сообщения - в stderr
+        messages = contextlib.redirect_stdout(sys.stderr)
+    
+    data_out = sys.stdout
+    with messages:
+        profiler = cProfile.Profile() if config.profile else None
+        try:
+            target = run_daemon if config.is_daemon_mode() else run
+            if profiler is not None:
+                profiler.runcall(target, config, data_out)
+            else:
+                target(config, data_out)
+        except KeyboardInterrupt:
+            # Ctrl+C (например, во время построения графов демона) - без трассировки
+            print("\nПрервано пользователем")
+            sys.exit(130)
+        except Exception as e:
+            print(f"Критическая ошибка: {e}")
+            sys.exit(1)
+        finally:
+            if profiler is not None:
+                profiler.dump_stats(config.profile)
+                print(f"Профиль выполнения сохранён в {config.profile}")
+
+
+def run(config, data_out):
+    """Построение графа и вывод результатов; граф и обратные зависимости пишутся в data_out"""
+    
+    print_config(config)
+    
+    cache = create_cache(config)
+    pool = create_pool(config)
+    graph = create_graph(config, cache, pool)
+    
+    # Получение прямых зависимостей каждого корня
+    for package_name, version in config.get_roots():
+        print(f"\nПолучение зависимостей для пакета {package_name}...")
+        try:
+            dependencies = get_dependencies(graph, package_name, version)
+        except Exception as e:
+            if not config.is_batch_mode():
+                raise
+            # В пакетном режиме ошибка одного корня не останавливает остальные
+            print(f"Ошибка: {e}")
+            continue
         
         # Вывод прямых зависимостей
-        print_dependencies(config.package_name, dependencies)
-        
-        print("\nЗависимости успешно получены.")
-        
-        # Построение полного графа зависимостей
-        graph = build_dependency_graph(config)
-        
-        # Визуализация, если выбран флаг
-        if getattr(config, "generate_graph", False):
-            graph.render_graph(config.output_file)
-        
-        # Вывод полного графа
-        graph.print_graph(config.package_name, config.version)
-        
-        # Если указан режим обратных зависимостей — выводим
-        if getattr(config, "reverse_package", None):
-            graph.print_reverse_dependencies(config.reverse_package, config.version, config.max_depth)
-        
-        print("\nГраф зависимостей успешно построен.")
-        
-    except Exception as e:
-        print(f"Критическая ошибка: {e}")
-        sys.exit(1)
+        print_dependencies(package_name, dependencies)
+    
+    print("\nЗависимости успешно получены.")
+    
+    # Поиск зависимости и цепочек до нее: полный граф без необходимости не строится
+    if config.find_package or config.path_to:
+        if config.find_package:
+            find_dependency(config, graph)
+        if config.path_to:
+            find_paths(config, graph)
+        graph.print_failures()
+        report_stats(config, graph, cache, pool)
+        print_summaries(cache, pool)
+        return
+    
+    # Построение полного графа зависимостей
+    build_dependency_graph(config, graph)
+    
+    # Визуализация, если выбран флаг
+    if getattr(config, "generate_graph", False):
+        if config.dot_only:
+            graph.save_dot(config.output_file, config.reductions, config.top_k)
+        else:
+            graph.render_graph(config.output_file, config.reductions, config.top_k)
+    
+    # Вывод полного графа (для каждого корня - своё дерево, в json/ndjson - весь граф)
+    if config.output_format == 'tree':
+        for package_name, version in config.get_roots():
+            graph.print_graph(package_name, version, data_out)
+    else:
+        graph.write_graph(config.output_format, data_out)
+    
+    # Циклические зависимости объединённого графа
+    graph.print_cycles()
+    
+    # Узлы, не раскрытые из-за ошибок (поддеревья отсутствуют)
+    graph.print_failures()
+    
+    if config.is_batch_mode():
+        graph.print_batch_summary()
+    
+    # Если указан режим обратных зависимостей — выводим
+    if getattr(config, "reverse_package", None):
+        graph.print_reverse_dependencies(config.reverse_package, config.version, config.max_depth,
+                                         config.output_format, data_out)
+    
+    # Пакетный запрос обратных зависимостей по списку целей
+    if config.reverse_targets:
+        query_reverse_batch(config, graph, data_out)
+    
+    # Выгрузка графа для векторизованной аналитики
+    if config.export_csr:
+        nodes, edges = graph.export_csr(config.export_csr)
+        print(f"\nГраф выгружен в {config.export_csr} (CSR): {nodes} узлов, {edges} рёбер")
+    
+    report_stats(config, graph, cache, pool)
+    print_summaries(cache, pool)
+    
+    print("\nГраф зависимостей успешно построен.")
+
+
+def run_daemon(config, data_out):
+    """Режим демона: одна сессия графа обслуживает запросы до Ctrl+C
+
+       Корни из --package / --packages-file строятся заранее. Модуль демона
+       (http.server, socketserver) импортируется только в этом режиме."""
+    
+    from resolver_daemon import ResolverDaemon, DaemonServer, handle_termination, signals_ignored
+    
+    # SIGTERM во время построения графов завершает работу так же, как Ctrl+C
+    handle_termination()
+    print_config(config)
+    
+    cache = create_cache(config)
+    pool = create_pool(config)
+    daemon = ResolverDaemon(lambda: create_graph(config, cache, pool), cache, pool)
+    
+    if config.packages:
+        print(f"\nПостроение графов для {len(config.packages)} корней...")
+        daemon.warm_up(config.get_roots())
+        print(f"Граф построен: {len(daemon.graph.graph)} узлов")
+    
+    server = DaemonServer(daemon, config.daemon_port, config.daemon_socket)
+    try:
+        if server.url:
+            print(f"\nДемон принимает запросы: {server.url}")
+        if config.daemon_socket:
+            print(f"\nДемон принимает запросы: {config.daemon_socket}")
+        print("Остановка - Ctrl+C")
+        server.serve_forever()
+    finally:
+        with signals_ignored():
+            server.stop()
+            print(f"\nДемон остановлен. Запросов: {daemon.queries}, из готовых ответов: {daemon.cached}, "
+                  f"ошибок: {daemon.errors}")
+            report_stats(config, daemon.graph, cache, pool)
+            print_summaries(cache, pool)
+
+
+def print_summaries(cache, pool):
+    """Статистика кэша и HTTP-соединений в конце запуска"""
+    
+    if cache is not None:
+        print_cache_summary(cache)
+    
+    if pool is not None:
+        print_pool_summary(pool)
+        pool.close()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
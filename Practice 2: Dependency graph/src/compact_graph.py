@@ -0,0 +1,254 @@
+import sys
+from array import array
+from collections.abc import MutableMapping, MutableSet
+from typing import List, Tuple, Dict, Iterator, Iterable
+
+
+# Массив targets уплотняется, когда брошенные участки занимают больше половины
+# массива и не меньше этого числа элементов
+COMPACT_MIN_GARBAGE = 4096
+
+
+class CompactGraph:
+    """Компактное хранилище графа: интернированные узлы и рёбра в массивах
+
+       Каждый node_id получает целочисленный индекс. Рёбра хранятся в CSR-подобном
+       виде: общий массив targets и для каждого узла - начало и длина его участка
+       (рёбра узла записываются одним блоком при раскрытии; при повторной записи
+       блок занимает прежний участок, если помещается). Координаты узла
+       (group, artifact, version) - параллельные столбцы индексов в общем пуле строк.
+       Доступ в привычной форме Dict[str, List[str]] / Dict[str, Tuple] дают
+       представления graph и meta (узлы перебираются в порядке добавления, как
+       в словаре), множества узлов - node_set()."""
+
+    def __init__(self):
+        # Интернирование узлов: node_id <-> индекс
+        self._ids: List[str] = []
+        self._index: Dict[str, int] = {}
+
+        # Пул строк для столбцов метаданных
+        self._strings: List[str] = []
+        self._string_index: Dict[str, int] = {}
+
+        # Столбцы метаданных (-1 - метаданные узла не заданы)
+        self.group = array('i')
+        self.artifact = array('i')
+        self.version = array('i')
+
+        # Рёбра: участок targets[edge_start[i]:edge_start[i] + edge_count[i]] (-1 - узла нет в графе)
+        self.edge_start = array('i')
+        self.edge_count = array('i')
+        self.targets = array('i')
+        # Число элементов targets, не принадлежащих ни одному узлу (брошенные участки)
+        self._garbage = 0
+
+        # Порядок добавления узлов в graph и meta (порядок перебора представлений)
+        self._graph_order = array('i')
+        self._meta_order = array('i')
+
+        self.graph = GraphView(self)
+        self.meta = MetaView(self)
+
+    def intern(self, node_id: str) -> int:
+        """Индекс узла (новый узел добавляется без рёбер и метаданных)"""
+
+        idx = self._index.get(node_id)
+        if idx is None:
+            idx = len(self._ids)
+            self._ids.append(node_id)
+            self._index[node_id] = idx
+            for column in (self.group, self.artifact, self.version, self.edge_start, self.edge_count):
+                column.append(-1)
+        return idx
+
+    def node_id(self, idx: int) -> str:
+        return self._ids[idx]
+
+    def _intern_string(self, value: str) -> int:
+        idx = self._string_index.get(value)
+        if idx is None:
+            idx = len(self._strings)
+            self._strings.append(value)
+            self._string_index[value] = idx
+        return idx
+
+    def set_edges(self, idx: int, children: List[str]) -> None:
+        """Запись рёбер узла одним блоком
+
+           Новый блок пишется на место прежнего, если помещается в него или прежний
+           блок - последний в targets; иначе - в конец массива, а прежний участок
+           становится мусором. При повторных раскрытиях (обновление по снимку,
+           сброс демона) массив не растет без ограничений: мусор убирается compact()."""
+
+        block = array('i', [self.intern(child) for child in children])
+        count = self.edge_count[idx]
+        start = self.edge_start[idx]
+        if count < 0:
+            self._graph_order.append(idx)
+            start = len(self.targets)
+        elif len(block) <= count:
+            self._garbage += count - len(block)
+        elif start + count == len(self.targets):
+            del self.targets[start:]
+        else:
+            self._garbage += count
+            start = len(self.targets)
+        self.targets[start:start + len(block)] = block
+        self.edge_start[idx] = start
+        self.edge_count[idx] = len(block)
+
+        if self._garbage >= COMPACT_MIN_GARBAGE and 2 * self._garbage > len(self.targets):
+            self.compact()
+
+    def compact(self) -> None:
+        """Перезапись targets без брошенных участков (O(E), порядок узлов сохраняется)"""
+
+        targets = array('i')
+        for idx, count in enumerate(self.edge_count):
+            if count < 0:
+                continue
+            start = self.edge_start[idx]
+            self.edge_start[idx] = len(targets)
+            targets.extend(self.targets[start:start + count])
+        self.targets = targets
+        self._garbage = 0
+
+    def edges(self, idx: int) -> List[int]:
+        count = self.edge_count[idx]
+        if count <= 0:
+            return []
+        start = self.edge_start[idx]
+        return self.targets[start:start + count].tolist()
+
+    def set_meta(self, idx: int, coordinates: Tuple[str, str, str]) -> None:
+        if self.group[idx] < 0:
+            self._meta_order.append(idx)
+        group, artifact, version = coordinates
+        self.group[idx] = self._intern_string(group)
+        self.artifact[idx] = self._intern_string(artifact)
+        self.version[idx] = self._intern_string(version)
+
+    def get_meta(self, idx: int) -> Tuple[str, str, str]:
+        return self._strings[self.group[idx]], self._strings[self.artifact[idx]], self._strings[self.version[idx]]
+
+    def node_set(self) -> 'NodeSet':
+        """Пустое множество узлов графа (байт-флаг на узел вместо хэш-таблицы строк)"""
+
+        return NodeSet(self)
+
+    def memory_usage(self) -> int:
+        """Оценка занимаемой памяти в байтах (массивы, индексы и строки)"""
+
+        total = sum(column.buffer_info()[1] * column.itemsize
+                    for column in (self.group, self.artifact, self.version, self.edge_start,
+                                   self.edge_count, self.targets, self._graph_order, self._meta_order))
+        for container in (self._ids, self._index, self._strings, self._string_index):
+            total += sys.getsizeof(container)
+        total += sum(sys.getsizeof(s) for s in self._ids)
+        total += sum(sys.getsizeof(s) for s in self._strings)
+        return total
+
+
+class GraphView(MutableMapping):
+    """Представление рёбер CompactGraph в виде Dict[str, List[str]]
+
+       Возвращаемые списки - копии: рёбра узла задаются присваиванием целиком."""
+
+    def __init__(self, store: CompactGraph):
+        self._store = store
+
+    def __getitem__(self, node_id: str) -> List[str]:
+        idx = self._store._index.get(node_id)
+        if idx is None or self._store.edge_count[idx] < 0:
+            raise KeyError(node_id)
+        return [self._store.node_id(child) for child in self._store.edges(idx)]
+
+    def __setitem__(self, node_id: str, children: List[str]) -> None:
+        self._store.set_edges(self._store.intern(node_id), children)
+
+    def __delitem__(self, node_id: str) -> None:
+        raise TypeError("Удаление узлов из компактного графа не поддерживается")
+
+    def __contains__(self, node_id: object) -> bool:
+        idx = self._store._index.get(node_id)
+        return idx is not None and self._store.edge_count[idx] >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        for idx in self._store._graph_order:
+            yield self._store.node_id(idx)
+
+    def __len__(self) -> int:
+        return len(self._store._graph_order)
+
+
+class MetaView(MutableMapping):
+    """Представление столбцов метаданных CompactGraph в виде Dict[str, Tuple[str, str, str]]"""
+
+    def __init__(self, store: CompactGraph):
+        self._store = store
+
+    def __getitem__(self, node_id: str) -> Tuple[str, str, str]:
+        idx = self._store._index.get(node_id)
+        if idx is None or self._store.group[idx] < 0:
+            raise KeyError(node_id)
+        return self._store.get_meta(idx)
+
+    def __setitem__(self, node_id: str, coordinates: Tuple[str, str, str]) -> None:
+        self._store.set_meta(self._store.intern(node_id), coordinates)
+
+    def __delitem__(self, node_id: str) -> None:
+        raise TypeError("Удаление узлов из компактного графа не поддерживается")
+
+    def __contains__(self, node_id: object) -> bool:
+        idx = self._store._index.get(node_id)
+        return idx is not None and self._store.group[idx] >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        for idx in self._store._meta_order:
+            yield self._store.node_id(idx)
+
+    def __len__(self) -> int:
+        return len(self._store._meta_order)
+
+
+class NodeSet(MutableSet):
+    """Множество узлов CompactGraph: байт-флаг на интернированный индекс
+
+       Заменяет Set[str] (посещенные и раскрытые узлы), перебор - в порядке интернирования."""
+
+    def __init__(self, store: CompactGraph):
+        self._store = store
+        self._flags = bytearray()
+        self._size = 0
+
+    def __contains__(self, node_id: object) -> bool:
+        idx = self._store._index.get(node_id)
+        return idx is not None and idx < len(self._flags) and self._flags[idx] == 1
+
+    def add(self, node_id: str) -> None:
+        idx = self._store.intern(node_id)
+        if idx >= len(self._flags):
+            self._flags.extend(bytes(idx + 1 - len(self._flags)))
+        if not self._flags[idx]:
+            self._flags[idx] = 1
+            self._size += 1
+
+    def discard(self, node_id: str) -> None:
+        if node_id in self:
+            self._flags[self._store._index[node_id]] = 0
+            self._size -= 1
+
+    def update(self, node_ids: Iterable[str]) -> None:
+        for node_id in node_ids:
+            self.add(node_id)
+
+    def __iter__(self) -> Iterator[str]:
+        for idx, flag in enumerate(self._flags):
+            if flag:
+                yield self._store.node_id(idx)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def memory_usage(self) -> int:
+        return sys.getsizeof(self._flags)
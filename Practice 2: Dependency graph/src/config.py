@@ -1,40 +1,159 @@
 import argparse
+import os
 import sys
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
+from graph_output import OUTPUT_FORMATS
+from graph_reduction import REDUCTIONS
+from pom_parser import SCOPES
 
 
 class Config:
     """Класс для хранения и валидации конфигурации приложения"""
     
     def __init__(self):
-        self.package_name: Optional[str] = None         # имя пакета
-        self.repo_url: Optional[str] = None             # url
+        self.package_name: Optional[str] = None         # имя пакета (первого корня)
+        self.packages: List[str] = []                   # все корни пакетного режима (group:artifact[:version])
+        self.packages_file: Optional[str] = None        # файл со списком корней
+        self.repositories: List[str] = []               # url или пути (цепочка репозиториев в порядке приоритета)
         self.test_mode: bool = False                    # флаг тестового режима
         self.version: Optional[str] = None              # версия
         self.output_file: str = "dependency_graph.svg"  # итоговый файл с графом зависимостей (необходимо для будущего этапа)
         self.max_depth: Optional[int] = None            # максимальная глубина зависимостей
         self.reverse_package: Optional[str] = None      # обратные зависимости
+        self.reverse_file: Optional[str] = None         # файл со списком целей для пакетного запроса обратных зависимостей
+        self.reverse_targets: List[str] = []            # цели пакетного запроса (group:artifact[:version])
+        self.reverse_output: Optional[str] = None       # файл результатов пакетного запроса
+        self.find_package: Optional[str] = None         # поиск пакета без полного построения графа
+        self.path_to: Optional[str] = None              # пакет, до которого ищутся цепочки зависимостей
+        self.paths: int = 1                             # количество кратчайших цепочек
         self.generate_graph: bool = False               # визуализация графа
+        self.dot_only: bool = False                     # сохранить DOT-файл вместо SVG
+        self.reductions: List[str] = []                 # режимы упрощения графа перед визуализацией
+        self.top_k: Optional[int] = None                # оставить k узлов с наибольшим fan-in
+        self.jobs: int = 1                              # количество потоков для загрузки POM-файлов
+        self.cache_dir: Optional[str] = None            # каталог постоянного кэша POM-файлов
+        self.cache_size: int = 256                      # максимальный размер кэша (МБ)
+        self.offline: bool = False                      # работа только из кэша, без сети
+        self.pool_size: int = 4                         # максимум keep-alive соединений к одному хосту
+        self.timeout: float = 30.0                      # таймаут сетевых операций (сек)
+        self.retries: int = 3                           # повторы запроса после 429 / 5xx и сетевых ошибок
+        self.rate: Optional[float] = None               # ограничение частоты запросов к хосту (запросов/сек)
+        self.compact: bool = False                      # компактное (массивное) представление графа
+        self.snapshot: Optional[str] = None             # файл снимка графа для инкрементального обновления
+        self.output_format: str = 'tree'                # формат вывода графа и обратных зависимостей
+        self.stats: Optional[str] = None                # метрики выполнения: '-' - сводка, иначе JSON-файл
+        self.profile: Optional[str] = None              # файл статистики cProfile
+        self.export_csr: Optional[str] = None           # файл .npz для выгрузки графа в формате CSR
+        self.scopes: Optional[List[str]] = None         # учитываемые scope (None - все зависимости)
+        self.daemon_port: Optional[int] = None          # порт HTTP/JSON-демона на localhost
+        self.daemon_socket: Optional[str] = None        # Unix-сокет демона
     
     def validate(self) -> None:
         """Валидация параметров конфигурации"""
         
-        if not self.package_name:
+        if (not self.packages and not self.is_daemon_mode()) or not all(self.packages):
             raise ValueError("Имя пакета обязательно для указания")
         
-        if not self.repo_url:
+        if not self.repositories or not all(self.repositories):
             raise ValueError("URL репозитория или путь к файлу обязателен")
         
         if self.version and not self._is_valid_version(self.version):
             raise ValueError(f"Некорректный формат версии: {self.version}")
         
+        for _, root_version in self.get_roots():
+            if root_version and not self._is_valid_version(root_version):
+                raise ValueError(f"Некорректный формат версии: {root_version}")
+        
         if self.max_depth is not None:
             if not isinstance(self.max_depth, int) or self.max_depth < 1:
                 raise ValueError("Максимальная глубина должна быть положительным целым числом")
         
+        if not isinstance(self.jobs, int) or self.jobs < 1:
+            raise ValueError("Количество потоков должно быть положительным целым числом")
+        
+        if not isinstance(self.cache_size, int) or self.cache_size < 1:
+            raise ValueError("Размер кэша должен быть положительным целым числом (МБ)")
+        
+        if not isinstance(self.pool_size, int) or self.pool_size < 1:
+            raise ValueError("Размер пула соединений должен быть положительным целым числом")
+        
+        if not isinstance(self.timeout, (int, float)) or self.timeout <= 0:
+            raise ValueError("Таймаут должен быть положительным числом")
+        
+        if self.scopes is not None:
+            unknown = [scope for scope in self.scopes if scope not in SCOPES]
+            if not self.scopes or unknown:
+                raise ValueError(f"Некорректный scope: {', '.join(unknown) or '(пусто)'}. "
+                                 f"Допустимые значения: {', '.join(SCOPES)}")
+        
+        if not isinstance(self.retries, int) or self.retries < 0:
+            raise ValueError("Количество повторов должно быть неотрицательным целым числом")
+        
+        if self.rate is not None and (not isinstance(self.rate, (int, float)) or self.rate <= 0):
+            raise ValueError("Ограничение частоты запросов должно быть положительным числом")
+        
+        if self.offline and not self.cache_dir:
+            raise ValueError("Offline-режим требует указания каталога кэша (--cache-dir)")
+        
+        if self.test_mode and len(self.repositories) > 1:
+            raise ValueError("В тестовом режиме указывается один файл репозитория")
+        
+        if self.daemon_port is not None and (not isinstance(self.daemon_port, int) or not 0 <= self.daemon_port <= 65535):
+            raise ValueError("Порт демона должен быть целым числом от 0 до 65535")
+        
+        if self.offline and self.test_mode:
+            raise ValueError("Offline-режим не применим к тестовому репозиторию")
+        
+        if self.top_k is not None and (not isinstance(self.top_k, int) or self.top_k < 1):
+            raise ValueError("Параметр top-k должен быть положительным целым числом")
+        
+        if not isinstance(self.paths, int) or self.paths < 1:
+            raise ValueError("Количество цепочек должно быть положительным целым числом")
+        
+        if self.reverse_output and not self.reverse_file:
+            raise ValueError("Файл результатов обратных зависимостей требует указания --reverse-file")
+        
         if self.output_file and not self._is_valid_filename(self.output_file):
             raise ValueError(f"Некорректное имя файла: {self.output_file}")
     
+    def load_packages_file(self, file_path: str) -> List[str]:
+        """Чтение списка корней из файла (по одному group:artifact[:version] на строку)"""
+        
+        if not os.path.exists(file_path):
+            raise ValueError(f"Файл со списком пакетов не найден: {file_path}")
+        
+        packages = []
+        with open(file_path, 'r', encoding='utf-8') as file:
+            for line in file:
+                line = line.strip()
+                # Пропускаем пустые строки и комментарии
+                if line and not line.startswith('#'):
+                    packages.append(line)
+        return packages
+    
+    def get_roots(self) -> List[Tuple[str, Optional[str]]]:
+        """Корни для построения графа: пары (group:artifact, версия)
+           Версия берется из GAV, а если она не указана - из --version"""
+        
+        roots = []
+        for package in self.packages:
+            parts = package.split(':')
+            if len(parts) >= 3:
+                roots.append((f"{parts[0]}:{parts[1]}", ':'.join(parts[2:])))
+            else:
+                roots.append((package, self.version))
+        return roots
+    
+    def is_daemon_mode(self) -> bool:
+        """Проверка режима демона (запросы по Unix-сокету или HTTP вместо одного запуска)"""
+        
+        return self.daemon_port is not None or self.daemon_socket is not None
+    
+    def is_batch_mode(self) -> bool:
+        """Проверка пакетного режима (несколько корней в одной сессии)"""
+        
+        return len(self.packages) > 1
+    
     def _is_valid_version(self, version: str) -> bool:
         """Проверка корректности формата версии"""
         
@@ -60,14 +179,37 @@ class Config:
         """Получение конфигурации в виде словаря для вывода"""
         
         return {
-            'package_name': self.package_name,
-            'repo_url': self.repo_url,
+            'package_name': ', '.join(self.packages) if self.packages else self.package_name,
+            'repositories': ', '.join(self.repositories),
             'test_mode': self.test_mode,
             'version': self.version if self.version else 'latest',
             'generate_graph': self.generate_graph,
+            'dot_only': self.dot_only,
+            'reduce': ', '.join(self.reductions) if self.reductions else None,
+            'top_k': self.top_k,
             'output_file': f"{self.output_file}.svg",
             'max_depth': self.max_depth if self.max_depth else 'unlimited',
-            'reverse_package': self.reverse_package
+            'reverse_package': self.reverse_package,
+            'reverse_file': self.reverse_file,
+            'find_package': self.find_package,
+            'path_to': self.path_to,
+            'paths': self.paths,
+            'jobs': self.jobs,
+            'cache_dir': self.cache_dir,
+            'offline': self.offline,
+            'pool_size': self.pool_size,
+            'timeout': self.timeout,
+            'retries': self.retries,
+            'rate': self.rate if self.rate else 'unlimited',
+            'compact': self.compact,
+            'snapshot': self.snapshot,
+            'format': self.output_format,
+            'stats': self.stats,
+            'profile': self.profile,
+            'export_csr': self.export_csr,
+            'scopes': ','.join(self.scopes) if self.scopes else 'all',
+            'daemon_http': self.daemon_port,
+            'daemon_socket': self.daemon_socket
         }
     
     def is_test_mode(self) -> bool:
@@ -88,15 +230,25 @@ def parse_arguments() -> Config:
     parser.add_argument(
         '--package', '-p',
         type=str,
-        required=True,  # обязательный параметр
-        help='Имя анализируемого пакета (например: com.example:my-package)'
+        action='append',
+        default=None,
+        help='Имя анализируемого пакета (например: com.example:my-package); можно указать несколько раз'
+    )
+    
+    parser.add_argument(
+        '--packages-file', '-f',
+        type=str,
+        default=None,
+        help='Файл со списком анализируемых пакетов (по одному group:artifact[:version] на строку)'
     )
     
     parser.add_argument(
         '--repo', '-r',
         type=str,
+        action='append',
         required=True,  # обязательный параметр
-        help='URL репозитория Maven или путь к файлу тестового репозитория'
+        help='URL репозитория Maven, локальный каталог (~/.m2/repository, file://...) или путь к файлу '
+             'тестового репозитория; можно указать несколько раз - репозитории опрашиваются по порядку'
     )
     
     # Опциональные параметры
@@ -134,25 +286,240 @@ def parse_arguments() -> Config:
         help='Вывести обратные зависимости для указанного пакета (формат group:artifact или простой A)'
     )
     
+    parser.add_argument(
+        '--find', '-F',
+        type=str,
+        default=None,
+        help='Проверить, тянет ли пакет зависимость group:artifact[:version]; обход останавливается, как только она найдена'
+    )
+    
+    parser.add_argument(
+        '--path-to',
+        type=str,
+        default=None,
+        help='Вывести кратчайшую цепочку зависимостей от пакета до group:artifact[:version]'
+    )
+    
+    parser.add_argument(
+        '--paths',
+        type=int,
+        default=1,
+        help='Вместе с --path-to: количество кратчайших цепочек (по умолчанию: 1)'
+    )
+    
+    parser.add_argument(
+        '--reverse-file',
+        type=str,
+        default=None,
+        help='Файл со списком пакетов (group:artifact[:version]), для которых выводятся обратные зависимости'
+    )
+    
+    parser.add_argument(
+        '--reverse-output',
+        type=str,
+        default=None,
+        help='Файл для результатов --reverse-file (строки «цель<TAB>зависимый»; по умолчанию - стандартный вывод)'
+    )
+    
+    parser.add_argument(
+        '--format',
+        choices=OUTPUT_FORMATS,
+        default='tree',
+        help='Формат вывода графа и обратных зависимостей: tree (по умолчанию), json или ndjson (потоково, в stdout; сообщения - в stderr)'
+    )
+    
     parser.add_argument(
         '--graph', '-g',
         action='store_true',
         help='Сгенерировать граф зависимостей в формате SVG'
     )
+    
+    parser.add_argument(
+        '--dot',
+        action='store_true',
+        help='Вместе с --graph: сохранить DOT-описание графа (<output>.dot) вместо SVG'
+    )
+    
+    parser.add_argument(
+        '--reduce',
+        choices=REDUCTIONS,
+        action='append',
+        default=None,
+        help='Упрощение графа перед визуализацией (можно повторять): versions - без версий, '
+             'groups - узел на groupId, transitive - транзитивное сокращение'
+    )
+    
+    parser.add_argument(
+        '--top-k',
+        type=int,
+        default=None,
+        help='Визуализировать только корни и k пакетов с наибольшим числом зависящих от них'
+    )
+    
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=1,
+        help='Количество потоков для параллельной загрузки зависимостей одного уровня (по умолчанию: 1)'
+    )
+    
+    parser.add_argument(
+        '--cache-dir', '-c',
+        type=str,
+        default=None,
+        help='Каталог постоянного кэша POM-файлов и maven-metadata.xml'
+    )
+    
+    parser.add_argument(
+        '--cache-size',
+        type=int,
+        default=256,
+        help='Максимальный размер кэша в МБ (по умолчанию: 256)'
+    )
+    
+    parser.add_argument(
+        '--offline',
+        action='store_true',
+        help='Работа только из кэша, без сетевых запросов'
+    )
+    
+    parser.add_argument(
+        '--pool-size',
+        type=int,
+        default=4,
+        help='Максимальное число keep-alive соединений к одному хосту (по умолчанию: 4)'
+    )
+    
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        default=30.0,
+        help='Таймаут сетевых операций в секундах (по умолчанию: 30)'
+    )
+    
+    parser.add_argument(
+        '--retries',
+        type=int,
+        default=3,
+        help='Повторы запроса после ответов 429 / 5xx и сетевых ошибок, '
+             'с экспоненциальной паузой или паузой из Retry-After (по умолчанию: 3)'
+    )
+    
+    parser.add_argument(
+        '--rate',
+        type=float,
+        default=None,
+        help='Ограничение частоты запросов к одному хосту, запросов в секунду (по умолчанию: без ограничения)'
+    )
+    
+    parser.add_argument(
+        '--compact',
+        action='store_true',
+        help='Компактное представление графа (интернированные узлы, рёбра в массивах) для очень больших графов'
+    )
+    
+    parser.add_argument(
+        '--snapshot', '-s',
+        type=str,
+        default=None,
+        help='Файл снимка графа: загружается перед построением (обновляются только изменившиеся POM) и сохраняется после'
+    )
+    
+    parser.add_argument(
+        '--stats',
+        type=str,
+        nargs='?',
+        const='-',
+        default=None,
+        help='Метрики выполнения (запросы, байты, гистограммы задержек по фазам, узлов в секунду): '
+             'без значения - сводка в конце вывода, с именем файла - JSON'
+    )
+    
+    parser.add_argument(
+        '--profile',
+        type=str,
+        nargs='?',
+        const='dependency_graph.prof',
+        default=None,
+        help='Запустить под cProfile и сохранить статистику в файл (по умолчанию: dependency_graph.prof)'
+    )
+    
+    parser.add_argument(
+        '--scopes',
+        type=str,
+        default=None,
+        help='Учитываемые scope через запятую (например: compile,runtime). Зависимости других scope, '
+             'транзитивные test / provided / optional и исключения (exclusions) отсекаются до загрузки POM; '
+             'по умолчанию учитываются все зависимости'
+    )
+    
+    parser.add_argument(
+        '--export-csr',
+        type=str,
+        default=None,
+        help='Выгрузить построенный граф в формате CSR (.npz) для анализа: python src/graph_analytics.py ФАЙЛ'
+    )
+    
+    parser.add_argument(
+        '--daemon-http',
+        type=int,
+        default=None,
+        help='Запустить демон: запросы forward / reverse / path / render в HTTP/JSON на 127.0.0.1:ПОРТ; '
+             'граф, модели POM и соединения сохраняются между запросами (клиент: python src/resolver_daemon.py)'
+    )
+    
+    parser.add_argument(
+        '--daemon-socket',
+        type=str,
+        default=None,
+        help='Запустить демон на Unix-сокете (по JSON-запросу на строку); можно вместе с --daemon-http'
+    )
 
     
     try:
         args = parser.parse_args()
         
         config = Config()
-        config.package_name = args.package
-        config.repo_url = args.repo
+        config.packages = list(args.package or [])
+        config.packages_file = args.packages_file
+        if args.packages_file:
+            config.packages.extend(config.load_packages_file(args.packages_file))
+        config.package_name = config.packages[0] if config.packages else None
+        config.repositories = [spec.strip() for spec in args.repo]
         config.test_mode = args.test_mode
         config.version = args.version
         config.output_file = args.output
         config.max_depth = args.max_depth
         config.reverse_package = args.reverse
+        config.reverse_file = args.reverse_file
+        config.find_package = args.find
+        config.path_to = args.path_to
+        config.paths = args.paths
+        config.reverse_output = args.reverse_output
+        if args.reverse_file:
+            config.reverse_targets = config.load_packages_file(args.reverse_file)
         config.generate_graph = args.graph
+        config.dot_only = args.dot
+        config.reductions = list(args.reduce or [])
+        config.top_k = args.top_k
+        config.jobs = args.jobs
+        config.cache_dir = args.cache_dir
+        config.cache_size = args.cache_size
+        config.offline = args.offline
+        config.pool_size = args.pool_size
+        config.timeout = args.timeout
+        config.retries = args.retries
+        config.rate = args.rate
+        config.compact = args.compact
+        config.snapshot = args.snapshot
+        config.output_format = args.format
+        config.stats = args.stats
+        config.profile = args.profile
+        config.export_csr = args.export_csr
+        config.daemon_port = args.daemon_http
+        config.daemon_socket = args.daemon_socket
+        if args.scopes is not None:
+            config.scopes = [scope.strip() for scope in args.scopes.split(',') if scope.strip()]
         
         # Валидация конфигурации
         config.validate()
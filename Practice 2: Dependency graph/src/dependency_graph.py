@@ -1,10 +1,28 @@
-from typing import List, Tuple, Dict, Set, Optional
+from typing import List, Tuple, Dict, Set, Optional, TextIO, Iterator, Callable, FrozenSet, Iterable, Mapping, Sequence, Union
 from collections import deque
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+import threading
 import sys
+import time
+from collections.abc import MutableMapping, MutableSet
 import os
+import json
+import gzip
 from maven_repository import MavenRepository
+from repository_source import repository_list
 from test_repository import TestRepository
-import graphviz
+from pom_cache import PomCache
+from http_pool import HttpConnectionPool
+from compact_graph import CompactGraph, NodeSet
+from graph_output import BufferedWriter, tree_lines, node_record, json_document_lines, ndjson_lines
+from graph_analysis import (strongly_connected_components, is_cyclic, component_cycle, condensation,
+                            ReachabilityIndex, k_shortest_paths)
+from visualizer import dot_lines, write_dot, render_dot
+from graph_reduction import reduce_graph, edge_count
+from maven_version import is_version_range
+from pom_parser import Dependency
+from metrics import registry
 
 
 def make_node_id(group: str, artifact: str, version: Optional[str]) -> str:
@@ -12,6 +30,55 @@ def make_node_id(group: str, artifact: str, version: Optional[str]) -> str:
     return f"{group}:{artifact}:{v}"
 
 
+# Контекст обхода узла: scope на пути от корня (None - корень) и накопленные исключения
+TraversalContext = Tuple[Optional[str], FrozenSet[Tuple[str, str]]]
+_ROOT_CONTEXT: TraversalContext = (None, frozenset())
+
+# Scope, которые передаются транзитивно (test, provided и system - только прямым зависимостям корня)
+_TRANSITIVE_SCOPES = ('compile', 'runtime')
+
+
+def is_excluded(dependency: Dependency, exclusions: FrozenSet[Tuple[str, str]]) -> bool:
+    """Исключена ли зависимость одним из исключений (groupId, artifactId) с «*»"""
+
+    for group, artifact in exclusions:
+        if group in ('*', dependency.group) and artifact in ('*', dependency.artifact):
+            return True
+    return False
+
+
+def is_transient(error: Exception) -> bool:
+    """Временная ли ошибка: сеть, таймаут, ответ 5xx (ConnectionError, URLError - подклассы OSError)
+
+       Такие ошибки не запоминаются: узел запрашивается снова при следующем обходе.
+       Отсутствие POM (404), ошибки разбора и некорректные данные (ValueError) - постоянные."""
+
+    return isinstance(error, OSError)
+
+
+def dependency_record(dep: Dependency) -> list:
+    """Запись зависимости для снимка: [g, a, v] или, при нестандартных атрибутах, [g, a, v, scope, optional, исключения]"""
+
+    if dep.scope == 'compile' and not dep.optional and not dep.exclusions:
+        return [dep.group, dep.artifact, dep.version]
+    return [dep.group, dep.artifact, dep.version, dep.scope, dep.optional, sorted(map(list, dep.exclusions))]
+
+
+def load_dependency(record: list) -> Dependency:
+    if len(record) <= 3:
+        return Dependency(*record)
+    group, artifact, version, scope, optional, exclusions = record
+    return Dependency(group, artifact, version, scope, optional, frozenset(map(tuple, exclusions)))
+
+
+def split_gav(gav: str) -> Tuple[str, Optional[str]]:
+    """Разделить 'group:artifact[:version]' на имя пакета и версию (None, если не указана)"""
+    parts = gav.split(':')
+    if len(parts) >= 3:
+        return f"{parts[0]}:{parts[1]}", ':'.join(parts[2:])
+    return gav, None
+
+
 def split_package_name(pkg: str) -> Tuple[str, str]:
     """Разделить 'group:artifact' на две части.
        Если формат простой ('A'), используем group=artifact=pkg"""
@@ -24,157 +91,880 @@ def split_package_name(pkg: str) -> Tuple[str, str]:
 class DependencyGraph:
     """Класс для построения и анализа графа зависимостей."""
 
-    def __init__(self, repo_url: str, test_mode: bool = False):
-        self.repo_url = repo_url
+    def __init__(self, repositories: Union[str, Sequence[str]], test_mode: bool = False, jobs: int = 1,
+                 cache: Optional[PomCache] = None, pool: Optional[HttpConnectionPool] = None,
+                 compact: bool = False, scopes: Optional[Iterable[str]] = None):
+        # Цепочка репозиториев в порядке приоритета (в тестовом режиме - один файл)
+        self.repositories = repository_list(repositories)
         self.test_mode = test_mode
+        # Количество потоков для параллельного получения зависимостей уровня BFS
+        self.jobs = max(1, jobs)
+        # Учитываемые scope (None - все зависимости, как в POM-файлах, без правил транзитивности)
+        self.scopes: Optional[FrozenSet[str]] = frozenset(scopes) if scopes is not None else None
+
+        # Компактное хранилище (интернированные узлы, рёбра в массивах) - по желанию
+        self.compact = compact
+        self._store: Optional[CompactGraph] = CompactGraph() if compact else None
 
         # graph: node_id -> list of node_id (dependency ids)
-        self.graph: Dict[str, List[str]] = {}
         # meta: node_id -> (group, artifact, version)
-        self.meta: Dict[str, Tuple[str, str, str]] = {}
+        # В компактном режиме это представления над массивами CompactGraph
+        if self._store is not None:
+            self.graph: MutableMapping = self._store.graph
+            self.meta: MutableMapping = self._store.meta
+        else:
+            self.graph = {}
+            self.meta = {}
 
         # Множество посещенных узлов для BFS
-        self.visited: Set[str] = set()
+        self.visited: MutableSet[str] = self._node_set()
 
-        # Обработка циклических зависимостей
-        self.cycles: List[List[str]] = []
-        self._cycles_set: Set[Tuple[str, ...]] = set()
+        # Компоненты сильной связности и индекс достижимости (вычисляются по запросу)
+        self._components: Optional[List[List[str]]] = None
+        self._reachability: Optional[ReachabilityIndex] = None
+        self._versions_index: Optional[Dict[str, List[str]]] = None
 
         # С каким репозиторием работаем
         if test_mode:
-            self.repo_client = TestRepository(repo_url)
+            self.repo_client = TestRepository(self.repositories[0])
         else:
-            self.repo_client = MavenRepository(repo_url)
+            self.repo_client = MavenRepository(self.repositories, cache, pool)
 
         # Кэш обратного графа
         self._reverse_graph: Optional[Dict[str, List[str]]] = None
 
+        # Сессия разрешения: общий для всех корней memo (group, artifact, version) -> (deps, error)
+        self._memo: Dict[Tuple[str, str, Optional[str]], Tuple[List[Dependency], Optional[Exception]]] = {}
+        self._memo_lock = threading.Lock()
+        # Узлы, рёбра которых уже добавлены в граф (в том числе другими корнями)
+        self._expanded: MutableSet[str] = self._node_set()
+        # Корни, для которых строился граф: node_id корня в порядке построения
+        self.roots: List[str] = []
+
+        # Снимок предыдущего построения: node_id -> (deps, валидатор POM, родители и BOM)
+        self._snapshot: Dict[str, Tuple[List[Dependency], str, Tuple[str, ...]]] = {}
+        # Валидаторы родителей и BOM из снимка и результаты их проверки в этой сессии
+        self._snapshot_models: Dict[str, str] = {}
+        self._models_checked: Dict[str, bool] = {}
+        # Валидаторы POM раскрытых узлов (None - снимки не используются)
+        self.validators: Optional[Dict[str, str]] = None
+        # Родители и BOM раскрытых узлов (group:artifact:version) и их валидаторы
+        self.lineages: Dict[str, Tuple[str, ...]] = {}
+        self.model_validators: Dict[str, str] = {}
+
+        # Атрибуты рёбер (scope, optional) - только отличные от (compile, False)
+        self.edge_attributes: Dict[Tuple[str, str], Tuple[str, bool]] = {}
+        # Полные списки зависимостей раскрытых узлов для снимка (до отсечения рёбер)
+        self._snapshot_deps: Dict[str, List[Dependency]] = {}
+        self.pruned = 0
+
+        # Узлы, зависимости которых получить не удалось (node_id -> ошибка): их поддеревья в графе отсутствуют.
+        # Узлы с временной ошибкой не считаются раскрытыми и запрашиваются снова при следующем обходе
+        self.failed: Dict[str, Exception] = {}
+
+        # Статистика сессии
+        self.fetches = 0
+        self.memo_hits = 0
+        self.unchanged = 0
+        self.changed = 0
+
     def build_graph(self, root_package: str, version: Optional[str] = None, max_depth: Optional[int] = None) -> None:
-        """Построение графа зависимостей с помощью BFS (итеративно)"""
+        """Построение графа зависимостей с помощью BFS (итеративно, по уровням)
+
+           Зависимости узлов одного уровня запрашиваются параллельно (если jobs > 1),
+           а результаты обрабатываются в исходном порядке очереди - поэтому граф,
+           порядок рёбер и найденные циклы совпадают с последовательным обходом.
+           Повторный вызов для другого корня дополняет тот же (объединённый) граф:
+           уже раскрытые узлы не запрашиваются повторно."""
+        
+        deque(self.iter_graph(root_package, version, max_depth), maxlen=0)
+
+    def iter_graph(self, root_package: str, version: Optional[str] = None,
+                   max_depth: Optional[int] = None) -> Iterator[Tuple[str, int, List[str]]]:
+        """Ленивый BFS: выдает (node_id, глубина, зависимости) по мере получения каждого узла
+
+           Граф заполняется по ходу обхода; если прекратить итерацию, остальные POM-файлы
+           не загружаются. При jobs == 1 узлы загружаются по одному, иначе - уровнем целиком.
+           Узлы на границе max_depth не раскрываются и не выдаются."""
         
         root_group, root_artifact = split_package_name(root_package)
 
         root_id = make_node_id(root_group, root_artifact, version)
         self.meta[root_id] = (root_group, root_artifact, version if version else "unknown")
+        if root_id not in self.roots:
+            self.roots.append(root_id)
 
-        queue = deque()
-        depth_map: Dict[str, int] = {}
-        parent: Dict[str, Optional[str]] = {}  # для восстановления пути при цикле
+        # Посещенные узлы - свои для каждого корня; глубина равна номеру уровня BFS.
+        # Контекст обхода узла (scope и исключения) - тоже свой: по ближайшему пути от этого корня
+        visited = self._node_set()
+        contexts: Dict[str, TraversalContext] = {root_id: _ROOT_CONTEXT}
 
-        queue.append(root_id)
-        depth_map[root_id] = 0
-        parent[root_id] = None
-        self.visited.add(root_id)
+        level: List[str] = [root_id]
+        current_depth = 0
+        visited.add(root_id)
 
-        while queue:
-            current_id = queue.popleft()
-            current_depth = depth_map[current_id]
+        executor = ThreadPoolExecutor(max_workers=self.jobs) if self.jobs > 1 else None
+        started = time.perf_counter()
+        try:
+            while level:
+                next_level: List[str] = []
+                registry.maximum('peak_frontier', len(level))
 
-            if max_depth is not None and current_depth >= max_depth:
-                # Убедимся, что узел появился в графе
-                self.graph.setdefault(current_id, [])
-                continue
+                if max_depth is not None and current_depth >= max_depth:
+                    # Убедимся, что узлы появились в графе
+                    for current_id in level:
+                        self.graph.setdefault(current_id, [])
+                    break
 
-            # Получение group/artifact/version
-            group, artifact, ver = self.meta.get(current_id, (None, None, None))
-            if group is None:
-                parts = current_id.split(':')
-                if len(parts) >= 2:
-                    group, artifact = parts[0], parts[1]
-                    ver = parts[2] if len(parts) > 2 else "unknown"
-                    self.meta[current_id] = (group, artifact, ver)
-                else:
-                    group, artifact, ver = current_id, "", "unknown"
-                    self.meta[current_id] = (group, artifact, ver)
+                # Получение зависимостей узлов уровня, которые еще не раскрыты
+                results = {}
+                if executor is not None:
+                    pending = [node_id for node_id in level if node_id not in self._expanded]
+                    results = dict(zip(pending, self._fetch_level(pending, executor)))
 
-            # Получение зависимостей
-            pkg_for_client = f"{group}:{artifact}"
-            try:
-                deps = self.repo_client.get_dependencies(pkg_for_client, None if ver == "unknown" else ver)
-            except Exception as e:
-                # Не удалось вытащить зависимости - считаем листом графа
-                print(f"Предупреждение: не удалось получить зависимости для {current_id}: {e}")
-                self.graph.setdefault(current_id, [])
-                continue
+                for current_id in level:
+                    deps = None
+                    if current_id not in self._expanded:
+                        if current_id in results:
+                            deps, error = results[current_id]
+                        else:
+                            deps, error = self._fetch_level([current_id], None)[0]
+                        self._add_node(current_id, deps, error)
 
-            self.graph.setdefault(current_id, [])
+                    # Обрабатываем зависимости (циклы ищутся после построения - см. find_cycles)
+                    children: List[str] = []
+                    for dep_id, dep_context in self._node_children(current_id, contexts.pop(current_id),
+                                                                   deps if current_id in self._expanded else None):
+                        children.append(dep_id)
+                        if dep_id in visited:
+                            continue
 
-            # Обрабатываем зависимости
-            for dep_group, dep_artifact, dep_version in deps:
-                dep_id = make_node_id(dep_group, dep_artifact, dep_version)
-                if dep_id not in self.meta:
-                    self.meta[dep_id] = (dep_group, dep_artifact, dep_version if dep_version else "unknown")
-
-                # Добавляем ребро
-                self.graph[current_id].append(dep_id)
-
-                if dep_id in self.visited:
-                    # Обработка циклических зависимостей
-                    cycle = self._reconstruct_cycle(parent, current_id, dep_id)
-                    if cycle:
-                        canon = tuple(cycle)
-                        if canon not in self._cycles_set:
-                            self._cycles_set.add(canon)
-                            self.cycles.append(cycle)
+                        visited.add(dep_id)
+                        contexts[dep_id] = dep_context
+                        next_level.append(dep_id)
+
+                    yield current_id, current_depth, children
+
+                level = next_level
+                current_depth += 1
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+            registry.observe('bfs', time.perf_counter() - started)
+
+            self.visited.update(visited)
+
+            # Убираем кэш обратного графа и компонент
+            self._reverse_graph = None
+            self._components = None
+            self._reachability = None
+            self._versions_index = None
+
+    def _add_node(self, node_id: str, deps: List[Dependency], error: Optional[Exception]) -> None:
+        """Добавление раскрытого узла в граф (рёбра добавляет _node_children - в контексте обхода)"""
+        
+        registry.count('nodes_expanded')
+        with registry.timer('graph_update'):
+            self.graph.setdefault(node_id, [])
+
+            if error is not None:
+                # Не удалось вытащить зависимости - считаем листом графа (и сообщаем в сводке)
+                print(f"Предупреждение: не удалось получить зависимости для {node_id}: {error}")
+                self.failed[node_id] = error
+                registry.count('failed_nodes')
+                # При временной ошибке узел остается нераскрытым и запрашивается при следующем обходе
+                if not is_transient(error):
+                    self._expanded.add(node_id)
+                return
+
+            self._expanded.add(node_id)
+            self.failed.pop(node_id, None)
+
+            if self.validators is not None:
+                self._snapshot_deps[node_id] = deps
+
+    def _node_dependencies(self, node_id: str) -> Optional[List[Dependency]]:
+        """Полный список зависимостей раскрытого узла (из memo сессии); None - узел не раскрыт"""
+        
+        if node_id not in self._expanded:
+            return None
+        group, artifact, ver = self._node_coordinates(node_id)
+        with self._memo_lock:
+            cached = self._memo.get((group, artifact, None if ver == "unknown" else ver))
+        return cached[0] if cached is not None else self._snapshot_deps.get(node_id, [])
+
+    def _node_children(self, node_id: str, context: TraversalContext,
+                       deps: Optional[List[Dependency]] = None) -> List[Tuple[str, TraversalContext]]:
+        """Рёбра узла в контексте обхода: (node_id зависимости, ее контекст)
+
+           Зависимости вне выбранных scope и исключенные на пути от корня отсекаются
+           здесь - до попадания во фронт BFS, поэтому их POM-файлы не загружаются.
+           Рёбра вычисляются для каждого контекста заново: узел, раскрытый одним корнем,
+           для другого корня (с другими исключениями или scope) дает его собственные рёбра.
+           В объединённый граф добавляются рёбра всех встреченных контекстов.
+           deps - только что полученные зависимости узла (иначе берутся из memo);
+           отсеченные рёбра считаются только при первом раскрытии узла."""
+        
+        expanding = deps is not None
+        if deps is None:
+            deps = self._node_dependencies(node_id)
+        if deps is None:
+            # Граница глубины или временная ошибка - рёбер нет
+            return [(dep_id, context) for dep_id in self.graph.get(node_id, [])]
+
+        scope, exclusions = context
+        children: List[Tuple[str, TraversalContext]] = []
+        with registry.timer('graph_update'):
+            for dep in deps:
+                dep_scope = self._edge_scope(scope, dep)
+                if dep_scope is None or is_excluded(dep, exclusions):
+                    if expanding:
+                        self.pruned += 1
+                        registry.count('pruned_edges')
                     continue
+                dep_id = make_node_id(dep.group, dep.artifact, dep.version)
+                if dep_id not in self.meta:
+                    self.meta[dep_id] = (dep.group, dep.artifact, dep.version if dep.version else "unknown")
+                if dep.scope != 'compile' or dep.optional:
+                    self.edge_attributes[(node_id, dep_id)] = (dep.scope, dep.optional)
+                # Без выбора scope он не влияет на отсечение - контексты различаются только исключениями
+                dep_context = (dep_scope if self.scopes is not None else None,
+                               exclusions | dep.exclusions if dep.exclusions else exclusions)
+                children.append((dep_id, dep_context))
+
+            # Рёбра добавляются одним блоком - так их хранит и компактный режим
+            edges = self.graph[node_id]
+            if not edges:
+                if children:
+                    self.graph[node_id] = [dep_id for dep_id, _ in children]
+            else:
+                known = set(edges)
+                added = [dep_id for dep_id, _ in children if dep_id not in known and not known.add(dep_id)]
+                if added:
+                    self.graph[node_id] = edges + added
+        return children
+
+    def _edge_scope(self, parent_scope: Optional[str], dep: Dependency) -> Optional[str]:
+        """Scope зависимости на пути от корня; None - ребро отсекается
 
-                self.visited.add(dep_id)
-                parent[dep_id] = current_id
-                depth_map[dep_id] = current_depth + 1
-                queue.append(dep_id)
-
-        # Убираем кэш обратного графа
-        self._reverse_graph = None
-
-    def _reconstruct_cycle(self, parent: Dict[str, Optional[str]], from_node: str, to_node: str) -> Optional[List[str]]:
-        """Попытаться восстановить цикл: найти путь от to_node до from_node через parent"""
-        
-        path = []
-        cur = from_node
-        while cur is not None:
-            path.append(cur)
-            if cur == to_node:
-                path.reverse()
-                cycle = path + [to_node]
-                return cycle
-            cur = parent.get(cur)
+           Без выбора scope учитываются все зависимости. Иначе - правила Maven: прямые
+           зависимости корня берутся с собственным scope, транзитивно передаются только
+           compile и runtime (без optional), runtime «понижает» compile."""
+        
+        if self.scopes is None:
+            return dep.scope
+        if parent_scope is None:
+            scope = dep.scope
+        elif dep.optional or dep.scope not in _TRANSITIVE_SCOPES:
+            return None
+        elif parent_scope == 'compile':
+            scope = dep.scope
+        else:
+            scope = parent_scope
+        return scope if scope in self.scopes else None
+
+    def find_dependency(self, root_package: str, predicate: Callable[[str, str, str], bool],
+                        version: Optional[str] = None,
+                        max_depth: Optional[int] = None) -> Optional[Tuple[str, Optional[str], int]]:
+        """Поиск первого (ближайшего к корню) узла, удовлетворяющего predicate(group, artifact, version)
+
+           Обход останавливается, как только ответ известен: зависимость проверяется
+           при появлении ребра, до загрузки ее собственного POM-файла.
+           Возвращает (node_id, родитель, глубина) или None."""
+        
+        with contextlib.closing(self.iter_graph(root_package, version, max_depth)) as nodes:
+            for node_id, depth, children in nodes:
+                if depth == 0 and predicate(*self._node_coordinates(node_id)):
+                    return node_id, None, 0
+                for child in children:
+                    if predicate(*self._node_coordinates(child)):
+                        return child, node_id, depth + 1
         return None
-    
-    def print_graph(self, root_package: str, version: Optional[str] = None) -> None:
-        """Печатает полный граф зависимостей в виде дерева."""
 
-        print(f"\nПолный граф зависимостей для {root_package}:{version if version else 'latest'}:")
-        print("-" * 60)
+    def contains(self, root_package: str, target_package: str, target_version: Optional[str] = None,
+                 version: Optional[str] = None,
+                 max_depth: Optional[int] = None) -> Optional[Tuple[str, Optional[str], int]]:
+        """Тянет ли корень пакет target (group:artifact, при необходимости - конкретной версии)"""
+        
+        tg_group, tg_artifact = split_package_name(target_package)
+
+        def matches(group: str, artifact: str, ver: str) -> bool:
+            return (group == tg_group and artifact == tg_artifact
+                    and (target_version is None or ver == target_version))
+
+        return self.find_dependency(root_package, matches, version, max_depth)
+
+    def find_paths(self, root_package: str, target_package: str, target_version: Optional[str] = None,
+                   version: Optional[str] = None, k: int = 1,
+                   max_depth: Optional[int] = None) -> List[List[str]]:
+        """k кратчайших цепочек зависимостей от корня до target (group:artifact[:version])
+
+           Если граф корня еще не построен и нужна одна цепочка, используется ленивый BFS
+           с остановкой на первом вхождении target. Иначе граф строится (или берется
+           уже построенный), и цепочки ищутся двунаправленным BFS по прямому и обратному
+           графу. Каждая цепочка - список node_id от корня до target."""
 
-        # Преобразуем group:artifact в node_id
         root_group, root_artifact = split_package_name(root_package)
         root_id = make_node_id(root_group, root_artifact, version)
 
-        if root_id not in self.graph:
-            # Попытка найти версию автоматически
-            candidates = [n for n in self.graph.keys() if n.startswith(f"{root_group}:{root_artifact}:")]
+        if root_id not in self._expanded:
+            if k == 1:
+                path = self._lazy_shortest_path(root_package, target_package, target_version, version, max_depth)
+                return [path] if path is not None else []
+            self.build_graph(root_package, version, max_depth)
+
+        targets = self._match_nodes(target_package, target_version)
+        if not targets:
+            return []
+        if len(self.roots) > 1:
+            # Цепочки - только по рёбрам этого корня (с его scope и исключениями)
+            graph = self.root_view(root_id)
+            reverse: Dict[str, List[str]] = {node: [] for node in graph}
+            for parent_node, children in graph.items():
+                for child in children:
+                    reverse[child].append(parent_node)
+        else:
+            graph, reverse = self.graph, self.build_reverse_graph()
+        paths = k_shortest_paths(graph, reverse, root_id, targets, k)
+        if max_depth is not None:
+            paths = [path for path in paths if len(path) - 1 <= max_depth]
+        return paths
+
+    def _lazy_shortest_path(self, root_package: str, target_package: str, target_version: Optional[str],
+                            version: Optional[str], max_depth: Optional[int]) -> Optional[List[str]]:
+        """Кратчайшая цепочка до target ленивым BFS (первый родитель узла лежит на кратчайшем пути)"""
+
+        tg_group, tg_artifact = split_package_name(target_package)
+
+        def matches(node_id: str) -> bool:
+            group, artifact, ver = self._node_coordinates(node_id)
+            return (group == tg_group and artifact == tg_artifact
+                    and (target_version is None or ver == target_version))
+
+        parent: Dict[str, Optional[str]] = {}
+        with contextlib.closing(self.iter_graph(root_package, version, max_depth)) as nodes:
+            for node_id, depth, children in nodes:
+                if depth == 0:
+                    parent[node_id] = None
+                    if matches(node_id):
+                        return [node_id]
+                for child in children:
+                    if child in parent:
+                        continue
+                    parent[child] = node_id
+                    if matches(child):
+                        path = [child]
+                        while parent[path[-1]] is not None:
+                            path.append(parent[path[-1]])
+                        path.reverse()
+                        return path
+        return None
+
+    def print_paths(self, root_package: str, target: str, paths: List[List[str]]) -> None:
+        """Печать найденных цепочек зависимостей"""
+
+        print(f"\nЦепочки зависимостей от {root_package} до {target}:")
+        print("-" * 60)
+        if not paths:
+            print("Цепочки не найдены.")
+            return
+        for i, path in enumerate(paths, 1):
+            print(f"{i:2d}. {' -> '.join(path)}  (длина {len(path) - 1})")
+        print("-" * 60)
+
+    def build_graphs(self, roots: List[Tuple[str, Optional[str]]], max_depth: Optional[int] = None) -> None:
+        """Построение объединённого графа для нескольких корней в одной сессии
+
+           roots - список пар (group:artifact, версия). Общие зависимости корней
+           загружаются один раз."""
+        
+        for root_package, version in roots:
+            self.build_graph(root_package, version, max_depth)
+
+    def get_direct_dependencies(self, package_name: str, version: Optional[str] = None) -> List[Dependency]:
+        """Прямые зависимости пакета через memo сессии (ошибка получения выбрасывается)"""
+        
+        group, artifact = split_package_name(package_name)
+        deps, error = self._resolve(group, artifact, version)
+        if error is not None:
+            raise error
+        return deps
+
+    def _node_coordinates(self, node_id: str) -> Tuple[str, str, str]:
+        """Получение group/artifact/version узла (с заполнением meta при необходимости)"""
+        
+        group, artifact, ver = self.meta.get(node_id, (None, None, None))
+        if group is None:
+            parts = node_id.split(':')
+            if len(parts) >= 2:
+                group, artifact = parts[0], parts[1]
+                ver = parts[2] if len(parts) > 2 else "unknown"
+            else:
+                group, artifact, ver = node_id, "", "unknown"
+            self.meta[node_id] = (group, artifact, ver)
+        return group, artifact, ver
+
+    def _fetch_dependencies(self, node_id: str) -> Tuple[List[Dependency], Optional[Exception]]:
+        """Запрос прямых зависимостей узла; ошибка возвращается, а не выбрасывается"""
+        
+        group, artifact, ver = self.meta[node_id]
+        version = None if ver == "unknown" else ver
+
+        # Узел из снимка - достаточно проверить, не изменился ли его POM
+        snapshot = self._snapshot.get(node_id) if version is not None else None
+        if snapshot is not None:
+            return self._revalidate(node_id, group, artifact, version, snapshot)
+
+        result = self._resolve(group, artifact, version)
+        package_name = f"{group}:{artifact}"
+        if self.validators is None:
+            # Без снимка валидаторы не нужны (их вычисление может стоить повторного разбора)
+            self.repo_client.discard_validator(package_name, version)
+        else:
+            self._remember_validator(node_id, self.repo_client.pop_validator(package_name, version),
+                                     self.repo_client.pop_model_chain(package_name, version))
+        return result
+
+    def _remember_validator(self, node_id: str, validator: Optional[str], chain: Dict[str, str]) -> None:
+        """Запомнить валидаторы POM узла, его родителей и BOM для следующего снимка"""
+        
+        if validator and self.validators is not None:
+            with self._memo_lock:
+                self.validators[node_id] = validator
+                if chain:
+                    self.lineages[node_id] = tuple(sorted(chain))
+                    self.model_validators.update(chain)
+
+    def _snapshot_chain(self, parents: Tuple[str, ...]) -> Dict[str, str]:
+        return {gav: self._snapshot_models[gav] for gav in parents if gav in self._snapshot_models}
+
+    def _lineage_changed(self, parents: Tuple[str, ...]) -> bool:
+        """Изменился ли POM хотя бы одного родителя или BOM узла (каждый проверяется раз за сессию)"""
+        
+        for gav in parents:
+            with self._memo_lock:
+                changed = self._models_checked.get(gav)
+            if changed is None:
+                validator = self._snapshot_models.get(gav)
+                changed = validator is None or self.repo_client.model_changed(gav, validator)
+                with self._memo_lock:
+                    self._models_checked[gav] = changed
+            if changed:
+                return True
+        return False
+
+    def _revalidate(self, node_id: str, group: str, artifact: str, version: str,
+                    snapshot: Tuple[List[Dependency], str, Tuple[str, ...]]) -> Tuple[List[Dependency], Optional[Exception]]:
+        """Зависимости узла из снимка: сохранённые, если не изменились ни POM узла,
+           ни POM его родителей и импортированных BOM, иначе - новые"""
+        
+        package_name = f"{group}:{artifact}"
+        snapshot_deps, validator, parents = snapshot
+
+        key = (group, artifact, version)
+        with self._memo_lock:
+            cached = self._memo.get(key)
+            if cached is not None:
+                self.memo_hits += 1
+        if cached is not None:
+            # POM уже получен в этой сессии (например, как «latest» корня)
+            fresh = self.repo_client.pop_validator(package_name, version)
+            chain = self.repo_client.pop_model_chain(package_name, version)
+            self._remember_validator(node_id, fresh or validator, chain if fresh else self._snapshot_chain(parents))
+            return cached
+
+        chain: Dict[str, str] = {}
+        try:
+            deps = self.repo_client.revalidate(package_name, version, validator)
+            if deps is None and self._lineage_changed(parents):
+                # POM узла прежний, но изменился родитель или BOM - зависимости выводятся заново
+                deps = self.repo_client.get_dependencies(package_name, version)
+        except Exception as e:
+            result = ([], e)
+            validator = None
+        else:
+            validator = self.repo_client.pop_validator(package_name, version) or validator
+            if deps is None:
+                chain = self._snapshot_chain(parents)
+                result = (snapshot_deps, None)
+            else:
+                chain = self.repo_client.pop_model_chain(package_name, version)
+                result = (deps, None)
+
+        with self._memo_lock:
+            if result[1] is None or not is_transient(result[1]):
+                self._memo[key] = result
+            if result[1] is None:
+                if deps is None:
+                    self.unchanged += 1
+                else:
+                    self.changed += 1
+        self._remember_validator(node_id, validator, chain)
+        return result
+
+    def _resolve(self, group: str, artifact: str,
+                 version: Optional[str]) -> Tuple[List[Dependency], Optional[Exception]]:
+        """Получение зависимостей с запоминанием результата на всю сессию
+
+           Постоянная ошибка (нет POM, ошибка разбора) запоминается, временная (сеть) - нет."""
+        
+        package_name = f"{group}:{artifact}"
+        keys = [(group, artifact, version)]
+        with self._memo_lock:
+            cached = self._memo.get(keys[0])
+            if cached is not None:
+                self.memo_hits += 1
+                return cached
+
+        try:
+            if version is None or is_version_range(version):
+                # «latest» и диапазон запоминаются и под конкретной версией, чтобы тот же POM,
+                # встреченный позже как зависимость, не загружался повторно
+                version = self.repo_client.resolve_version(package_name, version)
+                keys.append((group, artifact, version))
+                with self._memo_lock:
+                    cached = self._memo.get(keys[-1])
+                    if cached is not None:
+                        self.memo_hits += 1
+                        self._memo[keys[0]] = cached
+                        return cached
+            result = (self.repo_client.get_dependencies(package_name, version), None)
+        except Exception as e:
+            result = ([], e)
+
+        with self._memo_lock:
+            if result[1] is None or not is_transient(result[1]):
+                for key in keys:
+                    self._memo[key] = result
+            self.fetches += 1
+        return result
+
+    def _fetch_level(self, level: List[str], executor: Optional[ThreadPoolExecutor]) -> List[Tuple[List[Dependency], Optional[Exception]]]:
+        """Получение зависимостей для всех узлов уровня BFS (результаты - в порядке уровня)"""
+        
+        # meta заполняется до запуска потоков, чтобы не изменять словарь конкурентно
+        for node_id in level:
+            self._node_coordinates(node_id)
+
+        if executor is None or len(level) <= 1:
+            return [self._fetch_dependencies(node_id) for node_id in level]
+
+        # Индексы версий для всех узлов уровня без конкретной версии - одним пакетом
+        unversioned = [self.meta[node_id][:2] for node_id in level
+                       if self.meta[node_id][2] == "unknown" or is_version_range(self.meta[node_id][2])]
+        if unversioned:
+            self.repo_client.prefetch_versions(unversioned, executor)
+        return list(executor.map(self._fetch_dependencies, level))
+
+    def strongly_connected_components(self) -> List[List[str]]:
+        """Компоненты сильной связности графа (вычисляются один раз за O(V + E))"""
+        
+        if self._components is None:
+            if self._reachability is not None:
+                self._components = self._reachability.components
+            else:
+                self._components = strongly_connected_components(self.graph)
+        return self._components
+
+    def reachability_index(self) -> ReachabilityIndex:
+        """Индекс транзитивной достижимости (строится один раз после построения графа)"""
+        
+        if self._reachability is None:
+            self._reachability = ReachabilityIndex(self.graph)
+            self._components = self._reachability.components
+        return self._reachability
+
+    def find_cycles(self) -> List[List[str]]:
+        """Все циклические компоненты графа - по одному представительному циклу на каждую"""
+        
+        cycles = []
+        for component in self.strongly_connected_components():
+            cycle = component_cycle(component, self.graph)
+            if cycle:
+                cycles.append(cycle)
+        return cycles
+
+    @property
+    def cycles(self) -> List[List[str]]:
+        return self.find_cycles()
+
+    def cyclic_components(self) -> List[List[str]]:
+        """Компоненты сильной связности, содержащие циклы"""
+        
+        return [c for c in self.strongly_connected_components() if is_cyclic(c, self.graph)]
+
+    def condensation(self) -> Tuple[List[List[str]], Dict[int, List[int]]]:
+        """Граф конденсации: (компоненты, DAG индексов компонент)
+
+           Компоненты упорядочены так, что зависимости идут раньше зависящих от них."""
+        
+        components = self.strongly_connected_components()
+        return components, condensation(components, self.graph)
+
+    def print_cycles(self) -> None:
+        """Вывод циклических зависимостей (по одному циклу на компоненту сильной связности)"""
+        
+        components = self.cyclic_components()
+        if not components:
+            return
+
+        print(f"\nЦиклические зависимости:")
+        print("-" * 60)
+        for i, component in enumerate(components, 1):
+            cycle = component_cycle(component, self.graph)
+            print(f"{i:2d}. [{len(component)} узл.] " + " -> ".join(cycle))
+        print("-" * 60)
+        print(f"Всего циклических компонент: {len(components)}")
+
+    def print_failures(self) -> None:
+        """Сводка узлов, которые не удалось раскрыть: граф без их поддеревьев неполон"""
+        
+        if not self.failed:
+            return
+        
+        network = [node_id for node_id, error in self.failed.items() if isinstance(error, ConnectionError)]
+        print(f"\nГраф неполный: не раскрыто узлов - {len(self.failed)}, из них из-за ошибок сети или сервера - {len(network)}")
+        print("-" * 60)
+        for node_id, error in self.failed.items():
+            print(f"  {node_id}: {error}")
+        print("-" * 60)
+
+    def print_graph(self, root_package: str, version: Optional[str] = None, out: Optional[TextIO] = None) -> None:
+        """Печатает полный граф зависимостей в виде дерева (итеративно, через буферизованную запись)"""
+
+        with BufferedWriter(out if out is not None else sys.stdout) as writer:
+            writer.write_line(f"\nПолный граф зависимостей для {root_package}:{version if version else 'latest'}:")
+            writer.write_line("-" * 60)
+
+            # Преобразуем group:artifact в node_id (или находим версию автоматически)
+            candidates = self._match_nodes(root_package, version)
             if not candidates:
-                print("Граф пуст — возможно, не удалось получить зависимости.")
+                writer.write_line("Граф пуст — возможно, не удалось получить зависимости.")
                 return
             root_id = candidates[0]
 
-        visited = set()
+            # В объединённом графе нескольких корней рёбра узла - по всем корням
+            graph = self.root_view(root_id) if len(self.roots) > 1 else self.graph
 
-        def dfs(node: str, indent: str = ""):
-            if node in visited:
-                print(indent + f"↳ {node}  (повтор)")
-                return
-            visited.add(node)
+            visited: Set[str] = set()
+            with registry.timer('output'):
+                writer.write_lines(tree_lines(graph, root_id, visited, self.edge_attributes))
+
+            writer.write_line("-" * 60)
+            writer.write_line(f"Всего узлов: {len(visited)}")
+
+    def write_graph(self, fmt: str = 'json', out: Optional[TextIO] = None) -> None:
+        """Потоковый вывод всего графа в json или ndjson - по узлу за раз
+
+           json: {"roots": [...], "nodes": [{id, group, artifact, version, dependencies}, ...]},
+           ndjson: по одному объекту узла на строку."""
+
+        records = self.node_records()
+        if fmt == 'ndjson':
+            lines = ndjson_lines(records)
+        else:
+            lines = json_document_lines({'roots': self.roots}, 'nodes', records)
+
+        with registry.timer('output'), BufferedWriter(out if out is not None else sys.stdout) as writer:
+            writer.write_lines(lines)
+
+    def node_records(self, graph: Optional[Mapping[str, List[str]]] = None) -> Iterator[Dict[str, object]]:
+        """Описания узлов графа (по умолчанию - всего объединённого) для JSON-форматов"""
+
+        graph = self.graph if graph is None else graph
+        for node_id, children in graph.items():
+            yield node_record(node_id, self._node_coordinates(node_id), children, self.edge_attributes)
+
+    def root_view(self, root_id: str) -> Dict[str, List[str]]:
+        """Подграф объединённого графа, достижимый из одного корня
+
+           Рёбра пересчитываются в контексте этого корня (scope и исключения на ближайшем
+           пути, как при построении): рёбра, которые в объединённый граф добавили другие
+           корни, в подграф не попадают. Узлы - в порядке BFS."""
+        
+        view: Dict[str, List[str]] = {}
+        contexts: Dict[str, TraversalContext] = {root_id: _ROOT_CONTEXT}
+        queue = deque([root_id])
+        while queue:
+            node = queue.popleft()
+            children = self._node_children(node, contexts[node])
+            view[node] = [dep_id for dep_id, _ in children]
+            for dep_id, dep_context in children:
+                if dep_id not in contexts:
+                    contexts[dep_id] = dep_context
+                    queue.append(dep_id)
+        return view
+
+    def _node_set(self) -> MutableSet[str]:
+        """Пустое множество узлов: в компактном режиме - флаги по индексам CompactGraph"""
+        
+        return self._store.node_set() if self._store is not None else set()
+
+    def memory_usage(self) -> Tuple[int, int]:
+        """Оценка памяти в байтах: (граф и метаданные, данные сессии)
+
+           Данные сессии - memo зависимостей, множества посещенных и раскрытых узлов,
+           атрибуты рёбер и валидаторы снимка. Каждый объект (строка, кортеж)
+           учитывается один раз, даже если на него ссылаются несколько структур."""
+        
+        seen: Set[int] = set()
+        total = 0
+
+        def add(obj) -> None:
+            nonlocal total
+            if id(obj) not in seen:
+                seen.add(id(obj))
+                total += obj.memory_usage() if isinstance(obj, NodeSet) else sys.getsizeof(obj)
+
+        if self._store is not None:
+            total = self._store.memory_usage()
+            # Строки node_id и координат хранит CompactGraph - они уже учтены
+            for node_id, coordinates in self.meta.items():
+                seen.add(id(node_id))
+                seen.update(id(value) for value in coordinates)
+        else:
+            add(self.graph)
+            add(self.meta)
+            for node_id, children in self.graph.items():
+                add(node_id)
+                add(children)
+                for child in children:
+                    add(child)
+            for node_id, coordinates in self.meta.items():
+                add(node_id)
+                add(coordinates)
+                for value in coordinates:
+                    add(value)
+        graph_total = total
+
+        def add_dependencies(deps: List[Dependency]) -> None:
+            add(deps)
+            for dep in deps:
+                add(dep)
+                for value in dep[:3]:
+                    add(value)
+
+        for nodes in (self.visited, self._expanded):
+            add(nodes)
+            if not isinstance(nodes, NodeSet):
+                for node_id in nodes:
+                    add(node_id)
+        add(self._memo)
+        for key, (deps, _) in self._memo.items():
+            add(key)
+            for value in key:
+                add(value)
+            add_dependencies(deps)
+        add(self.edge_attributes)
+        for key, attributes in self.edge_attributes.items():
+            add(key)
+            add(attributes)
+        add(self._snapshot_deps)
+        for deps in self._snapshot_deps.values():
+            add_dependencies(deps)
+        for mapping in (self.validators or {}, self.lineages, self.model_validators):
+            add(mapping)
+            for key, value in mapping.items():
+                add(key)
+                add(value)
+        return graph_total, total - graph_total
+
+    def print_memory_usage(self) -> None:
+        """Вывод оценки памяти графа и сессии (всего и в расчете на узел)"""
+        
+        graph_total, session_total = self.memory_usage()
+        total = graph_total + session_total
+        nodes = max(1, len(self.meta))
+        backend = "compact" if self.compact else "dict"
+        print(f"Память графа ({backend}): {total / 1024:.1f} КБ, {total / nodes:.0f} байт на узел "
+              f"(граф и метаданные - {graph_total / 1024:.1f} КБ, memo и множества узлов сессии - "
+              f"{session_total / 1024:.1f} КБ)")
+
+    def load_snapshot(self, path: str) -> int:
+        """Загрузка снимка предыдущего построения; возвращает число загруженных узлов
+
+           Узлы снимка при обходе не загружаются заново, а ревалидируются по валидатору
+           POM (ETag или хэш содержимого); раскрываются повторно только изменившиеся.
+           После вызова валидаторы новых узлов запоминаются для save_snapshot."""
+        
+        self.validators = {}
+        if not os.path.exists(path):
+            return 0
+
+        opener = gzip.open if path.endswith('.gz') else open
+        try:
+            with opener(path, 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Предупреждение: не удалось прочитать снимок графа {path}: {e}")
+            return 0
+
+        if data.get('repositories') != self.repositories or data.get('test_mode') != self.test_mode:
+            print(f"Предупреждение: снимок графа {path} построен для другого репозитория и не используется")
+            return 0
 
-            print(indent + f"{node}")
+        self._snapshot_models = data.get('models', {})
+        for node_id, node in data.get('nodes', {}).items():
+            deps = [load_dependency(dep) for dep in node['deps']]
+            self._snapshot[node_id] = (deps, node['validator'], tuple(node.get('parents', ())))
+        return len(self._snapshot)
+
+    def save_snapshot(self, path: str) -> int:
+        """Сохранение снимка графа (раскрытые узлы с валидаторами POM); возвращает число узлов"""
+        
+        nodes = {}
+        models: Dict[str, str] = {}
+        for node_id in self.graph:
+            validator = (self.validators or {}).get(node_id)
+            if node_id not in self._expanded or not validator:
+                continue
+            deps = self._snapshot_deps.get(node_id)
+            if deps is None:
+                deps = [Dependency(*self._node_coordinates(child)) for child in self.graph[node_id]]
+            nodes[node_id] = {
+                'deps': [dependency_record(dep) for dep in deps],
+                'validator': validator,
+            }
+            parents = self.lineages.get(node_id)
+            if parents:
+                nodes[node_id]['parents'] = list(parents)
+                models.update((gav, self.model_validators[gav]) for gav in parents)
 
-            for child in self.graph.get(node, []):
-                dfs(child, indent + "   ")
+        data = {'repositories': self.repositories, 'test_mode': self.test_mode, 'models': models, 'nodes': nodes}
 
-        dfs(root_id)
+        # Запись через временный файл, чтобы не оставить обрезанный снимок
+        tmp_path = f"{path}.tmp"
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return len(nodes)
 
+    def export_csr(self, path: str) -> Tuple[int, int]:
+        """Выгрузка графа в формате CSR (.npz, нужен NumPy) для graph_analytics.py; возвращает (узлы, рёбра)"""
+        
+        from graph_analytics import CsrGraph
+        
+        csr = CsrGraph.from_adjacency(self.graph, self._node_coordinates, self.roots)
+        csr.save(path)
+        return csr.node_count, csr.edge_count
+    
+    def print_refresh_summary(self) -> None:
+        """Сводка обновления графа по снимку"""
+        
+        print(f"\nОбновление по снимку: без изменений {self.unchanged}, изменилось {self.changed}, "
+              f"новых загрузок {self.fetches}")
+
+    def print_batch_summary(self) -> None:
+        """Сводка по корням объединённого графа и по повторному использованию загрузок"""
+        
+        print(f"\nОбъединённый граф ({len(self.roots)} корней):")
+        print("-" * 60)
+        for i, root_id in enumerate(self.roots, 1):
+            print(f"{i:2d}. {root_id:<50} узлов: {len(self.root_view(root_id))}")
         print("-" * 60)
         print(f"Всего узлов: {len(self.graph)}")
+        print(f"Загружено POM-файлов: {self.fetches}, повторных обращений без загрузки: {self.memo_hits}")
 
     def build_reverse_graph(self) -> Dict[str, List[str]]:
         """Построение обратного графа"""
@@ -190,28 +980,83 @@ class DependencyGraph:
         self._reverse_graph = rev
         return rev
 
+    def _match_nodes(self, package: str, version: Optional[str]) -> List[str]:
+        """Узлы графа для пакета: точная версия или все версии group:artifact"""
+        
+        group, artifact = split_package_name(package)
+        node_id = make_node_id(group, artifact, version)
+        if node_id in self.graph:
+            return [node_id]
+
+        # Целевой узел отсутствует в графе -> возможно использовалась иная версия:
+        # берем все версии group:artifact:* (индекс строится один раз)
+        if self._versions_index is None:
+            index: Dict[str, List[str]] = {}
+            for node in self.graph:
+                g, a, _ = self._node_coordinates(node)
+                index.setdefault(f"{g}:{a}", []).append(node)
+            self._versions_index = index
+        return self._versions_index.get(f"{group}:{artifact}", [])
+
     def get_reverse_dependencies(self, target_package: str, target_version: Optional[str] = None,
                                  max_depth: Optional[int] = None) -> List[str]:
-        """Возвращает список node_id, которые зависят от target"""
+        """Возвращает список node_id, которые зависят от target
+
+           Без ограничения глубины ответ берется из индекса достижимости,
+           с ограничением - BFS по обратному графу."""
         
-        tg_group, tg_artifact = split_package_name(target_package)
-        target_id = make_node_id(tg_group, tg_artifact, target_version)
-
-        rev = self.build_reverse_graph()
-        if target_id not in rev:
-            # Целевой узел отсутствует в графе -> возможно его нет или использовалась иная версия
-            # попробуем найти по префиксу group:artifact:*
-            matches = [n for n in rev.keys() if n.startswith(f"{tg_group}:{tg_artifact}:")]
-            if not matches:
-                raise ValueError(f"Пакет {target_id} не найден в графе (нет узлов-зависимостей).")
-            # Если есть несколько версий, выбираем те ключи
-            # Для обратных зависимостей будем объединять результаты для всех совпадающих версий
-            results_set: Set[str] = set()
+        matches = self._match_nodes(target_package, target_version)
+        if not matches:
+            tg_group, tg_artifact = split_package_name(target_package)
+            target_id = make_node_id(tg_group, tg_artifact, target_version)
+            raise ValueError(f"Пакет {target_id} не найден в графе (нет узлов-зависимостей).")
+
+        # Для нескольких версий объединяем результаты
+        results_set: Set[str] = set()
+        if max_depth is None:
+            index = self.reachability_index()
             for m in matches:
-                results_set.update(self._bfs_reverse_collect(m, rev, max_depth))
-            return sorted(results_set)
+                results_set.update(index.ancestors(m))
         else:
-            return self._bfs_reverse_collect(target_id, rev, max_depth)
+            rev = self.build_reverse_graph()
+            for m in matches:
+                results_set.update(self._bfs_reverse_collect(m, rev, max_depth))
+        return sorted(results_set)
+
+    def get_transitive_dependencies(self, package: str, version: Optional[str] = None) -> List[str]:
+        """Возвращает список node_id, от которых пакет зависит транзитивно (по индексу достижимости)"""
+        
+        matches = self._match_nodes(package, version)
+        if not matches:
+            group, artifact = split_package_name(package)
+            raise ValueError(f"Пакет {make_node_id(group, artifact, version)} не найден в графе.")
+
+        index = self.reachability_index()
+        results_set: Set[str] = set()
+        for m in matches:
+            results_set.update(index.descendants(m))
+        return sorted(results_set)
+
+    def write_reverse_dependencies(self, targets: List[str], out: TextIO,
+                                   max_depth: Optional[int] = None) -> Tuple[int, int]:
+        """Пакетный запрос обратных зависимостей: по строке «цель<TAB>зависимый» в out
+
+           targets - элементы вида group:artifact[:version]. Цели, отсутствующие в графе,
+           пропускаются с предупреждением. Возвращает (число найденных целей, число строк)."""
+        
+        found = 0
+        lines = 0
+        for target in targets:
+            package, version = split_gav(target)
+            try:
+                dependents = self.get_reverse_dependencies(package, version, max_depth)
+            except ValueError as e:
+                print(f"Предупреждение: {e}")
+                continue
+            found += 1
+            out.writelines(f"{target}\t{node_id}\n" for node_id in dependents)
+            lines += len(dependents)
+        return found, lines
 
     def _bfs_reverse_collect(self, start_id: str, rev_graph: Dict[str, List[str]], max_depth: Optional[int]) -> List[str]:
         """Внутренний BFS по обратному графу — вернуть все узлы, которые достижимы от start_id (вверх)"""
@@ -232,44 +1077,72 @@ class DependencyGraph:
         return sorted(results)
 
     def print_reverse_dependencies(self, target_package: str, target_version: Optional[str] = None,
-                                   max_depth: Optional[int] = None) -> None:
-        """Печать обратных зависимостей"""
+                                   max_depth: Optional[int] = None, fmt: str = 'tree',
+                                   out: Optional[TextIO] = None) -> None:
+        """Печать обратных зависимостей (tree - для чтения, json/ndjson - для других программ)"""
         try:
             rev_nodes = self.get_reverse_dependencies(target_package, target_version, max_depth)
         except ValueError as e:
             print(f"Критическая ошибка: {e}")
             return
 
-        print(f"\nОбратные зависимости (кто зависит от {target_package}{':' + target_version if target_version else ''}):")
-        print("-" * 60)
-        if not rev_nodes:
-            print("Обратные зависимости не найдены.")
-            return
+        target = f"{target_package}{':' + target_version if target_version else ''}"
+        with BufferedWriter(out if out is not None else sys.stdout) as writer:
+            if fmt == 'json':
+                writer.write_lines(json_document_lines({'target': target}, 'dependents', rev_nodes))
+                return
+            if fmt == 'ndjson':
+                writer.write_lines(ndjson_lines({'target': target, 'dependent': node_id} for node_id in rev_nodes))
+                return
 
-        for i, node_id in enumerate(rev_nodes, 1):
-            g, a, v = self.meta.get(node_id, (None, None, None))
-            display = f"{g}:{a}:{v}" if g is not None else node_id
-            print(f"{i:2d}. {display}")
-        print("-" * 60)
-        print(f"Всего обратных зависимостей: {len(rev_nodes)}")
+            writer.write_line(f"\nОбратные зависимости (кто зависит от {target}):")
+            writer.write_line("-" * 60)
+            if not rev_nodes:
+                writer.write_line("Обратные зависимости не найдены.")
+                return
+
+            for i, node_id in enumerate(rev_nodes, 1):
+                g, a, v = self.meta.get(node_id, (None, None, None))
+                display = f"{g}:{a}:{v}" if g is not None else node_id
+                writer.write_line(f"{i:2d}. {display}")
+            writer.write_line("-" * 60)
+            writer.write_line(f"Всего обратных зависимостей: {len(rev_nodes)}")
 
     def to_dot(self) -> str:
         """Сформировать текст Graphviz (DOT) для всего графа"""
         
-        lines = ["digraph G {"]
-        for parent, children in self.graph.items():
-            parent_label = f'"{parent}"'
-            for child in children:
-                child_label = f'"{child}"'
-                lines.append(f"    {parent_label} -> {child_label};")
-        lines.append("}")
-        return "\n".join(lines)
-
-    def render_graph(self, output_file: str = "dependency_graph.svg") -> None:
-        """Сохранить граф в SVG через Graphviz"""
-        
-        dot_str = self.to_dot()
-        g = graphviz.Source(dot_str)
-        g.format = 'svg'
-        g.render(filename=output_file, cleanup=True)
-        print(f"\nГраф зависимостей сохранён в {output_file}")
\ No newline at end of file
+        return "\n".join(dot_lines(self.graph, "G"))
+
+    def graph_for_rendering(self, reductions: Optional[List[str]] = None,
+                            top_k: Optional[int] = None, root_id: Optional[str] = None) -> MutableMapping:
+        """Граф для визуализации - исходный или упрощенный выбранными режимами (см. graph_reduction)
+
+           С root_id берется только подграф, достижимый из этого корня."""
+        
+        graph = self.graph if root_id is None else self.root_view(root_id)
+        if not reductions and not top_k:
+            return graph
+
+        roots = self.roots if root_id is None else [root_id]
+        reduced = reduce_graph(graph, self._node_coordinates, reductions or [], roots, top_k)
+        print(f"\nУпрощение графа для визуализации: {len(graph)} узлов / {edge_count(graph)} рёбер -> "
+              f"{len(reduced)} узлов / {edge_count(reduced)} рёбер")
+        return reduced
+
+    def save_dot(self, output_file: str = "dependency_graph", reductions: Optional[List[str]] = None,
+                 top_k: Optional[int] = None) -> None:
+        """Потоковая запись графа в DOT-файл <output_file>.dot"""
+        
+        graph = self.graph_for_rendering(reductions, top_k)
+        with registry.timer('dot'), open(f"{output_file}.dot", "w", encoding="utf-8") as f:
+            write_dot(dot_lines(graph, "G"), f)
+        print(f"\nDOT-описание графа сохранено в {output_file}.dot")
+
+    def render_graph(self, output_file: str = "dependency_graph", reductions: Optional[List[str]] = None,
+                     top_k: Optional[int] = None) -> None:
+        """Сохранить граф в <output_file>.svg: DOT генерируется потоково прямо в stdin dot"""
+        
+        graph = self.graph_for_rendering(reductions, top_k)
+        with registry.timer('graphviz'):
+            render_dot(dot_lines(graph, "G"), f"{output_file}.svg")
+        print(f"\nГраф зависимостей сохранён в {output_file}")
@@ -0,0 +1,278 @@
+import re
+import threading
+from collections import ChainMap
+from typing import List, Dict, Set, Tuple, Optional, Callable, Mapping, Iterator, FrozenSet
+from pom_parser import PomModel, Dependency, parse_model
+from metrics import registry
+
+
+# Максимальная глубина подстановки свойств, ссылающихся на другие свойства
+MAX_INTERPOLATION_DEPTH = 10
+
+_PROPERTY_RE = re.compile(r'\$\{([^}]+)\}')
+
+Coordinates = Tuple[str, str, str]
+
+
+def interpolate(text: str, properties: Mapping[str, str]) -> str:
+    """Подстановка ${name} из properties (неизвестные свойства остаются как есть)"""
+
+    for _ in range(MAX_INTERPOLATION_DEPTH):
+        if '${' not in text:
+            break
+        replaced = _PROPERTY_RE.sub(lambda m: properties.get(m.group(1), m.group(0)), text)
+        if replaced == text:
+            break
+        text = replaced
+    return text
+
+
+def _referenced_properties(texts: Iterator[str], properties: Mapping[str, str]) -> Set[str]:
+    """Имена свойств, от которых (транзитивно) зависят тексты"""
+
+    names: Set[str] = set()
+    pending = [name for text in texts for name in _PROPERTY_RE.findall(text)]
+    while pending:
+        name = pending.pop()
+        if name in names:
+            continue
+        names.add(name)
+        pending.extend(_PROPERTY_RE.findall(properties.get(name, '')))
+    return names
+
+
+def _exclusions(entry: Dict[str, object], properties: Mapping[str, str]) -> FrozenSet[Tuple[str, str]]:
+    """Исключения записи зависимости с подставленными свойствами"""
+
+    return frozenset((interpolate(group, properties), interpolate(artifact, properties))
+                     for group, artifact in entry.get('exclusions', ()))
+
+
+class EffectiveModel:
+    """Модель POM с учетом цепочки родителей (до подстановки свойств)
+
+       Свойства - ChainMap поверх свойств родителя, dependencyManagement родителя
+       не копируется, а берется по ссылке - поэтому модель потомка строится за время,
+       пропорциональное размеру его собственного POM-файла."""
+
+    def __init__(self, coordinates: Coordinates, raw: PomModel, parent: Optional['EffectiveModel']):
+        self.coordinates = coordinates
+        self.parent = parent
+        self.own_properties = raw.properties
+        self.own_managed = raw.managed
+
+        group, artifact, version = coordinates
+        builtins = {'project.groupId': group, 'project.artifactId': artifact, 'project.version': version,
+                    'pom.groupId': group, 'pom.artifactId': artifact, 'pom.version': version}
+        if parent is not None:
+            p_group, p_artifact, p_version = parent.coordinates
+            builtins.update({'project.parent.groupId': p_group, 'project.parent.artifactId': p_artifact,
+                             'project.parent.version': p_version})
+        self.builtins = builtins
+        self.properties: Mapping[str, str] = ChainMap(
+            builtins, raw.properties, *([parent.properties] if parent is not None else []))
+
+        # Собственные зависимости, затем унаследованные (кроме переопределенных)
+        own = {(d['groupId'], d['artifactId']) for d in raw.dependencies}
+        inherited = [d for d in parent.dependencies if (d['groupId'], d['artifactId']) not in own] if parent else []
+        self.dependencies: List[Dict[str, str]] = raw.dependencies + inherited
+
+        # Вычисляются по запросу (модели родителей и BOM используются многими потомками)
+        self._managed: Optional[Dict[Tuple[str, str], Dependency]] = None
+        self._referenced: Optional[Set[str]] = None
+        # BOM, импортированные при построении dependencyManagement этой модели
+        self._boms: List['EffectiveModel'] = []
+        self._closure: Optional[FrozenSet[Coordinates]] = None
+
+    def managed(self) -> Iterator[Dict[str, str]]:
+        """Все записи dependencyManagement: собственные, затем родителей"""
+
+        model: Optional[EffectiveModel] = self
+        while model is not None:
+            yield from model.own_managed
+            model = model.parent
+
+    def referenced_properties(self) -> Set[str]:
+        """Свойства, влияющие на dependencyManagement модели"""
+
+        if self._referenced is None:
+            texts = (entry.get(field, '') for entry in self.managed()
+                     for field in ('groupId', 'artifactId', 'version'))
+            self._referenced = _referenced_properties(texts, self.properties)
+        return self._referenced
+
+    def overrides(self, names: Set[str]) -> bool:
+        """Переопределяет ли модель (относительно родителя) какое-либо из свойств names"""
+
+        parent_properties = self.parent.properties if self.parent is not None else {}
+        for source in (self.builtins, self.own_properties):
+            for name, value in source.items():
+                if name in names and parent_properties.get(name) != value:
+                    return True
+        return False
+
+
+class EffectiveModelBuilder:
+    """Построение итоговых моделей POM: родители, импорт BOM и подстановка ${...}
+
+       Модели родителей и BOM строятся один раз и разделяются всеми потомками;
+       для потомка остается разобрать собственный POM и слить его с готовой моделью."""
+
+    def __init__(self, fetch_pom: Callable[[str, str, str], bytes]):
+        self._fetch_pom = fetch_pom
+        self._models: Dict[Coordinates, Optional[EffectiveModel]] = {}
+        # Построение общих моделей сериализуется: их мало, а цепочки родителей вложены
+        self._lock = threading.RLock()
+        self._building: Set[Coordinates] = set()
+
+        self.built = 0
+        self.reused = 0
+
+    def dependencies(self, data: bytes, group_id: str, artifact_id: str, version: str) -> List[Dependency]:
+        """Зависимости POM-файла с версиями из свойств, родителей и BOM
+
+           Scope и исключения, не указанные у зависимости, берутся из dependencyManagement."""
+
+        return self.resolve(data, group_id, artifact_id, version)[0]
+
+    def resolve(self, data: bytes, group_id: str, artifact_id: str,
+                version: str) -> Tuple[List[Dependency], FrozenSet[Coordinates]]:
+        """Зависимости POM-файла и координаты родителей и BOM, из которых они выведены"""
+
+        with registry.timer('pom_parse'):
+            raw = parse_model(data)
+        model = self.build(raw, (group_id, artifact_id, version))
+        managed = self.managed_dependencies(model)
+
+        result = []
+        for dependency in model.dependencies:
+            group = interpolate(dependency['groupId'], model.properties)
+            artifact = interpolate(dependency['artifactId'], model.properties)
+            entry = managed.get((group, artifact))
+            dep_version = interpolate(dependency.get('version', ''), model.properties)
+            if not dep_version and entry is not None:
+                dep_version = entry.version
+            if not dep_version or '${' in dep_version:
+                # Версию вывести не удалось - будет использована последняя
+                dep_version = "unknown"
+            scope = interpolate(dependency.get('scope', ''), model.properties) or (entry.scope if entry else '')
+            optional = interpolate(dependency.get('optional', ''), model.properties).lower() == 'true'
+            exclusions = _exclusions(dependency, model.properties) | (entry.exclusions if entry else frozenset())
+            result.append(Dependency(group, artifact, dep_version, scope or 'compile', optional, exclusions))
+        return result, self.lineage(model)
+
+    def build(self, raw: PomModel, coordinates: Coordinates) -> EffectiveModel:
+        """Модель POM поверх (общей) модели родителя
+
+           Координаты берутся из запроса: в самом POM они могут наследоваться или содержать ${...}."""
+
+        parent = self.shared(*raw.parent) if raw.parent is not None else None
+        return EffectiveModel(coordinates, raw, parent)
+
+    def shared(self, group_id: str, artifact_id: str, version: str) -> Optional[EffectiveModel]:
+        """Модель родителя или BOM из общего кэша (None - POM не найден, не разбирается или цепочка циклична)
+
+           Временная ошибка загрузки (сеть, 5xx - OSError) не запоминается и пробрасывается:
+           зависимости потомка не выводятся из неполной модели, а узел графа считается
+           не загруженным и запрашивается снова при следующем обходе."""
+
+        key = (group_id, artifact_id, version)
+        if key in self._models:
+            self.reused += 1
+            return self._models[key]
+
+        with self._lock:
+            if key in self._models:
+                self.reused += 1
+                return self._models[key]
+            if key in self._building:
+                return None
+
+            self._building.add(key)
+            try:
+                try:
+                    data = self._fetch_pom(group_id, artifact_id, version)
+                    with registry.timer('pom_parse'):
+                        raw = parse_model(data)
+                except ValueError as e:
+                    print(f"Предупреждение: не удалось получить POM {':'.join(key)}: {e}")
+                    model = None
+                else:
+                    model = self.build(raw, key)
+            finally:
+                self._building.discard(key)
+
+            self._models[key] = model
+            self.built += 1
+            return model
+
+    def managed_dependencies(self, model: EffectiveModel) -> Dict[Tuple[str, str], Dependency]:
+        """Записи dependencyManagement (версия, scope, исключения): явные, затем импортированные BOM
+
+           Пустые version / scope - не заданы. Готовая таблица родителя используется
+           повторно, если потомок не переопределяет свойства, от которых она зависит."""
+
+        if model._managed is not None:
+            return model._managed
+
+        parent = model.parent
+        if parent is not None and not model.overrides(parent.referenced_properties()):
+            entries = model.own_managed
+            inherited = self.managed_dependencies(parent)
+        else:
+            entries = list(model.managed())
+            inherited = {}
+
+        result: Dict[Tuple[str, str], Dependency] = {}
+        imports: List[Coordinates] = []
+        for entry in entries:
+            group = interpolate(entry['groupId'], model.properties)
+            artifact = interpolate(entry['artifactId'], model.properties)
+            version = interpolate(entry.get('version', ''), model.properties)
+            scope = interpolate(entry.get('scope', ''), model.properties)
+            if scope == 'import' and entry.get('type') == 'pom':
+                imports.append((group, artifact, version))
+            elif version or scope or entry.get('exclusions'):
+                result.setdefault((group, artifact), Dependency(group, artifact, version, scope, False,
+                                                                _exclusions(entry, model.properties)))
+
+        for key, managed in inherited.items():
+            result.setdefault(key, managed)
+
+        # BOM: записи интерполируются в контексте самого BOM, явные записи важнее.
+        # Модель заполняется только целиком: при временной ошибке загрузки BOM
+        # таблица будет построена заново при следующем обращении
+        boms = []
+        for coordinates in imports:
+            bom = self.shared(*coordinates) if '${' not in ''.join(coordinates) else None
+            if bom is not None:
+                boms.append(bom)
+                for key, managed in self.managed_dependencies(bom).items():
+                    result.setdefault(key, managed)
+
+        model._boms = boms
+        model._managed = result
+        return result
+
+    def lineage(self, model: EffectiveModel) -> FrozenSet[Coordinates]:
+        """Координаты родителей и BOM (транзитивно), от которых зависит модель
+
+           Если своих BOM у модели нет, возвращается общее множество родителя -
+           оно не копируется для каждого потомка."""
+
+        self.managed_dependencies(model)
+        sources = ([model.parent] if model.parent is not None else []) + model._boms
+        closures = [self._closure(source) for source in sources]
+        if len(closures) == 1:
+            return closures[0]
+        return frozenset().union(*closures)
+
+    def _closure(self, model: EffectiveModel) -> FrozenSet[Coordinates]:
+        """Общая модель вместе со своими родителями и BOM (вычисляется один раз)"""
+
+        if model._closure is None:
+            model._closure = self.lineage(model) | {model.coordinates}
+        return model._closure
+
+    def summary(self) -> Dict[str, int]:
+        return {'parent_models': self.built, 'parent_reuses': self.reused}
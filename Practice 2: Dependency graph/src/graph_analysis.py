@@ -0,0 +1,355 @@
+import re
+from collections import deque
+from typing import List, Dict, Mapping, Optional, Iterable, Iterator, Set, Tuple
+
+
+def strongly_connected_components(graph: Mapping[str, List[str]]) -> List[List[str]]:
+    """Компоненты сильной связности (алгоритм Тарьяна, итеративный, O(V + E))
+
+       Узлы, встречающиеся только как цели рёбер, считаются листьями.
+       Компоненты возвращаются в порядке завершения обхода - от «стоков» к «истокам»."""
+
+    index: Dict[str, int] = {}
+    lowlink: Dict[str, int] = {}
+    on_stack = set()
+    stack: List[str] = []
+    components: List[List[str]] = []
+    counter = 0
+
+    for start in graph:
+        if start in index:
+            continue
+
+        # Стек обхода: (узел, список детей, позиция следующего ребенка)
+        work = [(start, graph.get(start, []), 0)]
+        index[start] = lowlink[start] = counter
+        counter += 1
+        stack.append(start)
+        on_stack.add(start)
+
+        while work:
+            node, children, pos = work[-1]
+            if pos < len(children):
+                work[-1] = (node, children, pos + 1)
+                child = children[pos]
+                if child not in index:
+                    index[child] = lowlink[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, graph.get(child, []), 0))
+                elif child in on_stack:
+                    lowlink[node] = min(lowlink[node], index[child])
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+            if lowlink[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                component.reverse()
+                components.append(component)
+
+    return components
+
+
+def is_cyclic(component: List[str], graph: Mapping[str, List[str]]) -> bool:
+    """Содержит ли компонента цикл (несколько узлов или петля)"""
+
+    if len(component) > 1:
+        return True
+    node = component[0]
+    return node in graph.get(node, [])
+
+
+def component_cycle(component: List[str], graph: Mapping[str, List[str]]) -> Optional[List[str]]:
+    """Один представительный (кратчайший через первый узел) цикл компоненты: [a, b, ..., a]
+
+       BFS ведется только по рёбрам внутри компоненты, поэтому суммарно по всем
+       компонентам работа линейна."""
+
+    if not is_cyclic(component, graph):
+        return None
+
+    members = set(component)
+    start = component[0]
+    parent: Dict[str, Optional[str]] = {start: None}
+    queue = deque([start])
+
+    while queue:
+        node = queue.popleft()
+        for child in graph.get(node, []):
+            if child == start:
+                path = [node]
+                while parent[path[-1]] is not None:
+                    path.append(parent[path[-1]])
+                path.reverse()
+                return path + [start]
+            if child in members and child not in parent:
+                parent[child] = node
+                queue.append(child)
+    return None
+
+
+def condensation(components: List[List[str]],
+                 graph: Mapping[str, List[str]]) -> Dict[int, List[int]]:
+    """Граф конденсации (DAG компонент): индекс компоненты -> индексы компонент-зависимостей"""
+
+    component_of = {node: i for i, component in enumerate(components) for node in component}
+    dag: Dict[int, List[int]] = {}
+    for i, component in enumerate(components):
+        targets = set()
+        for node in component:
+            for child in graph.get(node, []):
+                target = component_of[child]
+                if target != i:
+                    targets.add(target)
+        dag[i] = sorted(targets)
+    return dag
+
+
+# Наибольшее число компонент, для которого строятся битовые метки достижимости:
+# их объем в худшем случае (цепочка) - C² / 8 байт на направление, при 10 000 - около 12 МБ
+MAX_LABELED_COMPONENTS = 10000
+
+# Номера установленных битов каждого байта и поиск ненулевых байтов (на скорости C)
+_BYTE_BITS = [tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)]
+_NONZERO_RUN = re.compile(rb'[^\x00]+')
+
+
+def _bit_members(bits: int) -> Iterator[int]:
+    """Номера установленных битов int: нулевые байты пропускаются регулярным выражением,
+       поэтому перебор стоит O(C / 8) на скорости C плюс O(число битов) на Python"""
+
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+    for run in _NONZERO_RUN.finditer(data):
+        base = run.start() * 8
+        for offset, value in enumerate(run.group()):
+            for bit in _BYTE_BITS[value]:
+                yield base + offset * 8 + bit
+
+
+class ReachabilityIndex:
+    """Индекс транзитивной достижимости на графе конденсации
+
+       Компоненты сильной связности нумеруются в порядке Тарьяна (обратный
+       топологический: потомок всегда имеет меньший номер, чем предок) - это
+       топологическая метка, по которой недостижимость часто видна сразу.
+
+       Если компонент не больше limit (по умолчанию MAX_LABELED_COMPONENTS),
+       для каждой хранятся битовые множества (int) компонент-потомков и предков:
+       построение O(V + E + E_dag * C / 64), память O(C² / 8) байт в худшем случае,
+       reaches - O(C / 64) (сдвиг int), перечисление - O(C / 8) + O(ответ).
+       Для больших графов метки не строятся (память O(C + E_dag)), а запросы
+       выполняются BFS по графу конденсации: reaches - O(C + E_dag) с отсечением
+       по топологической метке, перечисление - пропорционально достижимой части."""
+
+    def __init__(self, graph: Mapping[str, List[str]], limit: Optional[int] = MAX_LABELED_COMPONENTS):
+        self.components = strongly_connected_components(graph)
+        self.component_of: Dict[str, int] = {
+            node: i for i, component in enumerate(self.components) for node in component}
+        self._dag = condensation(self.components, graph)
+        self._cyclic = [is_cyclic(component, graph) for component in self.components]
+
+        count = len(self.components)
+        self._reverse_dag: Dict[int, List[int]] = {i: [] for i in range(count)}
+        for i, children in self._dag.items():
+            for child in children:
+                self._reverse_dag[child].append(i)
+
+        self.labeled = limit is None or count <= limit
+        self._descendants: List[int] = []
+        self._ancestors: List[int] = []
+        if not self.labeled:
+            return
+
+        # Tarjan выдает компоненты в обратном топологическом порядке: потомки - раньше
+        self._descendants = [0] * count
+        for i in range(count):
+            bits = 0
+            for child in self._dag[i]:
+                bits |= (1 << child) | self._descendants[child]
+            self._descendants[i] = bits
+
+        self._ancestors = [0] * count
+        for i in range(count - 1, -1, -1):
+            bits = 0
+            for parent in self._reverse_dag[i]:
+                bits |= (1 << parent) | self._ancestors[parent]
+            self._ancestors[i] = bits
+
+    def __contains__(self, node: str) -> bool:
+        return node in self.component_of
+
+    def component_descendants(self, component: int) -> int:
+        """Битовое множество компонент, достижимых из компоненты (без нее самой); только с метками"""
+
+        if not self.labeled:
+            raise ValueError("Индекс построен без битовых меток (слишком много компонент)")
+        return self._descendants[component]
+
+    def reaches(self, source: str, target: str) -> bool:
+        """Зависит ли source (транзитивно) от target"""
+
+        a, b = self.component_of[source], self.component_of[target]
+        if a == b:
+            return source != target or self._cyclic[a]
+        if b > a:
+            # Потомок всегда имеет меньший номер
+            return False
+        if self.labeled:
+            return bool(self._descendants[a] >> b & 1)
+
+        # BFS с отсечением компонент, номер которых меньше цели (из них она недостижима)
+        seen = {a}
+        queue = deque([a])
+        while queue:
+            for child in self._dag[queue.popleft()]:
+                if child == b:
+                    return True
+                if child > b and child not in seen:
+                    seen.add(child)
+                    queue.append(child)
+        return False
+
+    def descendants(self, node: str) -> List[str]:
+        """Все узлы, от которых node зависит транзитивно (без самого node)"""
+
+        return self._expand(node, self._descendants, self._dag)
+
+    def ancestors(self, node: str) -> List[str]:
+        """Все узлы, транзитивно зависящие от node (без самого node)"""
+
+        return self._expand(node, self._ancestors, self._reverse_dag)
+
+    def _expand(self, node: str, labels: List[int], dag: Mapping[int, List[int]]) -> List[str]:
+        own = self.component_of[node]
+        result = [member for member in self.components[own] if member != node]
+        if self.labeled:
+            members: Iterable[int] = _bit_members(labels[own])
+        else:
+            members = self._reachable_components(own, dag)
+        for i in members:
+            result.extend(self.components[i])
+        return result
+
+    @staticmethod
+    def _reachable_components(start: int, dag: Mapping[int, List[int]]) -> List[int]:
+        seen = {start}
+        queue = deque([start])
+        result = []
+        while queue:
+            for child in dag[queue.popleft()]:
+                if child not in seen:
+                    seen.add(child)
+                    result.append(child)
+                    queue.append(child)
+        return result
+
+
+def bidirectional_shortest_path(graph: Mapping[str, List[str]], reverse: Mapping[str, List[str]],
+                                source: str, targets: Iterable[str],
+                                banned_nodes: Optional[Set[str]] = None,
+                                banned_edges: Optional[Set[Tuple[str, str]]] = None) -> Optional[List[str]]:
+    """Кратчайший путь от source до любого из targets двунаправленным BFS
+
+       Поиск ведется одновременно вперед по graph и назад по reverse, каждый раз
+       расширяется меньший фронт; поиск завершается на уровне первой встречи фронтов.
+       banned_nodes / banned_edges исключаются из поиска (нужно для k кратчайших путей)."""
+
+    banned_nodes = banned_nodes or set()
+    banned_edges = banned_edges or set()
+    targets = [t for t in targets if t not in banned_nodes]
+    if source in banned_nodes or not targets:
+        return None
+    if source in targets:
+        return [source]
+
+    # Родители вперед (узел -> предыдущий) и назад (узел -> следующий к цели)
+    forward: Dict[str, Optional[str]] = {source: None}
+    backward: Dict[str, Optional[str]] = {t: None for t in targets}
+    forward_level = [source]
+    backward_level = list(targets)
+
+    while forward_level and backward_level:
+        meet: Optional[str] = None
+        if len(forward_level) <= len(backward_level):
+            next_level = []
+            for node in forward_level:
+                for child in graph.get(node, []):
+                    if child in forward or child in banned_nodes or (node, child) in banned_edges:
+                        continue
+                    forward[child] = node
+                    next_level.append(child)
+                    if meet is None and child in backward:
+                        meet = child
+            forward_level = next_level
+        else:
+            next_level = []
+            for node in backward_level:
+                for parent in reverse.get(node, []):
+                    if parent in backward or parent in banned_nodes or (parent, node) in banned_edges:
+                        continue
+                    backward[parent] = node
+                    next_level.append(parent)
+                    if meet is None and parent in forward:
+                        meet = parent
+            backward_level = next_level
+
+        if meet is not None:
+            path = [meet]
+            while forward[path[-1]] is not None:
+                path.append(forward[path[-1]])
+            path.reverse()
+            node = meet
+            while backward[node] is not None:
+                node = backward[node]
+                path.append(node)
+            return path
+
+    return None
+
+
+def k_shortest_paths(graph: Mapping[str, List[str]], reverse: Mapping[str, List[str]],
+                     source: str, targets: Iterable[str], k: int) -> List[List[str]]:
+    """k кратчайших простых путей от source до targets (алгоритм Йена)
+
+       Каждый кандидат ищется двунаправленным BFS с запретом уже использованных
+       ответвлений; пути упорядочены по длине."""
+
+    targets = list(targets)
+    first = bidirectional_shortest_path(graph, reverse, source, targets)
+    if first is None:
+        return []
+
+    paths = [first]
+    candidates: List[List[str]] = []
+    while len(paths) < k:
+        previous = paths[-1]
+        for i in range(len(previous) - 1):
+            spur_node = previous[i]
+            root_path = previous[:i + 1]
+
+            banned_edges = {(p[i], p[i + 1]) for p in paths if len(p) > i + 1 and p[:i + 1] == root_path}
+            banned_nodes = set(root_path[:-1])
+
+            spur = bidirectional_shortest_path(graph, reverse, spur_node, targets, banned_nodes, banned_edges)
+            if spur is not None:
+                candidate = root_path[:-1] + spur
+                if candidate not in candidates and candidate not in paths:
+                    candidates.append(candidate)
+
+        if not candidates:
+            break
+        candidates.sort(key=lambda p: (len(p), p))
+        paths.append(candidates.pop(0))
+
+    return paths
@@ -0,0 +1,260 @@
+import argparse
+import json
+import sys
+from typing import List, Dict, Iterable, Callable, Tuple, Any, Optional
+import numpy as np
+
+
+# Узлы с числом рёбер больше «среднее + Z стандартных отклонений» считаются выбросами
+DEFAULT_Z = 3.0
+DEFAULT_TOP = 10
+
+
+def _pack_strings(strings: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Строки в один UTF-8 буфер и массив смещений (вместо массива str - без выравнивания по длине)"""
+
+    encoded = [s.encode('utf-8') for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+
+def _intern(values: Iterable[str], table: Dict[str, int]) -> Iterable[int]:
+    for value in values:
+        idx = table.get(value)
+        if idx is None:
+            idx = table[value] = len(table)
+        yield idx
+
+
+class CsrGraph:
+    """Граф зависимостей в формате CSR (массивы NumPy) для векторизованной аналитики
+
+       Рёбра узла i - indices[indptr[i]:indptr[i + 1]]. Имена узлов, пакеты
+       (group:artifact) и версии хранятся упакованными строками, узел ссылается
+       на пакет и версию номером (package_of, version_of)."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.indptr = arrays['indptr']
+        self.indices = arrays['indices']
+        self.roots = arrays['roots']
+        self.package_of = arrays['package_of']
+        self.version_of = arrays['version_of']
+        self._arrays = arrays
+
+    @classmethod
+    def from_adjacency(cls, adjacency: Dict[str, List[str]], coordinates: Callable[[str], Tuple[str, str, str]],
+                       roots: List[str]) -> 'CsrGraph':
+        """Построение по словарю смежности; узлы без рёбер (листья) добавляются в конец"""
+
+        index: Dict[str, int] = {node_id: i for i, node_id in enumerate(adjacency)}
+        for children in adjacency.values():
+            for child in children:
+                if child not in index:
+                    index[child] = len(index)
+        names = list(index)
+
+        counts = np.zeros(len(names) + 1, dtype=np.int64)
+        counts[1:len(adjacency) + 1] = [len(children) for children in adjacency.values()]
+        indptr = np.cumsum(counts)
+        indices = np.fromiter((index[child] for children in adjacency.values() for child in children),
+                              dtype=np.int32, count=int(indptr[-1]))
+
+        packages: Dict[str, int] = {}
+        versions: Dict[str, int] = {}
+        coords = [coordinates(node_id) for node_id in names]
+        package_of = np.fromiter(_intern((f"{g}:{a}" for g, a, _ in coords), packages), dtype=np.int32, count=len(names))
+        version_of = np.fromiter(_intern((v for _, _, v in coords), versions), dtype=np.int32, count=len(names))
+
+        arrays = {'indptr': indptr, 'indices': indices, 'package_of': package_of, 'version_of': version_of,
+                  'roots': np.array([index[root] for root in roots if root in index], dtype=np.int32)}
+        for key, strings in (('names', names), ('packages', packages), ('versions', versions)):
+            arrays[f"{key}_data"], arrays[f"{key}_offsets"] = _pack_strings(strings)
+        return cls(arrays)
+
+    @classmethod
+    def load(cls, path: str) -> 'CsrGraph':
+        with np.load(path) as data:
+            return cls({key: data[key] for key in data.files})
+
+    def save(self, path: str) -> None:
+        """Запись в .npz (без сжатия - загрузка массивов без распаковки)"""
+
+        with open(path, 'wb') as f:
+            np.savez(f, **self._arrays)
+
+    @property
+    def node_count(self) -> int:
+        return len(self.indptr) - 1
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.indices)
+
+    def _string(self, key: str, i: int) -> str:
+        offsets = self._arrays[f"{key}_offsets"]
+        return self._arrays[f"{key}_data"][offsets[i]:offsets[i + 1]].tobytes().decode('utf-8')
+
+    def name(self, node: int) -> str:
+        return self._string('names', node)
+
+    def package(self, package: int) -> str:
+        return self._string('packages', package)
+
+    def version(self, node: int) -> str:
+        return self._string('versions', int(self.version_of[node]))
+
+    @property
+    def package_count(self) -> int:
+        return len(self._arrays['packages_offsets']) - 1
+
+    @property
+    def version_count(self) -> int:
+        return len(self._arrays['versions_offsets']) - 1
+
+
+def bfs_depths(csr: CsrGraph, sources: np.ndarray) -> np.ndarray:
+    """Глубина каждого узла от sources (-1 - недостижим): BFS, векторизованный по уровням"""
+
+    depth = np.full(csr.node_count, -1, dtype=np.int32)
+    frontier = np.unique(sources.astype(np.int64))
+    depth[frontier] = 0
+    level = 0
+    while frontier.size:
+        starts = csr.indptr[frontier]
+        counts = csr.indptr[frontier + 1] - starts
+        total = int(counts.sum())
+        if not total:
+            break
+        # Позиции всех рёбер фронта: starts[i] .. starts[i] + counts[i] - 1
+        positions = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)
+        neighbors = csr.indices[positions]
+        frontier = np.unique(neighbors[depth[neighbors] < 0]).astype(np.int64)
+        level += 1
+        depth[frontier] = level
+    return depth
+
+
+def top_nodes(values: np.ndarray, k: int) -> np.ndarray:
+    """Номера k узлов с наибольшими значениями (по убыванию; при равенстве - по номеру)"""
+
+    k = min(k, len(values))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    candidates = np.argpartition(-values, k - 1)[:k]
+    return candidates[np.lexsort((candidates, -values[candidates]))]
+
+
+def outliers(values: np.ndarray, z: float) -> Tuple[float, np.ndarray]:
+    """Порог «среднее + z·σ» и узлы выше него, по убыванию значения"""
+
+    threshold = float(values.mean() + z * values.std()) if len(values) else 0.0
+    selected = np.flatnonzero(values > threshold)
+    return threshold, selected[np.lexsort((selected, -values[selected]))]
+
+
+def multi_version_packages(csr: CsrGraph) -> Tuple[np.ndarray, np.ndarray]:
+    """Пакеты, присутствующие в графе в нескольких версиях: (номера пакетов, число версий) по убыванию"""
+
+    pairs = np.unique(csr.package_of.astype(np.int64) * max(csr.version_count, 1) + csr.version_of)
+    counts = np.bincount(pairs // max(csr.version_count, 1), minlength=csr.package_count)
+    selected = np.flatnonzero(counts > 1)
+    order = np.lexsort((selected, -counts[selected]))
+    return selected[order], counts[selected[order]]
+
+
+def analyze(csr: CsrGraph, top: int = DEFAULT_TOP, z: float = DEFAULT_Z) -> Dict[str, Any]:
+    """Отчет по графу: глубины, самые используемые пакеты, выбросы по fan-in / fan-out, несколько версий"""
+
+    fan_in = np.bincount(csr.indices, minlength=csr.node_count)
+    fan_out = np.diff(csr.indptr)
+
+    sources = csr.roots if len(csr.roots) else np.flatnonzero(fan_in == 0)
+    depth = bfs_depths(csr, sources)
+    reachable = depth >= 0
+    depth_counts = np.bincount(depth[reachable]) if reachable.any() else np.zeros(0, dtype=np.int64)
+
+    def nodes(selected: np.ndarray, values: np.ndarray, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        return [{'node': csr.name(int(i)), 'count': int(values[i])} for i in selected[:limit]]
+
+    in_threshold, in_outliers = outliers(fan_in, z)
+    out_threshold, out_outliers = outliers(fan_out, z)
+    packages, version_counts = multi_version_packages(csr)
+
+    multi_version = []
+    for package, count in zip(packages[:top], version_counts[:top]):
+        members = np.flatnonzero(csr.package_of == package)
+        versions = sorted({csr.version(int(i)) for i in members})
+        multi_version.append({'package': csr.package(int(package)), 'count': int(count), 'versions': versions})
+
+    return {
+        'nodes': csr.node_count,
+        'edges': csr.edge_count,
+        'roots': [csr.name(int(i)) for i in csr.roots],
+        'reachable': int(reachable.sum()),
+        'max_depth': int(len(depth_counts) - 1),
+        'depth_histogram': {int(d): int(n) for d, n in enumerate(depth_counts)},
+        'mean_fan_out': round(float(fan_out.mean()), 3) if csr.node_count else 0.0,
+        'most_depended_on': nodes(top_nodes(fan_in, top), fan_in),
+        'largest_fan_out': nodes(top_nodes(fan_out, top), fan_out),
+        'fan_in_outliers': {'threshold': round(in_threshold, 2), 'total': int(len(in_outliers)),
+                            'nodes': nodes(in_outliers, fan_in, top)},
+        'fan_out_outliers': {'threshold': round(out_threshold, 2), 'total': int(len(out_outliers)),
+                             'nodes': nodes(out_outliers, fan_out, top)},
+        'multi_version_packages': {'total': int(len(packages)), 'packages': multi_version},
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"Узлов: {report['nodes']}, рёбер: {report['edges']}, корней: {len(report['roots'])}, "
+          f"достижимо от корней: {report['reachable']}")
+    print(f"Максимальная глубина: {report['max_depth']}, среднее число зависимостей: {report['mean_fan_out']}")
+
+    print("\nРаспределение по глубине:")
+    for depth, count in report['depth_histogram'].items():
+        print(f"  {depth:>4}: {count}")
+
+    for key, title in (('most_depended_on', "Самые используемые пакеты (число зависящих)"),
+                       ('largest_fan_out', "Пакеты с наибольшим числом зависимостей")):
+        print(f"\n{title}:")
+        for i, item in enumerate(report[key], 1):
+            print(f"{i:3d}. {item['node']:<60} {item['count']}")
+
+    for key, title in (('fan_in_outliers', "Выбросы по числу зависящих"),
+                       ('fan_out_outliers', "Выбросы по числу зависимостей")):
+        section = report[key]
+        print(f"\n{title} (больше {section['threshold']}): {section['total']}")
+        for item in section['nodes']:
+            print(f"     {item['node']:<60} {item['count']}")
+
+    section = report['multi_version_packages']
+    print(f"\nПакеты в нескольких версиях: {section['total']}")
+    for item in section['packages']:
+        print(f"     {item['package']:<50} {', '.join(item['versions'])}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Аналитика графа зависимостей по выгрузке CSR (--export-csr)')
+    parser.add_argument('graph', help='Файл .npz с графом в формате CSR')
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP, help=f'Размер списков (по умолчанию: {DEFAULT_TOP})')
+    parser.add_argument('--z', type=float, default=DEFAULT_Z,
+                        help=f'Порог выбросов в стандартных отклонениях (по умолчанию: {DEFAULT_Z})')
+    parser.add_argument('--format', choices=['text', 'json'], default='text', help='Формат отчета')
+    args = parser.parse_args()
+
+    try:
+        csr = CsrGraph.load(args.graph)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Ошибка: не удалось загрузить граф {args.graph}: {e}")
+        sys.exit(1)
+
+    report = analyze(csr, args.top, args.z)
+    if args.format == 'json':
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import argparse
+import random
+import sys
+from typing import List, Tuple, Iterator
+
+
+# Формы синтетических графов
+SHAPES = ('fanout', 'chain', 'cycles', 'diamond')
+
+
+def node_name(i: int) -> str:
+    return f"N{i}"
+
+
+def fanout_graph(nodes: int, degree: int, rng: random.Random) -> Iterator[Tuple[int, List[int]]]:
+    """Широкое дерево: у каждого узла degree детей (корень N0)"""
+
+    for i in range(nodes):
+        first = i * degree + 1
+        yield i, list(range(first, min(first + degree, nodes)))
+
+
+def chain_graph(nodes: int, degree: int, rng: random.Random) -> Iterator[Tuple[int, List[int]]]:
+    """Глубокая цепочка N0 -> N1 -> ... с degree - 1 случайными «перескоками» вперед"""
+
+    for i in range(nodes):
+        children = [i + 1] if i + 1 < nodes else []
+        if i + 2 < nodes:
+            children += rng.sample(range(i + 2, nodes), min(degree - 1, nodes - i - 2))
+        yield i, children
+
+
+def cycles_graph(nodes: int, degree: int, rng: random.Random) -> Iterator[Tuple[int, List[int]]]:
+    """Плотные циклы: цепочка по всем узлам плюс degree - 1 рёбер к произвольным узлам (и назад тоже)"""
+
+    for i in range(nodes):
+        children = [i + 1] if i + 1 < nodes else [0]
+        extra = {rng.randrange(nodes) for _ in range(degree - 1)} - {i, children[0]}
+        yield i, children + sorted(extra)
+
+
+def diamond_graph(nodes: int, degree: int, rng: random.Random) -> Iterator[Tuple[int, List[int]]]:
+    """Слоистый DAG с множеством «ромбов»: узел слоя зависит от degree узлов следующего слоя
+
+       Ширина слоя - около sqrt(nodes); корень N0 зависит от всего первого слоя."""
+
+    width = max(1, int(nodes ** 0.5))
+    yield 0, list(range(1, min(1 + width, nodes)))
+    for i in range(1, nodes):
+        layer_start = 1 + (i - 1) // width * width
+        next_start = layer_start + width
+        if next_start >= nodes:
+            yield i, []
+            continue
+        next_end = min(next_start + width, nodes)
+        # Узел в той же позиции следующего слоя - чтобы весь слой был достижим
+        same = min(next_start + (i - layer_start), next_end - 1)
+        others = {rng.randrange(next_start, next_end) for _ in range(degree - 1)} - {same}
+        yield i, [same] + sorted(others)
+
+
+_GENERATORS = {'fanout': fanout_graph, 'chain': chain_graph, 'cycles': cycles_graph, 'diamond': diamond_graph}
+
+
+def generate(shape: str, nodes: int, degree: int = 3, seed: int = 0) -> Iterator[Tuple[str, List[str]]]:
+    """Узлы синтетического графа (имя, зависимости) в порядке номеров; N0 - корень"""
+
+    if shape not in _GENERATORS:
+        raise ValueError(f"Неизвестная форма графа: {shape}")
+    if nodes < 1 or degree < 1:
+        raise ValueError("Количество узлов и степень должны быть положительными")
+
+    rng = random.Random(seed)
+    for i, children in _GENERATORS[shape](nodes, degree, rng):
+        yield node_name(i), [node_name(child) for child in children]
+
+
+def write_repository(path: str, shape: str, nodes: int, degree: int = 3, seed: int = 0) -> int:
+    """Запись графа в формате тестового репозитория (потоково). Возвращает число рёбер"""
+
+    edges = 0
+    with open(path, 'w', encoding='utf-8') as out:
+        out.write(f"# Синтетический граф: shape={shape}, nodes={nodes}, degree={degree}, seed={seed}\n")
+        chunk: List[str] = []
+        for name, children in generate(shape, nodes, degree, seed):
+            chunk.append(f"{name} -> {', '.join(children)}")
+            edges += len(children)
+            if len(chunk) >= 4096:
+                out.write('\n'.join(chunk) + '\n')
+                chunk = []
+        if chunk:
+            out.write('\n'.join(chunk) + '\n')
+    return edges
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Генератор синтетических тестовых репозиториев')
+    parser.add_argument('--shape', choices=SHAPES, required=True, help='Форма графа')
+    parser.add_argument('--nodes', '-n', type=int, required=True, help='Количество узлов')
+    parser.add_argument('--degree', type=int, default=3, help='Зависимостей на узел (по умолчанию: 3)')
+    parser.add_argument('--seed', type=int, default=0, help='Начальное значение генератора случайных чисел')
+    parser.add_argument('--output', '-o', required=True, help='Файл тестового репозитория')
+    args = parser.parse_args()
+
+    try:
+        edges = write_repository(args.output, args.shape, args.nodes, args.degree, args.seed)
+    except ValueError as e:
+        print(f"Ошибка: {e}")
+        sys.exit(1)
+    print(f"Сгенерирован {args.output}: узлов {args.nodes}, рёбер {edges} (корень {node_name(0)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import json
+from typing import List, Dict, Iterable, Iterator, Mapping, Optional, TextIO, Tuple
+
+
+# Поддерживаемые форматы вывода графа и обратных зависимостей
+OUTPUT_FORMATS = ('tree', 'json', 'ndjson')
+
+# Количество строк, накапливаемых перед одной записью в поток
+BUFFER_LINES = 1024
+
+
+class BufferedWriter:
+    """Запись строк в поток порциями (одним write на BUFFER_LINES строк)"""
+
+    def __init__(self, out: TextIO, buffer_lines: int = BUFFER_LINES):
+        self.out = out
+        self.buffer_lines = buffer_lines
+        self._lines: List[str] = []
+
+    def write_line(self, line: str) -> None:
+        self._lines.append(line)
+        if len(self._lines) >= self.buffer_lines:
+            self.flush()
+
+    def write_lines(self, lines: Iterable[str]) -> None:
+        for line in lines:
+            self.write_line(line)
+
+    def flush(self) -> None:
+        if self._lines:
+            self.out.write('\n'.join(self._lines) + '\n')
+            self._lines = []
+        self.out.flush()
+
+    def __enter__(self) -> 'BufferedWriter':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.flush()
+
+
+def edge_label(attributes: Optional[Tuple[str, bool]]) -> str:
+    """Пометка ребра с нестандартными атрибутами: «  [test]», «  [runtime, optional]»"""
+
+    if attributes is None:
+        return ""
+    scope, optional = attributes
+    return "  [" + ", ".join([scope] + (["optional"] if optional else [])) + "]"
+
+
+def tree_lines(graph: Mapping[str, List[str]], root_id: str, visited: Optional[set] = None,
+               edge_attributes: Optional[Mapping[Tuple[str, str], Tuple[str, bool]]] = None) -> Iterator[str]:
+    """Строки дерева зависимостей (итеративный DFS, порядок - как у рекурсивного обхода)
+
+       Повторно встреченные узлы выводятся с пометкой «(повтор)» и не раскрываются;
+       рёбра с scope, отличным от compile, и optional - с пометкой атрибутов."""
+
+    visited = visited if visited is not None else set()
+    edge_attributes = edge_attributes or {}
+    stack: List[Tuple[str, str, Optional[str]]] = [(root_id, "", None)]
+
+    while stack:
+        node, indent, parent = stack.pop()
+        label = edge_label(edge_attributes.get((parent, node))) if parent is not None else ""
+        if node in visited:
+            yield indent + f"↳ {node}  (повтор){label}"
+            continue
+        visited.add(node)
+
+        yield indent + f"{node}{label}"
+
+        child_indent = indent + "   "
+        stack.extend((child, child_indent, node) for child in reversed(graph.get(node, [])))
+
+
+def node_record(node_id: str, coordinates: Tuple[str, str, str], dependencies: List[str],
+                edge_attributes: Optional[Mapping[Tuple[str, str], Tuple[str, bool]]] = None) -> Dict[str, object]:
+    """Описание узла графа для JSON-форматов
+
+       Рёбра с нестандартными атрибутами перечисляются в 'edges': {зависимость: {scope, optional}}."""
+
+    group, artifact, version = coordinates
+    record: Dict[str, object] = {'id': node_id, 'group': group, 'artifact': artifact, 'version': version,
+                                 'dependencies': dependencies}
+    if edge_attributes:
+        edges = {}
+        for child in dependencies:
+            attributes = edge_attributes.get((node_id, child))
+            if attributes is not None:
+                edges[child] = {'scope': attributes[0], 'optional': attributes[1]}
+        if edges:
+            record['edges'] = edges
+    return record
+
+
+def json_document_lines(header: Dict[str, object], key: str, items: Iterable[object]) -> Iterator[str]:
+    """JSON-документ {..header, key: [items]}, выдаваемый построчно - по элементу на строку
+
+       Элементы сериализуются по одному, поэтому весь документ в памяти не строится."""
+
+    head = json.dumps(header, ensure_ascii=False)
+    prefix = head[:-1] + (', ' if header else '') + json.dumps(key) + ': ['
+    first = True
+    for item in items:
+        line = json.dumps(item, ensure_ascii=False)
+        if first:
+            yield prefix
+            first = False
+        else:
+            line = ',' + line
+        yield line
+    if first:
+        yield prefix + ']}'
+    else:
+        yield ']}'
+
+
+def ndjson_lines(items: Iterable[object]) -> Iterator[str]:
+    """По одному JSON-объекту на строку"""
+
+    for item in items:
+        yield json.dumps(item, ensure_ascii=False)
@@ -0,0 +1,185 @@
+import heapq
+from typing import List, Dict, Mapping, Callable, Optional, Tuple, Set
+from graph_analysis import ReachabilityIndex, condensation, MAX_LABELED_COMPONENTS
+
+
+# Режимы упрощения графа перед визуализацией (порядок применения - см. reduce_graph)
+REDUCTIONS = ('versions', 'groups', 'transitive')
+
+Coordinates = Callable[[str], Tuple[str, str, str]]
+
+
+def relabel(graph: Mapping[str, List[str]], label: Callable[[str], str]) -> Dict[str, List[str]]:
+    """Склейка узлов с одинаковой меткой: рёбра объединяются, петли отбрасываются"""
+
+    result: Dict[str, List[str]] = {}
+    seen: Dict[str, set] = {}
+    for node, children in graph.items():
+        source = label(node)
+        targets = result.setdefault(source, [])
+        known = seen.setdefault(source, set())
+        for child in children:
+            target = label(child)
+            result.setdefault(target, [])
+            seen.setdefault(target, set())
+            if target != source and target not in known:
+                known.add(target)
+                targets.append(target)
+    return result
+
+
+def drop_versions(graph: Mapping[str, List[str]], coordinates: Coordinates) -> Dict[str, List[str]]:
+    """Все версии артефакта - один узел group:artifact"""
+
+    def label(node: str) -> str:
+        group, artifact, _ = coordinates(node)
+        return f"{group}:{artifact}" if artifact else group
+
+    return relabel(graph, label)
+
+
+def collapse_groups(graph: Mapping[str, List[str]], coordinates: Coordinates) -> Dict[str, List[str]]:
+    """Все артефакты одного groupId - один узел-кластер groupId"""
+
+    return relabel(graph, lambda node: coordinates(node)[0])
+
+
+def transitive_reduction(graph: Mapping[str, List[str]],
+                         limit: Optional[int] = MAX_LABELED_COMPONENTS) -> Dict[str, List[str]]:
+    """Транзитивное сокращение на графе конденсации
+
+       Ребро между компонентами сильной связности удаляется, если цель достижима
+       через другого ребенка. Рёбра внутри циклических компонент сохраняются.
+       Пока компонент не больше limit, используются битовые множества потомков
+       ReachabilityIndex: O(V + E + E_dag * C / 64) времени, O(C² / 8) байт памяти.
+       Для больших графов достижимость проверяется обходом от детей компоненты,
+       ограниченным топологическими метками: память O(C + E_dag), время -
+       пропорционально части графа между детьми и самым «глубоким» ребенком."""
+
+    index = ReachabilityIndex(graph, limit=limit)
+    component_of = index.component_of
+    dag = condensation(index.components, graph)
+
+    # Дети с большим индексом (Tarjan) не достижимы из детей с меньшим - идем от больших
+    kept = set()
+    for component, children in dag.items():
+        if len(children) < 2:
+            kept.update((component, child) for child in children)
+        elif index.labeled:
+            covered = 0
+            for child in sorted(children, reverse=True):
+                if covered >> child & 1:
+                    continue
+                kept.add((component, child))
+                covered |= (1 << child) | index.component_descendants(child)
+        else:
+            kept.update((component, child) for child in _direct_children(children, dag))
+
+    result: Dict[str, List[str]] = {}
+    emitted = set()
+    for node in _nodes(graph):
+        result.setdefault(node, [])
+    for node, children in graph.items():
+        source = component_of[node]
+        for child in children:
+            target = component_of[child]
+            if source == target:
+                result[node].append(child)
+            elif (source, target) in kept and (source, target) not in emitted:
+                # Одно представительное ребро на пару компонент
+                emitted.add((source, target))
+                result[node].append(child)
+    return result
+
+
+def _direct_children(children: List[int], dag: Mapping[int, List[int]]) -> List[int]:
+    """Дети компоненты, не достижимые через других ее детей (без битовых меток)
+
+       Обход идет от оставленных детей по убыванию номера компоненты: путь из ребенка
+       к цели проходит только через компоненты с большими номерами, поэтому, когда
+       они раскрыты, достижимость цели уже известна. Остальное ждет в куче до
+       следующего, меньшего ребенка - каждая компонента раскрывается один раз."""
+
+    seen: Set[int] = set()
+    pending: List[int] = []
+    result = []
+    for child in sorted(children, reverse=True):
+        while pending and -pending[0] > child:
+            for target in dag[-heapq.heappop(pending)]:
+                if target not in seen:
+                    seen.add(target)
+                    heapq.heappush(pending, -target)
+        if child in seen:
+            continue
+        result.append(child)
+        seen.add(child)
+        heapq.heappush(pending, -child)
+    return result
+
+
+def top_k_by_fan_in(graph: Mapping[str, List[str]], roots: List[str], k: int) -> Dict[str, List[str]]:
+    """Сводка: корни и k узлов с наибольшим числом входящих рёбер (fan-in)
+
+       Ребро u -> v в результате означает транзитивную зависимость u от v
+       в исходном графе; затем граф транзитивно сокращается."""
+
+    fan_in: Dict[str, int] = {}
+    for node, children in graph.items():
+        fan_in.setdefault(node, 0)
+        for child in set(children):
+            fan_in[child] = fan_in.get(child, 0) + 1
+
+    top = sorted(fan_in, key=lambda node: (-fan_in[node], node))[:k]
+    kept = [root for root in roots if root in fan_in]
+    kept += [node for node in top if node not in kept]
+
+    index = ReachabilityIndex(graph)
+    component_of = index.component_of
+
+    # Узлы одной компоненты сильной связности достижимы друг из друга - их достаточно
+    # связать одним циклом вместо полного подграфа
+    members: Dict[int, List[str]] = {}
+    for node in kept:
+        members.setdefault(component_of[node], []).append(node)
+
+    summary: Dict[str, List[str]] = {}
+    for u in kept:
+        own = members[component_of[u]]
+        children = [own[(own.index(u) + 1) % len(own)]] if len(own) > 1 else []
+        # Одно перечисление потомков на узел сводки (без меток индекса - BFS), а не k проверок
+        reachable = set(index.descendants(u))
+        children += [v for v in kept if component_of[v] != component_of[u] and v in reachable]
+        summary[u] = children
+    return transitive_reduction(summary)
+
+
+def reduce_graph(graph: Mapping[str, List[str]], coordinates: Coordinates, modes: List[str],
+                 roots: Optional[List[str]] = None, top_k: Optional[int] = None) -> Dict[str, List[str]]:
+    """Применение выбранных упрощений: top-k, затем versions или groups, затем transitive
+
+       Склейка по groupId поглощает склейку версий, поэтому при обоих режимах
+       применяется только она."""
+
+    result: Mapping[str, List[str]] = graph
+    if top_k:
+        result = top_k_by_fan_in(result, roots or [], top_k)
+    if 'groups' in modes:
+        result = collapse_groups(result, coordinates)
+    elif 'versions' in modes:
+        result = drop_versions(result, coordinates)
+    if 'transitive' in modes:
+        result = transitive_reduction(result)
+    return dict(result)
+
+
+def edge_count(graph: Mapping[str, List[str]]) -> int:
+    return sum(len(children) for children in graph.values())
+
+
+def _nodes(graph: Mapping[str, List[str]]) -> List[str]:
+    """Все узлы графа, включая встречающиеся только как цели рёбер"""
+
+    nodes = dict.fromkeys(graph)
+    for children in graph.values():
+        nodes.update(dict.fromkeys(children))
+    return list(nodes)
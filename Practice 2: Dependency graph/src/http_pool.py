@@ -0,0 +1,374 @@
+import gzip
+import zlib
+import random
+import threading
+import time
+import http.client
+import urllib.error
+import urllib.parse
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional, Tuple, Any
+from metrics import registry
+
+
+# Ошибки, при которых повторно используемое соединение считается «протухшим»
+_STALE_ERRORS = (http.client.RemoteDisconnected, http.client.BadStatusLine,
+                 ConnectionResetError, BrokenPipeError)
+
+_REDIRECT_CODES = (301, 302, 303, 307, 308)
+_MAX_REDIRECTS = 5
+
+# Ответы, после которых запрос повторяется (перегрузка и временная недоступность сервера)
+_RETRY_CODES = (429, 500, 502, 503, 504)
+# Начальная и наибольшая пауза между повторами (сек); Retry-After ограничивается MAX_RETRY_AFTER
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+MAX_RETRY_AFTER = 120.0
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Пауза из заголовка Retry-After: число секунд или HTTP-дата (None - заголовка нет или он некорректен)"""
+
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+class HttpResponse:
+    """Полностью прочитанный (и распакованный) ответ сервера"""
+
+    def __init__(self, url: str, status: int, headers: http.client.HTTPMessage, body: bytes):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+
+class TokenBucket:
+    """Ограничитель частоты запросов к одному хосту (token bucket)
+
+       rate - запросов в секунду (None - без ограничения), burst - запас для всплеска.
+       Токены резервируются заранее: ожидающие потоки обслуживаются по очереди.
+       defer() приостанавливает все запросы к хосту (ответ 429 / 503 с Retry-After)."""
+
+    def __init__(self, rate: Optional[float], burst: int):
+        self.rate = rate
+        self.capacity = float(max(1, burst))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Дождаться разрешения на запрос; возвращает время ожидания (сек)"""
+
+        with self._lock:
+            now = time.monotonic()
+            wait = max(0.0, self._blocked_until - now)
+            if self.rate:
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                self._tokens -= 1
+                if self._tokens < 0:
+                    wait = max(wait, -self._tokens / self.rate)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def defer(self, seconds: float) -> None:
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+
+class _Call:
+    """Выполняющийся запрос, результат которого ожидают совпадающие запросы других потоков"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response: Optional['HttpResponse'] = None
+        self.error: Optional[BaseException] = None
+
+    def wait(self) -> 'HttpResponse':
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.response
+
+
+class HttpConnectionPool:
+    """Пул постоянных (keep-alive) HTTP/HTTPS-соединений с разбивкой по хостам
+
+       Пул потокобезопасен: число одновременных соединений к одному хосту
+       ограничено max_per_host, свободные соединения переиспользуются.
+       Запросы отправляются с Accept-Encoding: gzip, ответы распаковываются прозрачно.
+       Одинаковые одновременные запросы объединяются (выполняется один), частота
+       запросов к хосту ограничивается rate, а ответы 429 / 5xx и сетевые ошибки
+       повторяются до retries раз с экспоненциальной паузой со случайным разбросом
+       (или паузой из Retry-After). Ошибки приводятся к urllib.error.HTTPError /
+       URLError, как у urlopen."""
+
+    def __init__(self, max_per_host: int = 4, timeout: float = 30.0,
+                 retries: int = 3, rate: Optional[float] = None):
+        self.max_per_host = max(1, max_per_host)
+        self.timeout = timeout
+        self.retries = max(0, retries)
+        self.rate = rate
+
+        self._lock = threading.Lock()
+        self._idle: Dict[Tuple[str, str, int], List[http.client.HTTPConnection]] = {}
+        self._slots: Dict[Tuple[str, str, int], threading.BoundedSemaphore] = {}
+        self._buckets: Dict[Tuple[str, str, int], TokenBucket] = {}
+        self._inflight: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], _Call] = {}
+        self._random = random.Random()
+
+        # Статистика работы пула
+        self.requests = 0
+        self.connections_opened = 0
+        self.connections_reused = 0
+        self.bytes_received = 0
+        self.bytes_decoded = 0
+        self.gzip_responses = 0
+        self.coalesced = 0
+        self.retried = 0
+        self.throttled = 0
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> HttpResponse:
+        """GET-запрос с переходом по перенаправлениям и повторами
+
+           Если такой же запрос (URL и заголовки) уже выполняется другим потоком,
+           ожидается его результат. Ответы с кодом, отличным от 2xx, выбрасываются как HTTPError."""
+
+        headers = headers or {}
+        key = (url, tuple(sorted(headers.items())))
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return call.wait()
+
+        try:
+            call.response = self._get_with_retries(url, headers)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            call.done.set()
+        return call.response
+
+    def _get_with_retries(self, url: str, headers: Dict[str, str]) -> HttpResponse:
+        attempt = 0
+        while True:
+            try:
+                return self._get(url, headers)
+            except urllib.error.HTTPError as e:
+                if e.code not in _RETRY_CODES or attempt >= self.retries:
+                    raise
+                retry_after = parse_retry_after(e.headers.get('Retry-After') if e.headers else None)
+                if e.code in (429, 503):
+                    with self._lock:
+                        self.throttled += 1
+                delay = self._backoff(attempt, retry_after)
+                if retry_after is not None:
+                    # Сервер просит подождать - приостанавливаем все запросы к хосту
+                    self._bucket(self._host_key(urllib.parse.urlsplit(url))).defer(delay)
+            except urllib.error.URLError as e:
+                # Повторяются только сетевые ошибки (не схема URL, перенаправления или распаковка)
+                if not isinstance(e.reason, (OSError, http.client.HTTPException)) or attempt >= self.retries:
+                    raise
+                delay = self._backoff(attempt, None)
+
+            with self._lock:
+                self.retried += 1
+            registry.count('http_retries')
+            time.sleep(delay)
+            attempt += 1
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        """Пауза перед повтором: Retry-After или BACKOFF_BASE * 2^attempt с разбросом ±50%"""
+
+        if retry_after is not None:
+            return min(retry_after, MAX_RETRY_AFTER)
+        delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)
+        with self._lock:
+            return delay * self._random.uniform(0.5, 1.5)
+
+    def _get(self, url: str, headers: Dict[str, str]) -> HttpResponse:
+        for _ in range(_MAX_REDIRECTS + 1):
+            response = self._request(url, headers)
+            if response.status in _REDIRECT_CODES and response.headers.get('Location'):
+                url = urllib.parse.urljoin(url, response.headers['Location'])
+                continue
+            if not 200 <= response.status < 300:
+                raise urllib.error.HTTPError(url, response.status, http.client.responses.get(response.status, ''),
+                                             response.headers, None)
+            return response
+
+        raise urllib.error.URLError(f"слишком много перенаправлений для {url}")
+
+    def _request(self, url: str, headers: Dict[str, str]) -> HttpResponse:
+        """Один запрос через соединение из пула (с повтором на «протухшем» соединении)"""
+
+        parsed = urllib.parse.urlsplit(url)
+        if parsed.scheme not in ('http', 'https'):
+            raise urllib.error.URLError(f"неподдерживаемая схема URL: {parsed.scheme}")
+
+        key = self._host_key(parsed)
+        path = parsed.path or '/'
+        if parsed.query:
+            path += '?' + parsed.query
+
+        request_headers = {'Accept-Encoding': 'gzip', 'Connection': 'keep-alive'}
+        request_headers.update(headers)
+
+        waited = self._bucket(key).acquire()
+        if waited:
+            registry.observe('rate_wait', waited)
+
+        slot = self._slot(key)
+        with registry.timer('pool_wait'):
+            slot.acquire()
+        try:
+            conn, reused = self._acquire(key)
+            try:
+                try:
+                    status, resp_headers, raw, will_close = self._send(conn, path, request_headers)
+                except _STALE_ERRORS:
+                    if not reused:
+                        raise
+                    # Сервер закрыл простаивавшее соединение - открываем новое
+                    conn.close()
+                    conn, _ = self._acquire(key, fresh=True)
+                    status, resp_headers, raw, will_close = self._send(conn, path, request_headers)
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                raise urllib.error.URLError(e)
+
+            if will_close:
+                conn.close()
+            else:
+                self._release(key, conn)
+        finally:
+            slot.release()
+
+        body = self._decode(raw, resp_headers.get('Content-Encoding'))
+
+        with self._lock:
+            self.requests += 1
+            self.bytes_received += len(raw)
+            self.bytes_decoded += len(body)
+
+        return HttpResponse(url, status, resp_headers, body)
+
+    def _send(self, conn: http.client.HTTPConnection, path: str,
+              headers: Dict[str, str]) -> Tuple[int, http.client.HTTPMessage, bytes, bool]:
+        if conn.sock is None:
+            # Новое соединение: DNS, TCP (и TLS) - отдельной фазой
+            with registry.timer('connect'):
+                conn.connect()
+        with registry.timer('http'):
+            conn.request('GET', path, headers=headers)
+            response = conn.getresponse()
+            # Тело нужно дочитать полностью, иначе соединение нельзя переиспользовать
+            raw = response.read()
+        return response.status, response.headers, raw, response.will_close
+
+    def _decode(self, raw: bytes, encoding: Optional[str]) -> bytes:
+        """Распаковка тела ответа по Content-Encoding"""
+
+        if not encoding:
+            return raw
+        encoding = encoding.strip().lower()
+        try:
+            if encoding in ('gzip', 'x-gzip'):
+                with self._lock:
+                    self.gzip_responses += 1
+                return gzip.decompress(raw)
+            if encoding == 'deflate':
+                return zlib.decompress(raw)
+        except (OSError, zlib.error, EOFError) as e:
+            raise urllib.error.URLError(f"не удалось распаковать ответ ({encoding}): {e}")
+        return raw
+
+    @staticmethod
+    def _host_key(parsed: urllib.parse.SplitResult) -> Tuple[str, str, int]:
+        return (parsed.scheme, parsed.hostname or '', parsed.port or (443 if parsed.scheme == 'https' else 80))
+
+    def _bucket(self, key: Tuple[str, str, int]) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(self.rate, self.max_per_host)
+            return bucket
+
+    def _slot(self, key: Tuple[str, str, int]) -> threading.BoundedSemaphore:
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.max_per_host)
+                self._slots[key] = slot
+            return slot
+
+    def _acquire(self, key: Tuple[str, str, int], fresh: bool = False) -> Tuple[http.client.HTTPConnection, bool]:
+        """Взять свободное соединение к хосту или открыть новое"""
+
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle and not fresh:
+                self.connections_reused += 1
+                return idle.pop(), True
+            self.connections_opened += 1
+
+        scheme, host, port = key
+        if scheme == 'https':
+            conn = http.client.HTTPSConnection(host, port, timeout=self.timeout)
+        else:
+            conn = http.client.HTTPConnection(host, port, timeout=self.timeout)
+        return conn, False
+
+    def _release(self, key: Tuple[str, str, int], conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close(self) -> None:
+        """Закрыть все свободные соединения"""
+
+        with self._lock:
+            connections = [conn for idle in self._idle.values() for conn in idle]
+            self._idle.clear()
+        for conn in connections:
+            conn.close()
+
+    def summary(self) -> Dict[str, Any]:
+        """Статистика пула для вывода в конце запуска"""
+
+        return {
+            'pool_size': self.max_per_host,
+            'timeout': self.timeout,
+            'retries': self.retries,
+            'rate': self.rate,
+            'requests': self.requests,
+            'connections_opened': self.connections_opened,
+            'connections_reused': self.connections_reused,
+            'gzip_responses': self.gzip_responses,
+            'bytes_received': self.bytes_received,
+            'bytes_decoded': self.bytes_decoded,
+            'coalesced': self.coalesced,
+            'retried': self.retried,
+            'throttled': self.throttled,
+        }
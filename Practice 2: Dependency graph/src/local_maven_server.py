@@ -0,0 +1,260 @@
+import argparse
+import gzip
+import hashlib
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from test_repository import TestRepository
+
+
+# Порция, которой тело ответа отдается при ограничении пропускной способности
+SEND_CHUNK = 16 * 1024
+
+# Версия всех артефактов, построенных из тестового репозитория
+TEST_VERSION = "1.0.0"
+
+
+class DirectoryContent:
+    """Файлы Maven-репозитория из каталога на диске"""
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+
+    def get(self, path: str) -> Optional[bytes]:
+        full = os.path.abspath(os.path.join(self.root, path.lstrip('/')))
+        if not full.startswith(self.root + os.sep) or not os.path.isfile(full):
+            return None
+        with open(full, 'rb') as f:
+            return f.read()
+
+
+class TestRepositoryContent:
+    """POM-файлы и maven-metadata.xml, сгенерированные по тестовому репозиторию
+
+       Пакет A становится артефактом A:A:1.0.0 (как и в тестовом режиме), его
+       зависимости - зависимостями POM-файла. Файлы строятся при запросе."""
+
+    def __init__(self, file_path: str):
+        self.repository = TestRepository(file_path)
+
+    def get(self, path: str) -> Optional[bytes]:
+        parts = path.strip('/').split('/')
+        if len(parts) >= 3 and parts[-1] == 'maven-metadata.xml':
+            group, artifact = '.'.join(parts[:-2]), parts[-2]
+            if not self._exists(group, artifact):
+                return None
+            return (f"<metadata><groupId>{group}</groupId><artifactId>{artifact}</artifactId>"
+                    f"<versioning><latest>{TEST_VERSION}</latest><release>{TEST_VERSION}</release>"
+                    f"<versions><version>{TEST_VERSION}</version></versions></versioning></metadata>").encode('utf-8')
+
+        if len(parts) >= 4 and parts[-1] == f"{parts[-3]}-{parts[-2]}.pom" and parts[-2] == TEST_VERSION:
+            group, artifact = '.'.join(parts[:-3]), parts[-3]
+            if not self._exists(group, artifact):
+                return None
+            return self._pom(group, artifact)
+        return None
+
+    def _exists(self, group: str, artifact: str) -> bool:
+        try:
+            self.repository.get_dependencies(f"{group}:{artifact}")
+        except ValueError:
+            return False
+        return True
+
+    def _pom(self, group: str, artifact: str) -> bytes:
+        lines = ['<project xmlns="http://maven.apache.org/POM/4.0.0">',
+                 f"  <groupId>{group}</groupId>", f"  <artifactId>{artifact}</artifactId>",
+                 f"  <version>{TEST_VERSION}</version>", "  <dependencies>"]
+        for dep in self.repository.get_dependencies(f"{group}:{artifact}"):
+            lines.append(f"    <dependency><groupId>{dep.group}</groupId><artifactId>{dep.artifact}</artifactId>"
+                         f"<version>{dep.version}</version></dependency>")
+        lines += ["  </dependencies>", "</project>"]
+        return '\n'.join(lines).encode('utf-8')
+
+
+class LocalMavenServer:
+    """Локальный HTTP-сервер в раскладке Maven-репозитория для воспроизводимых замеров
+
+       Задержка (с разбросом), ограничение пропускной способности на соединение и
+       доля ответов 404 / 503 / 429 (с Retry-After или без) настраиваются; поддерживаются
+       keep-alive, ETag (304) и gzip. Считаются запросы, ответы по кодам и отправленные байты."""
+
+    def __init__(self, content, host: str = '127.0.0.1', port: int = 0,
+                 latency: float = 0.0, jitter: float = 0.0, bandwidth: Optional[int] = None,
+                 error_404: float = 0.0, error_5xx: float = 0.0, seed: int = 0,
+                 error_429: float = 0.0, retry_after: Optional[int] = None):
+        self.content = content
+        self.latency = latency
+        self.jitter = jitter
+        self.bandwidth = bandwidth
+        self.error_404 = error_404
+        self.error_5xx = error_5xx
+        self.error_429 = error_429
+        self.retry_after = retry_after
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {'requests': 0, 'bytes_sent': 0, 'injected_errors': 0}
+
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'LocalMavenServer':
+        """Запуск сервера в фоновом потоке"""
+
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> 'LocalMavenServer':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def summary(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    def _record(self, status: int, sent: int = 0, injected: bool = False) -> None:
+        with self._lock:
+            self._stats['requests'] += 1
+            self._stats['bytes_sent'] += sent
+            self._stats[f"status_{status}"] = self._stats.get(f"status_{status}", 0) + 1
+            if injected:
+                self._stats['injected_errors'] += 1
+
+    def _draw(self) -> Tuple[float, Optional[int]]:
+        """Задержка и внедряемая ошибка для очередного запроса (детерминированно от seed)"""
+
+        with self._lock:
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+            roll = self._random.random()
+        if roll < self.error_404:
+            return delay, 404
+        if roll < self.error_404 + self.error_5xx:
+            return delay, 503
+        if roll < self.error_404 + self.error_5xx + self.error_429:
+            return delay, 429
+        return delay, None
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Заголовки и тело пишутся отдельно - без TCP_NODELAY ответ ждал бы отложенного ACK
+            disable_nagle_algorithm = True
+
+            def do_GET(self) -> None:
+                delay, injected = server._draw()
+                if delay:
+                    time.sleep(delay)
+
+                body = server.content.get(self.path.split('?', 1)[0]) if injected is None else None
+                if body is None:
+                    status = injected or 404
+                    headers = None
+                    if status in (429, 503) and server.retry_after is not None:
+                        headers = {'Retry-After': str(server.retry_after)}
+                    self._send_status(status, injected is not None, headers)
+                    return
+
+                etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+                if self.headers.get('If-None-Match') == etag:
+                    self._send_status(304, False, {'ETag': etag})
+                    return
+
+                headers = {'ETag': etag, 'Content-Type': 'application/xml'}
+                if 'gzip' in self.headers.get('Accept-Encoding', ''):
+                    body = gzip.compress(body)
+                    headers['Content-Encoding'] = 'gzip'
+
+                self.send_response(200)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self._write_body(body)
+                server._record(200, len(body))
+
+            def _send_status(self, status: int, injected: bool, headers: Optional[Dict[str, str]] = None) -> None:
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                server._record(status, 0, injected)
+
+            def _write_body(self, body: bytes) -> None:
+                if not server.bandwidth:
+                    self.wfile.write(body)
+                    return
+                # Ограничение пропускной способности: порции с паузами
+                for offset in range(0, len(body), SEND_CHUNK):
+                    chunk = body[offset:offset + SEND_CHUNK]
+                    self.wfile.write(chunk)
+                    time.sleep(len(chunk) / server.bandwidth)
+
+            def log_message(self, format: str, *args) -> None:
+                pass  # статистика собирается самим сервером
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Локальный Maven-репозиторий для замеров без доступа к сети')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--test-repo', help='Тестовый репозиторий (txt), по которому генерируются POM-файлы')
+    source.add_argument('--directory', help='Каталог с файлами в раскладке Maven')
+    parser.add_argument('--host', default='127.0.0.1', help='Адрес (по умолчанию: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8080, help='Порт (по умолчанию: 8080)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Задержка ответа, мс')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Разброс задержки, мс')
+    parser.add_argument('--bandwidth', type=int, default=None, help='Пропускная способность соединения, байт/с')
+    parser.add_argument('--error-404', type=float, default=0.0, help='Доля ответов 404 (0..1)')
+    parser.add_argument('--error-5xx', type=float, default=0.0, help='Доля ответов 503 (0..1)')
+    parser.add_argument('--error-429', type=float, default=0.0, help='Доля ответов 429 (0..1)')
+    parser.add_argument('--retry-after', type=int, default=None, help='Заголовок Retry-After (сек) в ответах 429 / 503')
+    parser.add_argument('--seed', type=int, default=0, help='Начальное значение для задержек и ошибок')
+    args = parser.parse_args()
+
+    content = TestRepositoryContent(args.test_repo) if args.test_repo else DirectoryContent(args.directory)
+    server = LocalMavenServer(content, args.host, args.port, args.latency / 1000, args.jitter / 1000,
+                              args.bandwidth, args.error_404, args.error_5xx, args.seed,
+                              args.error_429, args.retry_after)
+    print(f"Локальный Maven-репозиторий: {server.url} (Ctrl+C - остановка)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print("\nСтатистика сервера:")
+        print("-" * 30)
+        for key, value in sorted(server.summary().items()):
+            print(f"{key}: {value}")
+        print("-" * 30)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,72 @@
-import urllib.request
+import hashlib
+import threading
 import urllib.error
 import xml.etree.ElementTree as ET
-from typing import List, Dict, Optional, Tuple
-import re
+from concurrent.futures import Executor
+from typing import List, Dict, Optional, Sequence, Tuple, Iterable, Union, FrozenSet
+from pom_cache import PomCache
+from effective_model import EffectiveModelBuilder
+from pom_parser import Dependency
+from maven_version import VersionIndex, is_version_range
+from metrics import registry
+from http_pool import HttpConnectionPool
+from repository_source import Body, make_source, repository_list
 
 
 class MavenRepository:
-    """Класс для работы с Maven-репозиторием"""
+    """Класс для работы с Maven-репозиторием или цепочкой репозиториев
+
+       repositories - один источник или список источников в порядке приоритета:
+       локальный каталог (~/.m2/repository) или file://-зеркало, затем HTTP(S).
+       POM-файл берется из первого источника, где он есть; списки версий
+       объединяются по всем источникам."""
+    
+    def __init__(self, repositories: Union[str, Sequence[str]], cache: Optional[PomCache] = None,
+                 pool: Optional[HttpConnectionPool] = None):
+        
+        self.repositories = repository_list(repositories)
+        # Необязательный постоянный кэш ответов удаленных репозиториев (POM и maven-metadata.xml)
+        self.cache = cache
+        # Пул keep-alive соединений (может разделяться между потоками и экземплярами)
+        self.pool = pool if pool is not None else HttpConnectionPool()
+        # Источники в порядке приоритета
+        self.sources = [make_source(spec, cache, self.pool) for spec in self.repositories]
+        if not self.sources:
+            raise ValueError("Не указан ни один репозиторий")
+        # Валидаторы загруженных POM-файлов (ETag или хэш содержимого) до их запроса графом
+        self._validators: Dict[Tuple[str, str, str], str] = {}
+        self._validators_lock = threading.Lock()
+        # Индексы версий group:artifact (или ошибка загрузки metadata) - загружаются один раз
+        self._version_indexes: Dict[Tuple[str, str], Union[VersionIndex, Exception]] = {}
+        self._version_lock = threading.Lock()
+        # Валидаторы POM родителей и BOM (их немного, хранятся всю сессию)
+        self._model_validators: Dict[Tuple[str, str, str], str] = {}
+        # Родители и BOM, из которых выведены зависимости загруженных POM (до запроса графом)
+        self._lineages: Dict[Tuple[str, str, str], FrozenSet[Tuple[str, str, str]]] = {}
+        # Итоговые модели POM: родители и BOM загружаются один раз на все пакеты
+        self.models = EffectiveModelBuilder(self._fetch_model_pom)
     
-    def __init__(self, repo_url: str):
+    def _fetch(self, path: str, extra_headers: Optional[Dict[str, str]] = None) -> Tuple[Body, Optional[str]]:
+        """Загрузка файла из первого источника, в котором он есть: (тело, ETag)
+
+           Ответ 404 (и сетевая ошибка, если дальше есть источники) передает запрос
+           следующему источнику; ответ 304 пробрасывается сразу. Если файл не найден
+           нигде, выбрасывается 404, иначе - последняя ошибка."""
         
-        self.repo_url = repo_url.rstrip('/')
+        error: Optional[Exception] = None
+        for source in self.sources:
+            try:
+                return source.fetch(path, extra_headers)
+            except urllib.error.HTTPError as e:
+                if e.code == 304:
+                    raise
+                if e.code != 404 or error is None:
+                    error = e
+            except (urllib.error.URLError, ConnectionError) as e:
+                error = e
+        raise error
     
-    def get_dependencies(self, package_name: str, version: Optional[str] = None) -> List[Tuple[str, str, str]]:
+    def get_dependencies(self, package_name: str, version: Optional[str] = None) -> List[Dependency]:
         """Получение прямых зависимостей пакета"""
         
         if ':' not in package_name:
@@ -21,124 +75,245 @@ class MavenRepository:
         group_id, artifact_id = package_name.split(':', 1)
         
         # Если версия не указана, получаем последнюю версию
-        if version is None:
-            version = self._get_latest_version(group_id, artifact_id)
+        version = self.resolve_version(package_name, version)
         
         # Получаем POM-файл и извлекаем зависимости
         return self._parse_pom_dependencies(group_id, artifact_id, version)
     
-    def _get_latest_version(self, group_id: str, artifact_id: str) -> str:
-        """Получение последней версии пакета из maven-metadata.xml"""
+    def resolve_version(self, package_name: str, version: Optional[str] = None) -> str:
+        """Конкретная версия пакета: последний релиз, если версия не указана,
+           наибольшая подходящая - для диапазона ([1.2,2.0)), иначе - указанная"""
         
-        # Получаем URL для maven-metadata.xml
-        group_path = group_id.replace('.', '/')
-        metadata_url = f"{self.repo_url}/{group_path}/{artifact_id}/maven-metadata.xml"
+        if version is not None and not is_version_range(version):
+            return version
         
-        try:
-            with urllib.request.urlopen(metadata_url) as response:
-                content = response.read().decode('utf-8')
-                root = ET.fromstring(content)  # используем xml.etree
-                
-                # Ищем версию в теге <latest> или берем последнюю из <versions>
-                latest_elem = root.find('.//latest')
-                if latest_elem is not None and latest_elem.text:
-                    return latest_elem.text
-                
-                # Если нет latest, берем последнюю версию из списка
-                versions = root.findall('.//version')
-                if versions:
-                    return versions[-1].text
-                
+        if ':' not in package_name:
+            raise ValueError(f"Некорректный формат имени пакета: {package_name}. Ожидается group:artifact")
+        
+        group_id, artifact_id = package_name.split(':', 1)
+        resolved = self.version_index(group_id, artifact_id).resolve(version)
+        if resolved is None:
+            if version is None:
                 raise ValueError(f"Не найдены версии для пакета {group_id}:{artifact_id}")
-                
-        except urllib.error.HTTPError as e:
-            if e.code == 404:  # такой пакет не найден
-                raise ValueError(f"Пакет {group_id}:{artifact_id} не найден в репозитории")
-            else:
-                raise ConnectionError(f"Ошибка HTTP {e.code} при доступе к {metadata_url}")
-        except urllib.error.URLError as e:
-            raise ConnectionError(f"Ошибка сети: {e.reason}")
-        except ET.ParseError as e:
-            raise ValueError(f"Ошибка парсинга metadata: {e}")
+            raise ValueError(f"Нет версии {group_id}:{artifact_id}, удовлетворяющей диапазону {version}")
+        return resolved
     
-    def _parse_pom_dependencies(self, group_id: str, artifact_id: str, version: str) -> List[Tuple[str, str, str]]:
-        """Парсинг POM-файла и извлечение зависимостей"""
+    def version_index(self, group_id: str, artifact_id: str) -> VersionIndex:
+        """Индекс версий пакета (maven-metadata.xml загружается один раз)
+
+           Отсутствие пакета запоминается; сетевая ошибка - нет, следующий запрос повторит загрузку."""
+        
+        key = (group_id, artifact_id)
+        with self._version_lock:
+            index = self._version_indexes.get(key)
+        if index is None:
+            try:
+                index = self._load_version_index(group_id, artifact_id)
+            except ValueError as e:
+                index = e
+            with self._version_lock:
+                index = self._version_indexes.setdefault(key, index)
+        if isinstance(index, Exception):
+            raise index
+        return index
+    
+    def prefetch_versions(self, packages: Iterable[Tuple[str, str]], executor: Optional[Executor] = None) -> int:
+        """Загрузка индексов версий для пакетов (group, artifact) одним пакетом
+
+           Уже загруженные индексы пропускаются; при executor загрузка параллельна.
+           Возвращает число загруженных индексов."""
+        
+        with self._version_lock:
+            pending = [key for key in dict.fromkeys(packages) if key not in self._version_indexes]
+        
+        def load(key: Tuple[str, str]) -> None:
+            try:
+                self.version_index(*key)
+            except (ValueError, ConnectionError):
+                pass  # при разрешении версии ошибка будет выброшена (сетевая - после повторной загрузки)
+        
+        if executor is not None and len(pending) > 1:
+            list(executor.map(load, pending))
+        else:
+            for key in pending:
+                load(key)
+        return len(pending)
+    
+    def _load_version_index(self, group_id: str, artifact_id: str) -> VersionIndex:
+        """Загрузка и разбор maven-metadata.xml во всех источниках (версии объединяются)
+
+           Недоступный источник пропускается, если версии найдены в другом."""
+        
+        # Путь к maven-metadata.xml
+        group_path = group_id.replace('.', '/')
+        metadata_path = f"{group_path}/{artifact_id}/maven-metadata.xml"
+        
+        versions: List[str] = []
+        error: Optional[Exception] = None
+        for source in self.sources:
+            try:
+                versions += self._metadata_versions(source, metadata_path)
+            except urllib.error.HTTPError as e:
+                if e.code != 404:
+                    error = ConnectionError(f"Ошибка HTTP {e.code} при доступе к {source.name}/{metadata_path}")
+            except urllib.error.URLError as e:
+                error = ConnectionError(f"Ошибка сети: {e.reason}")
+            except ConnectionError as e:
+                error = e
+            except ET.ParseError as e:
+                error = ValueError(f"Ошибка парсинга metadata: {e}")
+        
+        if versions:
+            return VersionIndex(versions)
+        if error is not None:
+            raise error
+        raise ValueError(f"Пакет {group_id}:{artifact_id} не найден в репозитории")
+    
+    @staticmethod
+    def _metadata_versions(source, metadata_path: str) -> List[str]:
+        """Версии из maven-metadata.xml одного источника"""
+        
+        content, _ = source.fetch(metadata_path)
+        registry.count('metadata_files')
+        with registry.timer('metadata_parse'):
+            root = ET.fromstring(content)  # используем xml.etree
         
-        # Строим URL для POM-файла
+        # Все версии из <versions>; <latest> / <release> - на случай пустого списка
+        versions = [elem.text.strip() for elem in root.findall('.//versions/version') if elem.text]
+        if not versions:
+            versions = [elem.text.strip() for tag in ('latest', 'release', 'version')
+                        for elem in root.findall(f'.//{tag}') if elem.text]
+        return versions
+    
+    @staticmethod
+    def _pom_path(group_id: str, artifact_id: str, version: str) -> str:
         group_path = group_id.replace('.', '/')
-        pom_url = f"{self.repo_url}/{group_path}/{artifact_id}/{version}/{artifact_id}-{version}.pom"
+        return f"{group_path}/{artifact_id}/{version}/{artifact_id}-{version}.pom"
+    
+    def _fetch_pom(self, group_id: str, artifact_id: str, version: str,
+                   extra_headers: Optional[Dict[str, str]] = None) -> Optional[Body]:
+        """Загрузка POM-файла с запоминанием его валидатора (None - ответ 304 на условный запрос)"""
+        
+        pom_path = self._pom_path(group_id, artifact_id, version)
         
         try:
-            with urllib.request.urlopen(pom_url) as response:
-                content = response.read().decode('utf-8')
-                return self._extract_dependencies_from_pom(content)
-                
+            content, etag = self._fetch(pom_path, extra_headers)
         except urllib.error.HTTPError as e:
+            if e.code == 304:  # POM-файл не изменился
+                return None
             if e.code == 404:  # такой POM-файл не найден
                 raise ValueError(f"POM-файл для {group_id}:{artifact_id}:{version} не найден")
             else:
-                raise ConnectionError(f"Ошибка HTTP {e.code} при доступе к {pom_url}")
+                raise ConnectionError(f"Ошибка HTTP {e.code} при доступе к {pom_path}")
         except urllib.error.URLError as e:
             raise ConnectionError(f"Ошибка сети: {e.reason}")
+        
+        registry.count('pom_files')
+        registry.count('pom_bytes', len(content))
+        validator = f"etag:{etag}" if etag else "sha1:" + hashlib.sha1(content).hexdigest()
+        with self._validators_lock:
+            self._validators[(group_id, artifact_id, version)] = validator
+        return content
+    
+    def _fetch_model_pom(self, group_id: str, artifact_id: str, version: str) -> Body:
+        """Загрузка POM родителя или BOM с сохранением его валидатора на всю сессию"""
+        
+        content = self._fetch_pom(group_id, artifact_id, version)
+        key = (group_id, artifact_id, version)
+        with self._validators_lock:
+            validator = self._validators.get(key)
+            if validator:
+                self._model_validators[key] = validator
+        return content
+    
+    def _parse_pom_dependencies(self, group_id: str, artifact_id: str, version: str) -> List[Dependency]:
+        """Парсинг POM-файла и извлечение зависимостей"""
+        
+        content = self._fetch_pom(group_id, artifact_id, version)
+        return self._extract_dependencies_from_pom(content, group_id, artifact_id, version)
+    
+    def pop_validator(self, package_name: str, version: Optional[str]) -> Optional[str]:
+        """Валидатор последней загрузки POM-файла пакета (запись при этом удаляется)"""
+        
+        if version is None or ':' not in package_name:
+            return None
+        group_id, artifact_id = package_name.split(':', 1)
+        with self._validators_lock:
+            return self._validators.pop((group_id, artifact_id, version), None)
+    
+    def pop_model_chain(self, package_name: str, version: Optional[str]) -> Dict[str, str]:
+        """Валидаторы родителей и BOM, из которых выведены зависимости последней загрузки
+           POM-файла пакета: {"group:artifact:version": валидатор} (запись при этом удаляется)"""
+        
+        if version is None or ':' not in package_name:
+            return {}
+        group_id, artifact_id = package_name.split(':', 1)
+        with self._validators_lock:
+            lineage = self._lineages.pop((group_id, artifact_id, version), frozenset())
+            return {':'.join(key): self._model_validators[key] for key in lineage if key in self._model_validators}
     
-    def _extract_dependencies_from_pom(self, pom_content: str) -> List[Tuple[str, str, str]]:
-        """Извлечение зависимостей из содержимого POM-файла"""
+    def discard_validator(self, package_name: str, version: Optional[str]) -> None:
+        """Удаление валидатора и родителей последней загрузки POM-файла пакета, если они не нужны"""
         
-        dependencies = []
+        if version is None or ':' not in package_name:
+            return
+        group_id, artifact_id = package_name.split(':', 1)
+        with self._validators_lock:
+            self._validators.pop((group_id, artifact_id, version), None)
+            self._lineages.pop((group_id, artifact_id, version), None)
+    
+    def model_changed(self, coordinates: str, validator: str) -> bool:
+        """Изменился ли POM родителя или BOM (group:artifact:version) с момента получения валидатора
+
+           Недоступный POM считается изменившимся."""
         
+        group_id, artifact_id, version = coordinates.split(':', 2)
         try:
-            root = ET.fromstring(pom_content)
-            
-            # Определяем namespace POM (namespace обычно выглядит как http://maven.apache.org/POM/4.0.0)
-            namespace_match = re.match(r'\{.*\}', root.tag)
-            namespace = namespace_match.group(0)[1:-1] if namespace_match else ''
-            ns = {'pom': namespace} if namespace else {}
-            
-            # Ищем секцию dependencies
-            dependencies_elem = root.find('.//pom:dependencies', ns) if namespace else root.find('.//dependencies')
-            
-            if dependencies_elem is not None:
-                for dep_elem in dependencies_elem.findall('pom:dependency', ns) if namespace else dependencies_elem.findall('dependency'):
-                    group_id_elem = dep_elem.find('pom:groupId', ns) if namespace else dep_elem.find('groupId')
-                    artifact_id_elem = dep_elem.find('pom:artifactId', ns) if namespace else dep_elem.find('artifactId')
-                    version_elem = dep_elem.find('pom:version', ns) if namespace else dep_elem.find('version')
-                    
-                    if (group_id_elem is not None and group_id_elem.text and
-                        artifact_id_elem is not None and artifact_id_elem.text):
-                        
-                        group_id = group_id_elem.text.strip()
-                        artifact_id = artifact_id_elem.text.strip()
-                        version = version_elem.text.strip() if version_elem is not None and version_elem.text else "unknown"
-                        
-                        dependencies.append((group_id, artifact_id, version))
-            
-            return dependencies
-            
-        except ET.ParseError as e:
-            # Если XML-парсинг не удался, пытаемся извлечь зависимости с помощью регулярных выражений
-            dependencies = []
-        
-            # Ищем блок dependencies
-            deps_match = re.search(r'<dependencies>(.*?)</dependencies>', pom_content, re.DOTALL)
-            if not deps_match:
-                return dependencies
-            
-            deps_content = deps_match.group(1)
-            
-            # Ищем отдельные зависимости dependency
-            dep_pattern = r'<dependency>(.*?)</dependency>'
-            for dep_match in re.finditer(dep_pattern, deps_content, re.DOTALL):
-                dep_content = dep_match.group(1)
-                
-                group_match = re.search(r'<groupId>(.*?)</groupId>', dep_content)
-                artifact_match = re.search(r'<artifactId>(.*?)</artifactId>', dep_content)
-                version_match = re.search(r'<version>(.*?)</version>', dep_content)
-                
-                if group_match and artifact_match:
-                    group_id = group_match.group(1).strip()
-                    artifact_id = artifact_match.group(1).strip()
-                    version = version_match.group(1).strip() if version_match else "unknown"
-                    
-                    dependencies.append((group_id, artifact_id, version))
-            
-            return dependencies
+            return self._changed_pom(group_id, artifact_id, version, validator) is not None
+        except (ValueError, ConnectionError):
+            return True
+    
+    def revalidate(self, package_name: str, version: str, validator: str) -> Optional[List[Dependency]]:
+        """Проверка, изменился ли POM-файл с момента получения валидатора
+
+           Возвращает None, если файл не изменился, иначе - новые зависимости
+           (новый валидатор доступен через pop_validator). Родители и BOM проверяются
+           отдельно (pop_model_chain, model_changed)."""
+        
+        group_id, artifact_id = package_name.split(':', 1)
+        content = self._changed_pom(group_id, artifact_id, version, validator)
+        if content is None:
+            return None
+        return self._extract_dependencies_from_pom(content, group_id, artifact_id, version)
+    
+    def _changed_pom(self, group_id: str, artifact_id: str, version: str, validator: str) -> Optional[Body]:
+        """Новое содержимое POM-файла или None, если он не изменился
+
+           ETag проверяется условным запросом; при кэше или хэше содержимого
+           файл сравнивается по валидатору."""
+        
+        extra_headers = None
+        if validator.startswith('etag:') and self.cache is None:
+            extra_headers = {'If-None-Match': validator[len('etag:'):]}
+        
+        content = self._fetch_pom(group_id, artifact_id, version, extra_headers)
+        if content is None:
+            return None
+        
+        with self._validators_lock:
+            unchanged = self._validators.get((group_id, artifact_id, version)) == validator
+        if unchanged:
+            return None
+        return content
+    
+    def _extract_dependencies_from_pom(self, pom_content: bytes, group_id: str, artifact_id: str,
+                                       version: str) -> List[Dependency]:
+        """Извлечение зависимостей проекта из содержимого POM-файла
+
+           Учитываются родительские POM, импорт BOM из dependencyManagement и свойства ${...}."""
+        
+        dependencies, lineage = self.models.resolve(pom_content, group_id, artifact_id, version)
+        if lineage:
+            with self._validators_lock:
+                self._lineages[(group_id, artifact_id, version)] = lineage
+        return dependencies
@@ -0,0 +1,277 @@
+import bisect
+import functools
+from typing import List, Optional, Union, Iterable
+
+
+# Порядок известных квалификаторов Maven ("" - релиз: ga, final, release)
+_QUALIFIERS = ['alpha', 'beta', 'milestone', 'rc', 'snapshot', '', 'sp']
+_ALIASES = {'ga': '', 'final': '', 'release': '', 'cr': 'rc'}
+_SHORT_QUALIFIERS = {'a': 'alpha', 'b': 'beta', 'm': 'milestone'}
+_RELEASE_INDEX = str(_QUALIFIERS.index(''))
+
+# Элемент версии: число, квалификатор (str) или вложенный список (после '-' и смены цифр/букв)
+Item = Union[int, str, list]
+
+
+def _comparable_qualifier(qualifier: str) -> str:
+    """Ключ сортировки квалификатора: известные - по порядку, прочие - после них, лексически"""
+
+    if qualifier in _QUALIFIERS:
+        return str(_QUALIFIERS.index(qualifier))
+    return f"{len(_QUALIFIERS)}-{qualifier}"
+
+
+def _string_item(value: str, followed_by_digit: bool) -> str:
+    if followed_by_digit and value in _SHORT_QUALIFIERS:
+        value = _SHORT_QUALIFIERS[value]
+    return _ALIASES.get(value, value)
+
+
+def _parse_item(is_digit: bool, text: str) -> Item:
+    return int(text) if is_digit else _string_item(text, False)
+
+
+def _is_null(item: Item) -> bool:
+    if isinstance(item, int):
+        return item == 0
+    if isinstance(item, str):
+        return _comparable_qualifier(item) == _RELEASE_INDEX
+    return not item
+
+
+def _normalize(items: list) -> None:
+    """Удаление завершающих «нулевых» элементов (1.0.0 == 1, 1-ga == 1)"""
+
+    i = len(items) - 1
+    while i >= 0:
+        item = items[i]
+        if _is_null(item):
+            del items[i]
+        elif not isinstance(item, list):
+            break
+        i -= 1
+
+
+def _parse(version: str) -> list:
+    """Разбор версии по правилам Maven ComparableVersion"""
+
+    version = version.lower()
+    items: list = []
+    current = items
+    stack = [items]
+    is_digit = False
+    start = 0
+
+    for i, c in enumerate(version):
+        if c in '.-':
+            current.append(0 if i == start else _parse_item(is_digit, version[start:i]))
+            start = i + 1
+            if c == '-':
+                nested: list = []
+                current.append(nested)
+                current = nested
+                stack.append(nested)
+        elif c.isdigit():
+            if not is_digit and i > start:
+                current.append(_string_item(version[start:i], True))
+                start = i
+                nested = []
+                current.append(nested)
+                current = nested
+                stack.append(nested)
+            is_digit = True
+        else:
+            if is_digit and i > start:
+                current.append(_parse_item(True, version[start:i]))
+                start = i
+                nested = []
+                current.append(nested)
+                current = nested
+                stack.append(nested)
+            is_digit = False
+
+    if len(version) > start:
+        current.append(_parse_item(is_digit, version[start:]))
+
+    while stack:
+        _normalize(stack.pop())
+    return items
+
+
+def _compare(a: Optional[Item], b: Optional[Item]) -> int:
+    """Сравнение элементов версии (b = None - отсутствующий элемент)"""
+
+    if isinstance(a, int):
+        if b is None:
+            return 0 if a == 0 else 1
+        if isinstance(b, int):
+            return (a > b) - (a < b)
+        return 1  # число больше квалификатора и списка
+
+    if isinstance(a, str):
+        if b is None:
+            left, right = _comparable_qualifier(a), _RELEASE_INDEX
+            return (left > right) - (left < right)
+        if isinstance(b, int) or isinstance(b, list):
+            return -1
+        left, right = _comparable_qualifier(a), _comparable_qualifier(b)
+        return (left > right) - (left < right)
+
+    # a - список
+    if b is None:
+        return _compare(a[0], None) if a else 0
+    if isinstance(b, int):
+        return -1
+    if isinstance(b, str):
+        return 1
+    for i in range(max(len(a), len(b))):
+        left = a[i] if i < len(a) else None
+        right = b[i] if i < len(b) else None
+        if left is None:
+            result = -_compare(right, None)
+        else:
+            result = _compare(left, right)
+        if result:
+            return result
+    return 0
+
+
+@functools.total_ordering
+class ComparableVersion:
+    """Версия артефакта с упорядочиванием Maven (1.9 < 1.10, 1.0-alpha < 1.0-rc < 1.0 < 1.0-sp)"""
+
+    __slots__ = ('value', '_items')
+
+    def __init__(self, value: str):
+        self.value = value
+        self._items = _parse(value)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, ComparableVersion) and _compare(self._items, other._items) == 0
+
+    def __lt__(self, other: 'ComparableVersion') -> bool:
+        return _compare(self._items, other._items) < 0
+
+    def __hash__(self) -> int:
+        return hash(repr(self._items))
+
+    def __repr__(self) -> str:
+        return f"ComparableVersion({self.value!r})"
+
+
+def is_version_range(spec: Optional[str]) -> bool:
+    """Является ли строка диапазоном версий ([1.2,2.0), (,1.0], [1.5] ...)"""
+
+    return bool(spec) and spec[0] in '[('
+
+
+class Restriction:
+    """Одно ограничение диапазона: нижняя и верхняя границы (None - без границы)"""
+
+    def __init__(self, lower: Optional[ComparableVersion], lower_inclusive: bool,
+                 upper: Optional[ComparableVersion], upper_inclusive: bool):
+        self.lower = lower
+        self.lower_inclusive = lower_inclusive
+        self.upper = upper
+        self.upper_inclusive = upper_inclusive
+
+    def contains(self, version: ComparableVersion) -> bool:
+        if self.lower is not None:
+            if version < self.lower or (version == self.lower and not self.lower_inclusive):
+                return False
+        if self.upper is not None:
+            if version > self.upper or (version == self.upper and not self.upper_inclusive):
+                return False
+        return True
+
+
+def parse_range(spec: str) -> List[Restriction]:
+    """Разбор диапазона Maven: «[1.0,2.0)», «[1.5]», «(,1.0],[1.2,)»"""
+
+    restrictions = []
+    rest = spec.strip()
+    while rest:
+        close = min((i for i in (rest.find(']'), rest.find(')')) if i >= 0), default=-1)
+        if rest[0] not in '[(' or close < 0:
+            raise ValueError(f"Некорректный диапазон версий: {spec}")
+
+        body = rest[1:close]
+        lower_inclusive = rest[0] == '['
+        upper_inclusive = rest[close] == ']'
+        if ',' not in body:
+            if not (lower_inclusive and upper_inclusive) or not body.strip():
+                raise ValueError(f"Некорректный диапазон версий: {spec}")
+            exact = ComparableVersion(body.strip())
+            restrictions.append(Restriction(exact, True, exact, True))
+        else:
+            low, high = (part.strip() for part in body.split(',', 1))
+            restrictions.append(Restriction(ComparableVersion(low) if low else None, lower_inclusive,
+                                            ComparableVersion(high) if high else None, upper_inclusive))
+
+        rest = rest[close + 1:].strip()
+        if rest.startswith(','):
+            rest = rest[1:].strip()
+    return restrictions
+
+
+class VersionIndex:
+    """Упорядоченные версии одного group:artifact (из maven-metadata.xml)
+
+       Версии сортируются один раз; последняя версия, последний релиз и выбор
+       по диапазону находятся двоичным поиском."""
+
+    def __init__(self, versions: Iterable[str]):
+        ordered = sorted({ComparableVersion(v) for v in versions if v})
+        self._versions = ordered
+        self._releases = [v for v in ordered if not v.value.upper().endswith('SNAPSHOT')]
+
+    def __len__(self) -> int:
+        return len(self._versions)
+
+    def versions(self) -> List[str]:
+        return [v.value for v in self._versions]
+
+    def latest(self) -> Optional[str]:
+        return self._versions[-1].value if self._versions else None
+
+    def latest_release(self) -> Optional[str]:
+        """Последняя версия без -SNAPSHOT (если релизов нет - последняя вообще)"""
+
+        if self._releases:
+            return self._releases[-1].value
+        return self.latest()
+
+    def select(self, spec: str) -> Optional[str]:
+        """Наибольшая версия, удовлетворяющая диапазону spec (None - подходящих нет)
+
+           Релизы предпочтительнее SNAPSHOT-версий: они выбираются, только если релиза в диапазоне нет."""
+
+        restrictions = parse_range(spec)
+        best = self._select(self._releases, restrictions) or self._select(self._versions, restrictions)
+        return best.value if best is not None else None
+
+    @staticmethod
+    def _select(versions: List[ComparableVersion], restrictions: List[Restriction]) -> Optional[ComparableVersion]:
+        best: Optional[ComparableVersion] = None
+        for restriction in restrictions:
+            if restriction.upper is None:
+                pos = len(versions)
+            elif restriction.upper_inclusive:
+                pos = bisect.bisect_right(versions, restriction.upper)
+            else:
+                pos = bisect.bisect_left(versions, restriction.upper)
+            if pos == 0:
+                continue
+            candidate = versions[pos - 1]
+            if restriction.contains(candidate) and (best is None or candidate > best):
+                best = candidate
+        return best
+
+    def resolve(self, spec: Optional[str]) -> Optional[str]:
+        """Версия для запроса: None - последний релиз, диапазон - лучшая подходящая, иначе - как есть"""
+
+        if spec is None:
+            return self.latest_release()
+        if is_version_range(spec):
+            return self.select(spec)
+        return spec
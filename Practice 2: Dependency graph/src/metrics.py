@@ -0,0 +1,146 @@
+import contextlib
+import json
+import threading
+import time
+from typing import Dict, Any, List, Iterator
+
+
+# Верхние границы интервалов гистограммы задержек (мс); последний интервал - «больше»
+BUCKETS_MS = (0.1, 0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class PhaseStats:
+    """Статистика одной фазы: число вызовов, суммарное и максимальное время, гистограмма"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.histogram = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        ms = seconds * 1000
+        for i, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                self.histogram[i] += 1
+                return
+        self.histogram[-1] += 1
+
+    def percentile(self, fraction: float) -> float:
+        """Оценка процентиля (мс) - верхняя граница интервала гистограммы"""
+
+        rank = fraction * self.count
+        seen = 0
+        for i, n in enumerate(self.histogram):
+            seen += n
+            if seen >= rank and n:
+                bound = BUCKETS_MS[i] if i < len(BUCKETS_MS) else self.max * 1000
+                return min(bound, round(self.max * 1000, 3))
+        return 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"<={bound}ms" for bound in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}ms"]
+        return {
+            'count': self.count,
+            'total_seconds': round(self.total, 6),
+            'mean_ms': round(self.total * 1000 / self.count, 3) if self.count else 0.0,
+            'p50_ms': self.percentile(0.5),
+            'p90_ms': self.percentile(0.9),
+            'p99_ms': self.percentile(0.99),
+            'max_ms': round(self.max * 1000, 3),
+            'histogram': {label: n for label, n in zip(labels, self.histogram) if n},
+        }
+
+
+class Metrics:
+    """Потокобезопасный сбор метрик выполнения: фазы (время), счетчики и максимумы
+
+       Фазы: connect (DNS и установка соединения), rate_wait, pool_wait, http, pom_parse,
+       metadata_parse, graph_update, bfs, dot, graphviz, output, query (запросы к демону)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.phases: Dict[str, PhaseStats] = {}
+        self.counters: Dict[str, int] = {}
+        self.gauges: Dict[str, int] = {}
+
+    def observe(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            stats = self.phases.get(phase)
+            if stats is None:
+                stats = self.phases[phase] = PhaseStats()
+            stats.add(seconds)
+
+    @contextlib.contextmanager
+    def timer(self, phase: str) -> Iterator[None]:
+        """Замер времени блока как одного вызова фазы"""
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(phase, time.perf_counter() - start)
+
+    def count(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def maximum(self, name: str, value: int) -> None:
+        """Запомнить наибольшее наблюдавшееся значение (например, размер фронта BFS)"""
+
+        with self._lock:
+            if value > self.gauges.get(name, 0):
+                self.gauges[name] = value
+
+    def reset(self) -> None:
+        with self._lock:
+            self.phases.clear()
+            self.counters.clear()
+            self.gauges.clear()
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            result: Dict[str, Any] = {
+                'phases': {name: stats.to_dict() for name, stats in self.phases.items()},
+                'counters': dict(self.counters),
+                'gauges': dict(self.gauges),
+            }
+        bfs = result['phases'].get('bfs')
+        nodes = result['counters'].get('nodes_expanded', 0)
+        if bfs and bfs['total_seconds'] > 0:
+            result['nodes_per_second'] = round(nodes / bfs['total_seconds'], 1)
+        return result
+
+    def summary_lines(self) -> List[str]:
+        """Сводка для чтения: таблица фаз, гистограммы, счетчики"""
+
+        data = self.to_dict()
+        lines = [f"{'фаза':<16} {'вызовов':>9} {'всего, с':>10} {'ср., мс':>9} {'p50':>8} {'p90':>8} {'p99':>8} {'макс.':>9}",
+                 "-" * 84]
+        for name, stats in data['phases'].items():
+            lines.append(f"{name:<16} {stats['count']:>9} {stats['total_seconds']:>10.3f} {stats['mean_ms']:>9.2f} "
+                         f"{stats['p50_ms']:>8g} {stats['p90_ms']:>8g} {stats['p99_ms']:>8g} {stats['max_ms']:>9.2f}")
+        lines.append("-" * 84)
+        for name, stats in data['phases'].items():
+            buckets = ', '.join(f"{label}: {n}" for label, n in stats['histogram'].items())
+            lines.append(f"{name}: {buckets}")
+        for name, value in list(data['counters'].items()) + list(data['gauges'].items()):
+            lines.append(f"{name}: {value}")
+        if 'nodes_per_second' in data:
+            lines.append(f"nodes_per_second: {data['nodes_per_second']}")
+        return lines
+
+    def write_json(self, path: str, extra: Dict[str, Any]) -> None:
+        """Запись метрик (и дополнительных разделов - кэш, пул, граф) в JSON-файл"""
+
+        data = self.to_dict()
+        data.update(extra)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+# Общий реестр метрик процесса
+registry = Metrics()
@@ -0,0 +1,190 @@
+import os
+import json
+import gzip
+import hashlib
+import threading
+import zlib
+from typing import Optional, Dict, Any, Tuple
+
+
+class CacheEntry:
+    """Запись кэша: тело ответа и валидаторы HTTP (ETag / Last-Modified)"""
+
+    def __init__(self, url: str, body: bytes, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        self.url = url
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Заголовки для условного GET-запроса"""
+
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class PomCache:
+    """Постоянный кэш POM-файлов и maven-metadata.xml на диске
+
+       Каждая запись хранится в двух файлах: <key>.json (URL и валидаторы)
+       и <key>.gz (сжатое тело). Время последнего доступа отслеживается через
+       mtime файла тела, по нему же вытесняются записи при превышении лимита (LRU)."""
+
+    DEFAULT_MAX_SIZE = 256 * 1024 * 1024  # 256 МБ
+
+    def __init__(self, cache_dir: str, max_size: int = DEFAULT_MAX_SIZE, offline: bool = False):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.offline = offline
+
+        # Статистика работы кэша за текущий запуск
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.evicted = 0
+
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._size = self._scan_size()
+
+    def _key(self, url: str) -> str:
+        """Имя файла записи по URL"""
+
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+    def _paths(self, url: str) -> Tuple[str, str]:
+        key = self._key(url)
+        return os.path.join(self.cache_dir, key + '.json'), os.path.join(self.cache_dir, key + '.gz')
+
+    def _scan_size(self) -> int:
+        """Подсчет текущего размера кэша на диске"""
+
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.gz') or name.endswith('.json'):
+                total += os.path.getsize(os.path.join(self.cache_dir, name))
+        return total
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """Получение записи из кэша (None, если записи нет или она повреждена)
+
+           Под блокировкой читаются только файлы записи (согласованная пара при
+           параллельных put и вытеснении); распаковка идет вне ее, параллельно в потоках --jobs."""
+
+        meta_path, body_path = self._paths(url)
+        with self._lock:
+            try:
+                with open(meta_path, 'rb') as f:
+                    meta_bytes = f.read()
+                with open(body_path, 'rb') as f:
+                    compressed = f.read()
+            except OSError:
+                return None
+
+            # Обновляем время доступа для LRU
+            try:
+                os.utime(body_path, None)
+            except OSError:
+                pass
+
+        try:
+            meta: Dict[str, Any] = json.loads(meta_bytes)
+            body = gzip.decompress(compressed)
+        except (OSError, ValueError, EOFError, zlib.error):
+            return None
+
+        return CacheEntry(url, body, meta.get('etag'), meta.get('last_modified'))
+
+    def put(self, url: str, body: bytes, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """Сохранение ответа в кэш с последующим вытеснением старых записей"""
+
+        meta_path, body_path = self._paths(url)
+        meta = {'url': url, 'etag': etag, 'last_modified': last_modified}
+        compressed = gzip.compress(body)
+        meta_bytes = json.dumps(meta, ensure_ascii=False).encode('utf-8')
+
+        with self._lock:
+            old_size = self._entry_size(meta_path, body_path)
+
+            # Запись через временный файл, чтобы не оставить обрезанную запись
+            self._write_atomic(body_path, compressed)
+            self._write_atomic(meta_path, meta_bytes)
+
+            self._size += len(compressed) + len(meta_bytes) - old_size
+            if self._size > self.max_size:
+                self._evict(keep=body_path)
+
+    def record(self, counter: str) -> None:
+        """Потокобезопасное увеличение счетчика статистики (hits / misses)"""
+
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def touch(self, url: str) -> None:
+        """Отметка успешной ревалидации записи (ответ 304)"""
+
+        with self._lock:
+            self.revalidated += 1
+            _, body_path = self._paths(url)
+            try:
+                os.utime(body_path, None)
+            except OSError:
+                pass
+
+    def _entry_size(self, meta_path: str, body_path: str) -> int:
+        size = 0
+        for path in (meta_path, body_path):
+            if os.path.exists(path):
+                size += os.path.getsize(path)
+        return size
+
+    def _write_atomic(self, path: str, data: bytes) -> None:
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _evict(self, keep: str) -> None:
+        """Удаление давно не использованных записей, пока кэш не уложится в лимит"""
+
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.gz'):
+                continue
+            body_path = os.path.join(self.cache_dir, name)
+            if body_path == keep:
+                continue
+            try:
+                entries.append((os.path.getmtime(body_path), body_path))
+            except OSError:
+                continue
+
+        entries.sort()
+        for _, body_path in entries:
+            if self._size <= self.max_size:
+                break
+            meta_path = body_path[:-len('.gz')] + '.json'
+            freed = self._entry_size(meta_path, body_path)
+            for path in (body_path, meta_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._size -= freed
+            self.evicted += 1
+
+    def summary(self) -> Dict[str, Any]:
+        """Статистика кэша для вывода в конце запуска"""
+
+        return {
+            'cache_dir': self.cache_dir,
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidated': self.revalidated,
+            'evicted': self.evicted,
+            'size_bytes': self._size,
+        }
@@ -0,0 +1,206 @@
+import re
+import xml.etree.ElementTree as ET
+from typing import List, Tuple, Dict, Set, Optional, Any, FrozenSet, NamedTuple
+from metrics import registry
+
+
+# Размер порции, которой байты POM-файла подаются парсеру
+CHUNK_SIZE = 16 * 1024
+
+# Путь (без namespace) к секции зависимостей самого проекта - в отличие от
+# project/dependencyManagement/dependencies и project/build/plugins/plugin/dependencies
+_DEPENDENCIES_PATH = ('project', 'dependencies')
+_DEPENDENCY_PATH = _DEPENDENCIES_PATH + ('dependency',)
+_DEPENDENCY_FIELDS = ('groupId', 'artifactId', 'version')
+
+# Пути элементов, нужных для построения итоговой модели (родитель, свойства, BOM)
+_PROJECT_PATH = ('project',)
+_PARENT_PATH = ('project', 'parent')
+_PROPERTIES_PATH = ('project', 'properties')
+_MANAGED_DEPENDENCY_PATH = ('project', 'dependencyManagement', 'dependencies', 'dependency')
+_MODEL_DEPENDENCY_FIELDS = ('groupId', 'artifactId', 'version', 'type', 'scope', 'classifier', 'optional')
+# Scope зависимостей Maven (import - только для BOM в dependencyManagement)
+SCOPES = ('compile', 'runtime', 'provided', 'test', 'system')
+
+# Секции, влияющие на итоговую модель: если после project/dependencies ни одна из еще
+# не встреченных секций в остатке файла не упоминается, разбор прекращается
+_MODEL_SECTIONS = ('parent', 'properties', 'dependencyManagement')
+_SECTION_RES = {name: re.compile(rb'<(?:[\w.-]+:)?' + name.encode() + rb'[\s/>]')
+                for name in _MODEL_SECTIONS + _DEPENDENCY_FIELDS}
+
+# Исключения зависимости: <exclusions><exclusion><groupId/><artifactId/></exclusion></exclusions>
+_EXCLUSION_PATHS = (_DEPENDENCY_PATH + ('exclusions', 'exclusion'),
+                    _MANAGED_DEPENDENCY_PATH + ('exclusions', 'exclusion'))
+
+# Регулярные выражения для разбора некорректного XML (компилируются один раз)
+_NESTED_SECTIONS_RE = re.compile(
+    r'<(dependencyManagement|build|profiles|reporting)\b.*?</\1\s*>', re.DOTALL)
+_DEPENDENCIES_RE = re.compile(r'<dependencies>(.*?)</dependencies>', re.DOTALL)
+_DEPENDENCY_RE = re.compile(r'<dependency>(.*?)</dependency>', re.DOTALL)
+_FIELD_RES = {field: re.compile(rf'<{field}>(.*?)</{field}>') for field in _DEPENDENCY_FIELDS}
+
+
+class Dependency(NamedTuple):
+    """Зависимость из POM-файла: координаты и атрибуты ребра
+
+       exclusions - пары (groupId, artifactId), «*» - любое значение."""
+
+    group: str
+    artifact: str
+    version: str
+    scope: str = 'compile'
+    optional: bool = False
+    exclusions: FrozenSet[Tuple[str, str]] = frozenset()
+
+
+def _local_name(tag: str) -> str:
+    """Имя тега без namespace ({http://maven.apache.org/POM/4.0.0}groupId -> groupId)"""
+
+    return tag.rsplit('}', 1)[-1]
+
+
+class PomModel:
+    """Содержимое одного POM-файла без учета родителей: координаты, родитель,
+       свойства, dependencyManagement и зависимости (значения - как в файле, с ${...})"""
+
+    def __init__(self):
+        self.group_id: Optional[str] = None
+        self.artifact_id: Optional[str] = None
+        self.version: Optional[str] = None
+        self.parent: Optional[Tuple[str, str, str]] = None
+        self.properties: Dict[str, str] = {}
+        # Значения записей - строки, кроме 'exclusions' (список пар groupId, artifactId)
+        self.managed: List[Dict[str, Any]] = []
+        self.dependencies: List[Dict[str, Any]] = []
+
+
+def _tail_mentions(data: bytes, offset: int, names: List[str]) -> bool:
+    """Встречается ли в data начиная с offset открывающий тег одной из секций names"""
+
+    return any(_SECTION_RES[name].search(data, offset) for name in names)
+
+
+def parse_model(data: bytes) -> PomModel:
+    """Потоковый разбор POM-файла в PomModel (элементы очищаются по мере разбора)
+
+       После закрытия project/dependencies разбор прекращается, если остаток файла
+       (build, reporting, плагины) на модель повлиять не может: не встреченные еще
+       parent, properties, dependencyManagement и координаты проекта в нем не
+       упоминаются (проверяется поиском тегов, без разбора XML). Иначе файл
+       разбирается до конца. Если XML некорректен - зависимости извлекаются
+       регулярными выражениями, родитель и свойства при этом не учитываются.
+
+       Тело ответа к этому моменту уже прочитано целиком: пул keep-alive соединений
+       должен дочитать ответ, чтобы переиспользовать соединение, а кэш и валидатор
+       снимка (sha1) нужны для всего файла. Поэтому ранняя остановка экономит время
+       разбора, но не передачу по сети и не память; порции подаются парсеру без
+       копирования (memoryview)."""
+
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    path: List[str] = []
+    model = PomModel()
+    project: Dict[str, str] = {}
+    parent: Dict[str, str] = {}
+    current: Optional[Dict[str, Any]] = None
+    exclusion: Optional[Dict[str, str]] = None
+    # Встреченные секции project/* (для ранней остановки)
+    seen: Set[str] = set()
+    finished = False
+
+    view = memoryview(data)
+    try:
+        for offset in range(0, len(data), CHUNK_SIZE):
+            parser.feed(view[offset:offset + CHUNK_SIZE])
+            for event, elem in parser.read_events():
+                if event == 'start':
+                    path.append(_local_name(elem.tag))
+                    if len(path) == 2:
+                        seen.add(path[1])
+                    if tuple(path) in (_DEPENDENCY_PATH, _MANAGED_DEPENDENCY_PATH):
+                        current = {}
+                    elif current is not None and tuple(path) in _EXCLUSION_PATHS:
+                        exclusion = {}
+                    continue
+
+                name = path.pop()
+                owner = tuple(path)
+                if owner == _PROJECT_PATH and name in _DEPENDENCY_FIELDS:
+                    project[name] = (elem.text or '').strip()
+                elif owner == _PARENT_PATH and name in _DEPENDENCY_FIELDS:
+                    parent[name] = (elem.text or '').strip()
+                elif owner == _PROPERTIES_PATH:
+                    model.properties[name] = (elem.text or '').strip()
+                elif current is not None and owner in (_DEPENDENCY_PATH, _MANAGED_DEPENDENCY_PATH):
+                    if name in _MODEL_DEPENDENCY_FIELDS:
+                        current[name] = (elem.text or '').strip()
+                elif exclusion is not None and owner in _EXCLUSION_PATHS:
+                    if name in ('groupId', 'artifactId'):
+                        exclusion[name] = (elem.text or '').strip()
+                elif exclusion is not None and owner + (name,) in _EXCLUSION_PATHS:
+                    if exclusion.get('groupId') and exclusion.get('artifactId'):
+                        current.setdefault('exclusions', []).append((exclusion['groupId'], exclusion['artifactId']))
+                    exclusion = None
+                elif current is not None and owner + (name,) in (_DEPENDENCY_PATH, _MANAGED_DEPENDENCY_PATH):
+                    if current.get('groupId') and current.get('artifactId'):
+                        target = model.dependencies if owner + (name,) == _DEPENDENCY_PATH else model.managed
+                        target.append(current)
+                    current = None
+                elif owner + (name,) == _DEPENDENCIES_PATH:
+                    # Зависимости проекта прочитаны: остаток нужен, только если в нем есть недостающие секции
+                    missing = [section for section in _MODEL_SECTIONS + _DEPENDENCY_FIELDS if section not in seen]
+                    if not _tail_mentions(data, offset, missing):
+                        registry.count('pom_early_exit')
+                        finished = True
+                        break
+
+                if path:
+                    elem.clear()
+            if finished:
+                break
+        if not finished:
+            parser.close()
+    except ET.ParseError:
+        model = PomModel()
+        for group_id, artifact_id, version in _parse_dependencies_fallback(bytes(data).decode('utf-8', errors='replace')):
+            dependency = {'groupId': group_id, 'artifactId': artifact_id}
+            if version != "unknown":
+                dependency['version'] = version
+            model.dependencies.append(dependency)
+        return model
+    finally:
+        # Отображение в память (mmap) нельзя закрыть, пока на него есть memoryview
+        view.release()
+
+    model.group_id = project.get('groupId') or None
+    model.artifact_id = project.get('artifactId') or None
+    model.version = project.get('version') or None
+    if parent.get('groupId') and parent.get('artifactId') and parent.get('version'):
+        model.parent = (parent['groupId'], parent['artifactId'], parent['version'])
+    return model
+
+
+def _parse_dependencies_fallback(pom_content: str) -> List[Tuple[str, str, str]]:
+    """Извлечение зависимостей регулярными выражениями (для некорректного XML)"""
+
+    dependencies = []
+
+    # Вложенные секции со своими dependencies не относятся к зависимостям проекта
+    deps_match = _DEPENDENCIES_RE.search(_NESTED_SECTIONS_RE.sub('', pom_content))
+    if not deps_match:
+        return dependencies
+
+    for dep_match in _DEPENDENCY_RE.finditer(deps_match.group(1)):
+        dep_content = dep_match.group(1)
+
+        group_match = _FIELD_RES['groupId'].search(dep_content)
+        artifact_match = _FIELD_RES['artifactId'].search(dep_content)
+        version_match = _FIELD_RES['version'].search(dep_content)
+
+        if group_match and artifact_match:
+            group_id = group_match.group(1).strip()
+            artifact_id = artifact_match.group(1).strip()
+            version = version_match.group(1).strip() if version_match else "unknown"
+
+            dependencies.append((group_id, artifact_id, version))
+
+    return dependencies
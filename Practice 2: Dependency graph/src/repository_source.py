@@ -0,0 +1,147 @@
+import mmap
+import os
+import urllib.error
+import urllib.parse
+import urllib.request
+from xml.sax.saxutils import escape
+from typing import List, Dict, Optional, Sequence, Tuple, Union
+from pom_cache import PomCache
+from metrics import registry
+from http_pool import HttpConnectionPool
+
+
+# Файлы больше этого размера отображаются в память (mmap), а не читаются целиком
+MMAP_THRESHOLD = 256 * 1024
+
+# Тело файла: bytes или отображение в память (поддерживает срезы, len и буферный протокол)
+Body = Union[bytes, mmap.mmap]
+
+
+def repository_list(repositories: Union[str, Sequence[str]]) -> List[str]:
+    """Список репозиториев цепочки в порядке приоритета; строка - один репозиторий
+
+       Значения не разбираются по разделителям, поэтому путь или URL может содержать любые символы."""
+
+    if isinstance(repositories, str):
+        repositories = [repositories]
+    return [spec.strip() for spec in repositories if spec.strip()]
+
+
+def is_remote(spec: str) -> bool:
+    return spec.startswith(('http://', 'https://'))
+
+
+class LocalSource:
+    """Репозиторий в раскладке Maven на файловой системе (~/.m2/repository, file://-зеркало)
+
+       Сеть не используется. При отсутствии maven-metadata.xml (в ~/.m2 его обычно
+       нет) список версий строится по каталогам, в которых есть POM-файл.
+       Ошибки приводятся к urllib.error, как у удаленного источника."""
+
+    def __init__(self, spec: str):
+        if spec.startswith('file://'):
+            path = urllib.request.url2pathname(urllib.parse.urlparse(spec).path)
+        else:
+            path = spec
+        self.root = os.path.abspath(os.path.expanduser(path))
+        self.name = spec
+        if not os.path.isdir(self.root):
+            raise ValueError(f"Каталог репозитория не найден: {self.root}")
+
+    def fetch(self, path: str, extra_headers: Optional[Dict[str, str]] = None) -> Tuple[Body, Optional[str]]:
+        """Чтение файла репозитория: (тело, None); отсутствующий файл - HTTPError 404"""
+
+        full = os.path.join(self.root, *path.split('/'))
+        try:
+            body = self._read(full)
+        except FileNotFoundError:
+            if path.endswith('/maven-metadata.xml'):
+                body = self._directory_metadata(os.path.dirname(full))
+                if body is not None:
+                    return body, None
+            raise urllib.error.HTTPError(path, 404, 'Not Found', None, None)
+        except OSError as e:
+            raise urllib.error.URLError(f"{full}: {e.strerror}")
+        registry.count('local_files')
+        return body, None
+
+    @staticmethod
+    def _read(full: str) -> Body:
+        with open(full, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < MMAP_THRESHOLD:
+                return f.read()
+            # Отображение остается валидным и после закрытия файла
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @staticmethod
+    def _directory_metadata(artifact_dir: str) -> Optional[bytes]:
+        """maven-metadata.xml, построенный по каталогам версий с POM-файлами"""
+
+        artifact_id = os.path.basename(artifact_dir)
+        try:
+            entries = os.listdir(artifact_dir)
+        except OSError:
+            return None
+        versions = [name for name in entries
+                    if os.path.isfile(os.path.join(artifact_dir, name, f"{artifact_id}-{name}.pom"))]
+        if not versions:
+            return None
+        items = ''.join(f"<version>{escape(v)}</version>" for v in versions)
+        return f"<metadata><versioning><versions>{items}</versions></versioning></metadata>".encode('utf-8')
+
+
+class RemoteSource:
+    """HTTP(S)-репозиторий Maven через пул keep-alive соединений и постоянный кэш"""
+
+    def __init__(self, base_url: str, cache: Optional[PomCache], pool: HttpConnectionPool):
+        self.base_url = base_url.rstrip('/')
+        self.name = self.base_url
+        self.cache = cache
+        self.pool = pool
+
+    def fetch(self, path: str, extra_headers: Optional[Dict[str, str]] = None) -> Tuple[bytes, Optional[str]]:
+        """Загрузка файла с учетом кэша: (тело, ETag)
+
+           При наличии записи в кэше выполняется условный GET (If-None-Match /
+           If-Modified-Since); ответ 304 отдает тело из кэша. В offline-режиме
+           сеть не используется вовсе. Ошибки HTTP пробрасываются вызывающему коду."""
+
+        url = f"{self.base_url}/{path}"
+        entry = self.cache.get(url) if self.cache is not None else None
+
+        if self.cache is not None and self.cache.offline:
+            if entry is None:
+                self.cache.record('misses')
+                raise ConnectionError(f"Файл {url} отсутствует в кэше (offline-режим)")
+            self.cache.record('hits')
+            return entry.body, entry.etag
+
+        headers = entry.conditional_headers() if entry is not None else {}
+        headers.update(extra_headers or {})
+
+        try:
+            response = self.pool.get(url, headers)
+            body = response.body
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+        except urllib.error.HTTPError as e:
+            if e.code == 304 and entry is not None:
+                # Файл не изменился - используем кэшированную копию
+                self.cache.touch(url)
+                return entry.body, entry.etag
+            raise
+
+        if self.cache is not None:
+            self.cache.record('misses')
+            self.cache.put(url, body, etag, last_modified)
+
+        return body, etag
+
+
+def make_source(spec: str, cache: Optional[PomCache], pool: HttpConnectionPool):
+    """Источник по описанию: URL http(s) - удаленный, file:// или путь к каталогу - локальный"""
+
+    if is_remote(spec):
+        return RemoteSource(spec, cache, pool)
+    return LocalSource(spec)
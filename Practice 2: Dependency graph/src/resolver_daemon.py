@@ -0,0 +1,661 @@
+import argparse
+import contextlib
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict, deque
+from http.client import HTTPConnection, HTTPException
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Dict, Set, Optional, Tuple, Callable, Any, Mapping
+from dependency_graph import DependencyGraph, split_gav, split_package_name, make_node_id, is_transient
+from graph_reduction import REDUCTIONS
+from visualizer import dot_lines, render_dot
+from pom_cache import PomCache
+from http_pool import HttpConnectionPool
+from metrics import registry
+
+
+# Запросы демона: forward - граф корня, reverse - кто зависит от пакета, path - цепочки
+# от корня до пакета, render - DOT / SVG графа корня, stats - состояние, reset - сброс графа
+QUERY_TYPES = ('forward', 'reverse', 'path', 'render', 'stats', 'reset')
+RENDER_FORMATS = ('dot', 'svg')
+
+# Число запомненных ответов (сериализованный JSON) до вытеснения самых давних
+RESPONSE_CACHE_SIZE = 1024
+
+# Ограничение размера одного запроса (байт)
+MAX_REQUEST_BYTES = 1024 * 1024
+
+DEFAULT_HOST = '127.0.0.1'
+
+# Целочисленные параметры запроса (для GET-запросов с параметрами в строке URL)
+_INT_PARAMS = ('k', 'max_depth', 'top_k')
+
+
+def _optional_int(request: Mapping[str, Any], key: str, minimum: int = 0) -> Optional[int]:
+    value = request.get(key)
+    if value is None:
+        return None
+    if not isinstance(value, int) or isinstance(value, bool) or value < minimum:
+        raise ValueError(f"Параметр {key} должен быть целым числом не меньше {minimum}")
+    return value
+
+
+def _required_str(request: Mapping[str, Any], key: str) -> str:
+    value = request.get(key)
+    if not isinstance(value, str) or not value:
+        raise ValueError(f"Не указан параметр {key} (group:artifact[:version])")
+    return value
+
+
+def handle_termination() -> None:
+    """SIGTERM обрабатывается так же, как Ctrl+C (KeyboardInterrupt); только в главном потоке"""
+
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+
+@contextlib.contextmanager
+def signals_ignored():
+    """SIGINT и SIGTERM игнорируются внутри блока: повторный сигнал (systemd, GNU timeout
+       шлют его группе процессов) не прерывает остановку демона на полпути"""
+
+    if threading.current_thread() is not threading.main_thread():
+        yield
+        return
+    previous = {sig: signal.signal(sig, signal.SIG_IGN) for sig in (signal.SIGINT, signal.SIGTERM)}
+    try:
+        yield
+    finally:
+        for sig, handler in previous.items():
+            # None - обработчик установлен не из Python, восстановить его нельзя
+            if handler is not None:
+                signal.signal(sig, handler)
+
+
+def limit_depth(view: Mapping[str, List[str]], root_id: str, max_depth: int) -> Dict[str, List[str]]:
+    """Подграф из узлов на глубине не больше max_depth; рёбра узлов на границе отбрасываются"""
+
+    depth = {root_id: 0}
+    queue = deque([root_id])
+    while queue:
+        node = queue.popleft()
+        if depth[node] >= max_depth:
+            continue
+        for child in view.get(node, []):
+            if child not in depth:
+                depth[child] = depth[node] + 1
+                queue.append(child)
+    return {node: (list(view.get(node, [])) if depth[node] < max_depth else []) for node in depth}
+
+
+class ResolverDaemon:
+    """Долгоживущая сессия разрешения зависимостей для серии небольших запросов
+
+       Граф, memo зависимостей, эффективные модели POM, кэш версий и пул
+       keep-alive соединений сохраняются между запросами. Граф корня строится
+       при первом обращении к нему и дальше только читается. Ответы хранятся
+       сериализованными и отдаются без вычисления, пока граф не изменится
+       (построение нового корня сбрасывает их, т.к. меняет обратные зависимости).
+       Граф корня с узлами, не раскрытыми из-за временной ошибки (сеть), неполон:
+       он достраивается при каждом запросе к корню, а ответы по нему не запоминаются.
+       Запросы к графу выполняются по одному (блокировка), готовые ответы - параллельно."""
+
+    def __init__(self, graph_factory: Callable[[], DependencyGraph], cache: Optional[PomCache] = None,
+                 pool: Optional[HttpConnectionPool] = None, cache_size: int = RESPONSE_CACHE_SIZE):
+        self._graph_factory = graph_factory
+        self.graph = graph_factory()
+        self.cache = cache
+        self.pool = pool
+
+        self._lock = threading.RLock()
+        # node_id корней, граф которых построен полностью
+        self._built: Set[str] = set()
+        # Ответ текущего запроса построен по неполному графу и не запоминается
+        self._partial = False
+
+        self._responses: 'OrderedDict[str, str]' = OrderedDict()
+        self._responses_lock = threading.Lock()
+        self._cache_size = cache_size
+
+        self.started = time.time()
+        self.queries = 0
+        self.cached = 0
+        self.errors = 0
+
+    def warm_up(self, roots: List[Tuple[str, Optional[str]]]) -> None:
+        """Построение графов корней и индекса достижимости заранее, до первых запросов"""
+
+        for package, version in roots:
+            self._ensure_root(package, version)
+        if roots:
+            self.graph.reachability_index()
+
+    def handle(self, request: Any) -> Tuple[bool, bytes]:
+        """Выполнение запроса {"op": ..., параметры}: (успех, JSON-ответ)
+
+           Ответ: {"ok": true, "cached": ..., "elapsed_ms": ..., "result": ...}
+           или {"ok": false, "error": "..."}; ошибка запроса не останавливает демон."""
+
+        started = time.perf_counter()
+        cached = False
+        try:
+            if not isinstance(request, dict):
+                raise ValueError("Запрос должен быть JSON-объектом")
+            op = request.get('op')
+            if op not in QUERY_TYPES:
+                raise ValueError(f"Неизвестный запрос: {op}. Допустимые значения: {', '.join(QUERY_TYPES)}")
+
+            if op in ('stats', 'reset'):
+                with self._lock:
+                    result = json.dumps(getattr(self, f"_{op}")(request), ensure_ascii=False)
+            else:
+                key = json.dumps(request, sort_keys=True, ensure_ascii=False)
+                result = self._cached_response(key)
+                cached = result is not None
+                if not cached:
+                    with self._lock:
+                        result = self._cached_response(key)
+                        if result is None:
+                            self._partial = False
+                            result = json.dumps(getattr(self, f"_{op}")(request), ensure_ascii=False)
+                            if not self._partial:
+                                self._remember_response(key, result)
+            ok = True
+        except Exception as e:
+            ok = False
+            result = None
+            error = str(e) or type(e).__name__
+
+        elapsed = time.perf_counter() - started
+        registry.observe('query', elapsed)
+        with self._responses_lock:
+            self.queries += 1
+            self.cached += cached
+            self.errors += not ok
+
+        if not ok:
+            return False, json.dumps({'ok': False, 'error': error}, ensure_ascii=False).encode('utf-8')
+        head = json.dumps({'ok': True, 'cached': cached, 'elapsed_ms': round(elapsed * 1000, 3)})
+        return True, f"{head[:-1]}, \"result\": {result}}}".encode('utf-8')
+
+    def _cached_response(self, key: str) -> Optional[str]:
+        with self._responses_lock:
+            result = self._responses.get(key)
+            if result is not None:
+                self._responses.move_to_end(key)
+            return result
+
+    def _remember_response(self, key: str, result: str) -> None:
+        with self._responses_lock:
+            self._responses[key] = result
+            while len(self._responses) > self._cache_size:
+                self._responses.popitem(last=False)
+
+    def _ensure_root(self, package: str, version: Optional[str]) -> str:
+        """node_id корня; граф строится при первом обращении (неполный - при каждом)"""
+
+        group, artifact = split_package_name(package)
+        root_id = make_node_id(group, artifact, version)
+        if root_id not in self._built:
+            self.graph.build_graph(package, version)
+            if self._complete(root_id):
+                self._built.add(root_id)
+            else:
+                self._partial = True
+            # Новый корень дополняет объединённый граф - прежние ответы могли устареть
+            with self._responses_lock:
+                self._responses.clear()
+        return root_id
+
+    def _complete(self, root_id: Optional[str] = None) -> bool:
+        """Нет ли в графе корня (или во всём графе) узлов с временной ошибкой"""
+
+        failed = [node_id for node_id, error in self.graph.failed.items() if is_transient(error)]
+        if not failed or root_id is None:
+            return not failed
+        view = self.graph.root_view(root_id)
+        return not any(node_id in view for node_id in failed)
+
+    def _root(self, request: Mapping[str, Any]) -> str:
+        package, version = split_gav(_required_str(request, 'root'))
+        return self._ensure_root(package, version)
+
+    def _forward(self, request: Mapping[str, Any]) -> Dict[str, Any]:
+        root_id = self._root(request)
+        max_depth = _optional_int(request, 'max_depth')
+        view = self.graph.root_view(root_id)
+        if max_depth is not None:
+            view = limit_depth(view, root_id, max_depth)
+        return {
+            'root': root_id,
+            'nodes': list(self.graph.node_records(view)),
+            'failed': {node_id: str(error) for node_id, error in self.graph.failed.items() if node_id in view},
+        }
+
+    def _reverse(self, request: Mapping[str, Any]) -> Dict[str, Any]:
+        roots = request.get('roots') or []
+        if not isinstance(roots, list):
+            raise ValueError("Параметр roots должен быть списком group:artifact[:version]")
+        for root in roots:
+            self._root({'root': root})
+
+        # Обратные зависимости считаются по всему объединённому графу
+        if not self._complete():
+            self._partial = True
+
+        target = _required_str(request, 'target')
+        package, version = split_gav(target)
+        dependents = self.graph.get_reverse_dependencies(package, version, _optional_int(request, 'max_depth', 1))
+        return {'target': target, 'roots': list(self.graph.roots), 'dependents': dependents}
+
+    def _path(self, request: Mapping[str, Any]) -> Dict[str, Any]:
+        root_id = self._root(request)
+        target = _required_str(request, 'target')
+        package, version = split_gav(target)
+        k = _optional_int(request, 'k', 1) or 1
+        root_package, root_version = split_gav(request['root'])
+        paths = self.graph.find_paths(root_package, package, version, root_version, k,
+                                      _optional_int(request, 'max_depth', 1))
+        return {'root': root_id, 'target': target, 'paths': paths}
+
+    def _render(self, request: Mapping[str, Any]) -> Dict[str, Any]:
+        root_id = self._root(request)
+        fmt = request.get('format', 'dot')
+        if fmt not in RENDER_FORMATS:
+            raise ValueError(f"Неизвестный формат: {fmt}. Допустимые значения: {', '.join(RENDER_FORMATS)}")
+        reductions = request.get('reductions') or []
+        unknown = [mode for mode in reductions if mode not in REDUCTIONS] if isinstance(reductions, list) else [reductions]
+        if unknown:
+            raise ValueError(f"Неизвестный режим упрощения: {', '.join(map(str, unknown))}")
+
+        graph = self.graph.graph_for_rendering(reductions, _optional_int(request, 'top_k', 1), root_id)
+        if fmt == 'dot':
+            return {'root': root_id, 'format': fmt, 'content': '\n'.join(dot_lines(graph, "G"))}
+
+        # dot пишет только в файл: временный файл читается и удаляется
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'graph.svg')
+            with registry.timer('graphviz'):
+                render_dot(dot_lines(graph, "G"), path)
+            with open(path, 'r', encoding='utf-8') as f:
+                return {'root': root_id, 'format': fmt, 'content': f.read()}
+
+    def _stats(self, request: Mapping[str, Any]) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {
+            'uptime_seconds': round(time.time() - self.started, 1),
+            'queries': self.queries,
+            'cached_responses': self.cached,
+            'errors': self.errors,
+            'stored_responses': len(self._responses),
+            'roots': list(self.graph.roots),
+            'nodes': len(self.graph.graph),
+            'fetches': self.graph.fetches,
+            'memo_hits': self.graph.memo_hits,
+            'failed_nodes': len(self.graph.failed),
+            'metrics': registry.to_dict(),
+        }
+        if self.cache is not None:
+            stats['cache'] = self.cache.summary()
+        if self.pool is not None:
+            stats['pool'] = self.pool.summary()
+        return stats
+
+    def _reset(self, request: Mapping[str, Any]) -> Dict[str, Any]:
+        """Новая сессия графа (например, после публикации новых версий); пул и кэш сохраняются"""
+
+        dropped = len(self.graph.graph)
+        self.graph = self._graph_factory()
+        self._built.clear()
+        with self._responses_lock:
+            self._responses.clear()
+        return {'dropped_nodes': dropped}
+
+
+def request_from_url(path: str) -> Dict[str, Any]:
+    """Запрос по GET-адресу вида /forward?root=g:a:v&max_depth=2 (reductions и roots - через запятую)"""
+
+    parsed = urllib.parse.urlsplit(path)
+    request: Dict[str, Any] = {'op': parsed.path.strip('/')}
+    for key, value in urllib.parse.parse_qsl(parsed.query):
+        if key in _INT_PARAMS:
+            try:
+                request[key] = int(value)
+            except ValueError:
+                raise ValueError(f"Параметр {key} должен быть целым числом")
+        elif key in ('reductions', 'roots'):
+            request[key] = [part for part in value.split(',') if part]
+        else:
+            request[key] = value
+    return request
+
+
+class DaemonServer:
+    """Транспорты демона: HTTP/JSON на localhost и/или Unix-сокет
+
+       HTTP: POST /<op> (или POST / с полем op) с JSON-телом, либо GET /<op>?параметры;
+       соединения keep-alive. Unix-сокет: по одному JSON-запросу на строку, ответы -
+       также построчно; соединение можно держать открытым для серии запросов."""
+
+    def __init__(self, daemon: ResolverDaemon, http_port: Optional[int] = None,
+                 socket_path: Optional[str] = None, host: str = DEFAULT_HOST):
+        if http_port is None and socket_path is None:
+            raise ValueError("Не указан ни HTTP-порт, ни путь к Unix-сокету")
+        self.daemon = daemon
+        self.socket_path = socket_path
+        self._servers: List[socketserver.BaseServer] = []
+        self._threads: List[threading.Thread] = []
+
+        self._http: Optional[ThreadingHTTPServer] = None
+        if http_port is not None:
+            self._http = ThreadingHTTPServer((host, http_port), self._http_handler_class())
+            self._http.daemon_threads = True
+            self._servers.append(self._http)
+
+        if socket_path is not None:
+            if not hasattr(socketserver, 'ThreadingUnixStreamServer'):
+                raise ValueError("Unix-сокеты не поддерживаются в этой системе, используйте HTTP")
+            if os.path.exists(socket_path):
+                self._remove_stale_socket(socket_path)
+            unix = socketserver.ThreadingUnixStreamServer(socket_path, self._socket_handler_class())
+            unix.daemon_threads = True
+            # Доступ к сокету - только у владельца
+            os.chmod(socket_path, 0o600)
+            self._servers.append(unix)
+
+    @property
+    def url(self) -> Optional[str]:
+        if self._http is None:
+            return None
+        host, port = self._http.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @staticmethod
+    def _remove_stale_socket(path: str) -> None:
+        """Удаление сокета, оставшегося от завершившегося демона (занятый сокет - ошибка)"""
+
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+        except OSError:
+            os.unlink(path)
+            return
+        finally:
+            probe.close()
+        raise ValueError(f"Сокет {path} уже используется другим демоном")
+
+    def start(self) -> 'DaemonServer':
+        """Запуск транспортов в фоновых потоках"""
+
+        for server in self._servers:
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def serve_forever(self) -> None:
+        """Обслуживание запросов до Ctrl+C (SIGTERM обрабатывается так же)"""
+
+        handle_termination()
+        self.start()
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+    def stop(self) -> None:
+        """Остановка транспортов и удаление Unix-сокета (сигналы на это время игнорируются)"""
+
+        with signals_ignored():
+            try:
+                # shutdown ждет цикла serve_forever - только для запущенных серверов
+                for i, server in enumerate(self._servers):
+                    if i < len(self._threads):
+                        server.shutdown()
+                    server.server_close()
+                for thread in self._threads:
+                    thread.join()
+                self._threads = []
+            finally:
+                if self.socket_path is not None and os.path.exists(self.socket_path):
+                    os.unlink(self.socket_path)
+
+    def __enter__(self) -> 'DaemonServer':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _http_handler_class(self):
+        daemon = self.daemon
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_GET(self) -> None:
+                try:
+                    request = request_from_url(self.path)
+                except ValueError as e:
+                    self._send(400, json.dumps({'ok': False, 'error': str(e)}, ensure_ascii=False).encode('utf-8'))
+                    return
+                self._reply(request)
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get('Content-Length') or 0)
+                if length > MAX_REQUEST_BYTES:
+                    self.close_connection = True
+                    self._send(413, b'{"ok": false, "error": "request too large"}')
+                    return
+                try:
+                    request = json.loads(self.rfile.read(length) or b'{}')
+                except ValueError as e:
+                    self._send(400, json.dumps({'ok': False, 'error': f"Некорректный JSON: {e}"},
+                                               ensure_ascii=False).encode('utf-8'))
+                    return
+                op = urllib.parse.urlsplit(self.path).path.strip('/')
+                if op and isinstance(request, dict):
+                    request.setdefault('op', op)
+                self._reply(request)
+
+            def _reply(self, request: Any) -> None:
+                ok, body = daemon.handle(request)
+                self._send(200 if ok else 400, body)
+
+            def _send(self, status: int, body: bytes) -> None:
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:
+                pass  # статистика запросов - в ответе stats
+
+        return Handler
+
+    def _socket_handler_class(self):
+        daemon = self.daemon
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                for line in self.rfile:
+                    if not line.strip():
+                        continue
+                    try:
+                        request = json.loads(line)
+                    except ValueError as e:
+                        body = json.dumps({'ok': False, 'error': f"Некорректный JSON: {e}"}, ensure_ascii=False)
+                        self.wfile.write(body.encode('utf-8') + b'\n')
+                        continue
+                    _, body = daemon.handle(request)
+                    self.wfile.write(body + b'\n')
+
+        return Handler
+
+
+class DaemonClient:
+    """Клиент демона: одно соединение (Unix-сокет или HTTP keep-alive) на серию запросов"""
+
+    def __init__(self, socket_path: Optional[str] = None, url: Optional[str] = None, timeout: float = 300.0):
+        if (socket_path is None) == (url is None):
+            raise ValueError("Укажите либо путь к Unix-сокету, либо URL демона")
+        self.socket_path = socket_path
+        self.url = urllib.parse.urlsplit(url) if url is not None else None
+        self.timeout = timeout
+        self._socket: Optional[socket.socket] = None
+        self._reader = None
+        self._http: Optional[HTTPConnection] = None
+
+    def query(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Выполнение запроса; ответ - словарь {"ok": ..., "result" | "error": ...}"""
+
+        if self.socket_path is not None:
+            return self._query_socket(request)
+        return self._query_http(request)
+
+    def _query_socket(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        if self._socket is None:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.settimeout(self.timeout)
+            self._socket.connect(self.socket_path)
+            self._reader = self._socket.makefile('rb')
+        self._socket.sendall(json.dumps(request, ensure_ascii=False).encode('utf-8') + b'\n')
+        line = self._reader.readline()
+        if not line:
+            self.close()
+            raise ConnectionError("Демон закрыл соединение")
+        return json.loads(line)
+
+    def _query_http(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        body = json.dumps(request, ensure_ascii=False).encode('utf-8')
+        for attempt in range(2):
+            if self._http is None:
+                self._http = HTTPConnection(self.url.hostname, self.url.port, timeout=self.timeout)
+            try:
+                self._http.request('POST', '/query', body, {'Content-Type': 'application/json'})
+                return json.loads(self._http.getresponse().read())
+            except (HTTPException, ConnectionError):
+                # Соединение keep-alive закрыто сервером - одна повторная попытка с новым
+                self.close()
+                if attempt:
+                    raise
+        raise ConnectionError("Демон недоступен")
+
+    def close(self) -> None:
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+        if self._http is not None:
+            self._http.close()
+            self._http = None
+
+    def __enter__(self) -> 'DaemonClient':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def build_request(args: argparse.Namespace) -> Dict[str, Any]:
+    """Запрос по аргументам командной строки клиента"""
+
+    request: Dict[str, Any] = {'op': args.op}
+    if args.op in ('forward', 'path', 'render'):
+        if not args.package:
+            raise ValueError(f"Запрос {args.op} требует указания корня (group:artifact[:version])")
+        request['root'] = args.package
+    if args.op == 'reverse':
+        if not args.package:
+            raise ValueError("Запрос reverse требует указания пакета (group:artifact[:version])")
+        request['target'] = args.package
+        if args.root:
+            request['roots'] = args.root
+    if args.op == 'path':
+        if not args.target:
+            raise ValueError("Запрос path требует указания --target")
+        request['target'] = args.target
+        request['k'] = args.paths
+    if args.op == 'render':
+        request['format'] = args.format
+        if args.reduce:
+            request['reductions'] = args.reduce
+        if args.top_k is not None:
+            request['top_k'] = args.top_k
+    if args.max_depth is not None and args.op in ('forward', 'reverse', 'path'):
+        request['max_depth'] = args.max_depth
+    return request
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Клиент демона разрешения зависимостей (запуск демона: cli.py --daemon-socket / --daemon-http)')
+    transport = parser.add_mutually_exclusive_group(required=True)
+    transport.add_argument('--socket', help='Путь к Unix-сокету демона')
+    transport.add_argument('--url', help=f'Адрес HTTP-демона (например: http://{DEFAULT_HOST}:8765)')
+    parser.add_argument('op', choices=QUERY_TYPES, help='Запрос')
+    parser.add_argument('package', nargs='?', default=None,
+                        help='Корень (forward, path, render) или целевой пакет (reverse): group:artifact[:version]')
+    parser.add_argument('--target', help='Для path: пакет, до которого ищутся цепочки')
+    parser.add_argument('--paths', type=int, default=1, help='Для path: количество кратчайших цепочек (по умолчанию: 1)')
+    parser.add_argument('--root', action='append', default=None,
+                        help='Для reverse: корень, граф которого строится до запроса (можно повторять)')
+    parser.add_argument('--max-depth', '-d', type=int, default=None, help='Максимальная глубина')
+    parser.add_argument('--format', choices=RENDER_FORMATS, default='dot', help='Для render: формат (по умолчанию: dot)')
+    parser.add_argument('--reduce', choices=REDUCTIONS, action='append', default=None,
+                        help='Для render: упрощение графа (можно повторять)')
+    parser.add_argument('--top-k', type=int, default=None, help='Для render: оставить k пакетов с наибольшим fan-in')
+    parser.add_argument('--output', '-o', default=None, help='Для render: файл, в который сохраняется результат')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='Повторить запрос N раз по одному соединению и вывести задержки (для замеров)')
+    args = parser.parse_args()
+
+    try:
+        request = build_request(args)
+    except ValueError as e:
+        print(f"Ошибка: {e}")
+        sys.exit(1)
+
+    latencies = []
+    try:
+        with DaemonClient(args.socket, args.url) as client:
+            for _ in range(max(1, args.repeat)):
+                started = time.perf_counter()
+                response = client.query(request)
+                latencies.append((time.perf_counter() - started) * 1000)
+    except (OSError, HTTPException, ValueError) as e:
+        print(f"Ошибка: демон недоступен: {e}")
+        sys.exit(1)
+
+    if not response.get('ok'):
+        print(f"Ошибка: {response.get('error')}")
+        sys.exit(1)
+
+    if args.repeat > 1:
+        first, rest = latencies[0], sorted(latencies[1:])
+        print(f"Запросов: {len(latencies)}, задержка (мс): первый {first:.3f}, "
+              f"повторные - медиана {rest[len(rest) // 2]:.3f}, макс. {rest[-1]:.3f}", file=sys.stderr)
+
+    result = response['result']
+    if args.op == 'render' and args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(result['content'])
+        print(f"Граф сохранён в {args.output}")
+        return
+    json.dump(result, sys.stdout, ensure_ascii=False, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
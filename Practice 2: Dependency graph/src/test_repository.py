@@ -1,77 +1,159 @@
 import os
-from typing import List, Tuple, Optional
+import mmap
+import hashlib
+from array import array
+from typing import List, Dict, Tuple, Optional, Iterable
+from pom_parser import Dependency
 
 
 class TestRepository:
-    """Класс для работы с тестовым репозиторием из txt-файла"""
+    """Класс для работы с тестовым репозиторием из txt-файла
+
+       Файл отображается в память (mmap), при создании строится только индекс
+       «имя пакета -> байтовый диапазон списка зависимостей»; сами списки разбираются
+       при обращении. Поэтому подходят и выгрузки графов на миллионы строк."""
     
     def __init__(self, file_path: str):
         
         self.file_path = file_path
-        self.dependencies = self._load_dependencies()
+        self._file = None
+        self._data = b''
+        # Индекс: имя пакета (и его псевдонимы) -> номер записи; диапазоны - в массивах
+        self._index: Dict[str, int] = {}
+        self._starts = array('q')
+        self._ends = array('q')
+        # Дополнительные строки того же пакета (встречаются редко): номер записи -> диапазоны
+        self._more: Dict[int, List[Tuple[int, int]]] = {}
+        self._load_index()
     
-    def _load_dependencies(self) -> dict:
-        """Загрузка зависимостей из файла"""
+    def _load_index(self) -> None:
+        """Отображение файла в память и построение индекса смещений"""
         
         if not os.path.exists(self.file_path):
             raise ValueError(f"Файл тестового репозитория не найден: {self.file_path}")
         
-        dependencies = {}
+        self._file = open(self.file_path, 'rb')
+        if os.fstat(self._file.fileno()).st_size > 0:
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
         
-        with open(self.file_path, 'r', encoding='utf-8') as file:
-            for line_num, line in enumerate(file, 1):
-                line = line.strip()
-                
-                # Пропускаем пустые строки и комментарии
-                if not line or line.startswith('#'):
-                    continue
-                
+        data = self._data
+        offset = 0
+        line_num = 0
+        size = len(data)
+        while offset < size:
+            line_end = data.find(b'\n', offset)
+            if line_end < 0:
+                line_end = size
+            line_num += 1
+            line = data[offset:line_end]
+            stripped = line.strip()
+            
+            # Пропускаем пустые строки и комментарии
+            if stripped and not stripped.startswith(b'#'):
                 # Формат: PACKAGE -> DEP1, DEP2, DEP3
-                if '->' in line:
-                    package_part, deps_part = line.split('->', 1)
-                    package = package_part.strip()
-                    
-                    if package not in dependencies:
-                        dependencies[package] = []
-                    
-                    # Обрабатываем зависимости
-                    for dep in deps_part.split(','):
-                        dep = dep.strip()
-                        if dep:
-                            # Для тестового репозитория используем фиктивную версию
-                            dependencies[package].append((dep, "1.0.0"))
+                arrow = line.find(b'->')
+                if arrow >= 0:
+                    package = line[:arrow].strip().decode('utf-8')
+                    self._add_range(package, offset + arrow + 2, line_end)
                 else:
-                    print(f"Предупреждение: некорректный формат строки {line_num}: {line}")
+                    text = stripped.decode('utf-8', errors='replace')
+                    print(f"Предупреждение: некорректный формат строки {line_num}: {text}")
+            offset = line_end + 1
         
-        return dependencies
+        # Псевдонимы A:A для простых имен - один раз при построении индекса
+        for package in [name for name in self._index if ':' not in name]:
+            self._index.setdefault(f"{package}:{package}", self._index[package])
     
-    def get_dependencies(self, package_name: str, version: Optional[str] = None) -> List[Tuple[str, str, str]]:
-        """Получение зависимостей пакета
-           Поддерживается поиск как по 'A' так и по 'A:A' (совместимость с форматом group:artifact)"""
-        
-        # Если ключ есть прямо — используем
-        if package_name in self.dependencies:
-            key = package_name
+    def _add_range(self, package: str, start: int, end: int) -> None:
+        slot = self._index.get(package)
+        if slot is None:
+            self._index[package] = len(self._starts)
+            self._starts.append(start)
+            self._ends.append(end)
         else:
-            # Попробуем разбить group:artifact и искать по простой форме (A)
-            if ':' in package_name:
-                left = package_name.split(':', 1)[0]
-                if left in self.dependencies:
-                    key = left
-                else:
-                    # Также попробуем artifact (в случае form A:A)
-                    right = package_name.split(':', 1)[1]
-                    key = right if right in self.dependencies else None
-            else:
-                key = None
-
-        if not key or key not in self.dependencies:
+            self._more.setdefault(slot, []).append((start, end))
+    
+    def __len__(self) -> int:
+        """Количество пакетов в репозитории"""
+        
+        return len(self._starts)
+    
+    def close(self) -> None:
+        """Освобождение отображения файла"""
+        
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._data = b''
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def _slot(self, package_name: str) -> Optional[int]:
+        """Номер записи пакета; поддерживается поиск как по 'A' так и по 'A:A' / 'A:X'
+           (найденный псевдоним запоминается в индексе)"""
+        
+        slot = self._index.get(package_name)
+        if slot is None and ':' in package_name:
+            left, right = package_name.split(':', 1)
+            slot = self._index.get(left)
+            if slot is None:
+                slot = self._index.get(right)
+            if slot is not None:
+                self._index[package_name] = slot
+        return slot
+    
+    def _ranges(self, slot: int) -> List[Tuple[int, int]]:
+        return [(self._starts[slot], self._ends[slot])] + self._more.get(slot, [])
+    
+    def get_dependencies(self, package_name: str, version: Optional[str] = None) -> List[Dependency]:
+        """Получение зависимостей пакета (разбор соответствующих строк файла)"""
+        
+        slot = self._slot(package_name)
+        if slot is None:
             raise ValueError(f"Пакет {package_name} не найден в тестовом репозитории")
         
         # Преобразуем формат для совместимости с MavenClient (group, artifact, version)
         result = []
-        for dep_name, dep_version in self.dependencies[key]:
-            # В тестовом репозитории имена пакетов используются как простые токены — используем их как group и artifact
-            result.append((dep_name, dep_name, dep_version))
+        for start, end in self._ranges(slot):
+            for dep in self._data[start:end].decode('utf-8').split(','):
+                dep = dep.strip()
+                if dep:
+                    # Имена пакетов используются как group и artifact, версия - фиктивная
+                    result.append(Dependency(dep, dep, "1.0.0"))
         
         return result
+    
+    def resolve_version(self, package_name: str, version: Optional[str] = None) -> Optional[str]:
+        """Версия пакета (в тестовом репозитории версии не различаются)"""
+        
+        return version
+    
+    def prefetch_versions(self, packages: Iterable[Tuple[str, str]], executor=None) -> int:
+        """Индексы версий не нужны - версии тестового репозитория не различаются"""
+        
+        return 0
+    
+    def pop_validator(self, package_name: str, version: Optional[str] = None) -> Optional[str]:
+        """Валидатор пакета - хэш его списка зависимостей"""
+        
+        try:
+            dependencies = self.get_dependencies(package_name, version)
+        except ValueError:
+            return None
+        coordinates = [dep[:3] for dep in dependencies]
+        return "sha1:" + hashlib.sha1(repr(coordinates).encode('utf-8')).hexdigest()
+    
+    def pop_model_chain(self, package_name: str, version: Optional[str] = None) -> Dict[str, str]:
+        """Родителей и BOM в тестовом репозитории нет"""
+        
+        return {}
+    
+    def discard_validator(self, package_name: str, version: Optional[str] = None) -> None:
+        """Валидаторы тестового репозитория вычисляются по запросу - хранить нечего"""
+    
+    def revalidate(self, package_name: str, version: Optional[str], validator: str) -> Optional[List[Dependency]]:
+        """Новые зависимости пакета или None, если они не изменились"""
+        
+        if self.pop_validator(package_name, version) == validator:
+            return None
+        return self.get_dependencies(package_name, version)
@@ -1,31 +1,81 @@
 import subprocess
-from typing import Dict, List
+import tempfile
+from typing import Dict, List, Iterable, Iterator, Mapping, TextIO
 
 
-class GraphvizExporter:
-    """Генератор DOT-файлов для Graphviz"""
-    
-    def __init__(self, dependencies: Dict[str, List[str]]):
-        self.dependencies = dependencies
+# Количество строк DOT, передаваемых в поток за одну запись
+WRITE_CHUNK_LINES = 1024
 
-    def build_dot(self) -> str:
-        """Формирует текст файла Graphviz"""
-        
-        lines = ["digraph dependencies {"]
 
-        for pkg, deps in self.dependencies.items():
-            for dep in deps:
-                lines.append(f'    "{pkg}" -> "{dep}";')
+def escape_label(text: str) -> str:
+    """Экранирование строки для использования в кавычках DOT"""
 
-        lines.append("}")
-        return "\n".join(lines)
+    return text.replace('\\', '\\\\').replace('"', '\\"')
 
-    def save_dot(self, filename: str):
-        dot_text = self.build_dot()
-        with open(filename, "w", encoding="utf-8") as f:
-            f.write(dot_text)
 
-    def save_svg(self, dot_file: str, svg_file: str):
-        """Конвертация DOT в SVG через Graphviz. Требует установленного dot в системе"""
-        
-        subprocess.run(["dot", "-Tsvg", dot_file, "-o", svg_file], check=True)
+def dot_lines(dependencies: Mapping[str, Iterable[str]], name: str = "dependencies") -> Iterator[str]:
+    """Потоковая генерация DOT: строки выдаются по мере обхода графа
+
+       Каждый узел объявляется один раз (короткий идентификатор n<номер> и
+       экранированная метка), рёбра ссылаются на идентификаторы."""
+
+    yield f"digraph {name} {{"
+
+    ids: Dict[str, str] = {}
+
+    def declare(node: str) -> Iterator[str]:
+        if node not in ids:
+            ids[node] = f"n{len(ids)}"
+            yield f'    {ids[node]} [label="{escape_label(node)}"];'
+
+    for pkg, deps in dependencies.items():
+        yield from declare(pkg)
+        for dep in deps:
+            yield from declare(dep)
+            yield f"    {ids[pkg]} -> {ids[dep]};"
+
+    yield "}"
+
+
+def write_dot(lines: Iterable[str], out: TextIO) -> None:
+    """Запись строк DOT в поток порциями"""
+
+    chunk: List[str] = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= WRITE_CHUNK_LINES:
+            out.write('\n'.join(chunk) + '\n')
+            chunk = []
+    if chunk:
+        out.write('\n'.join(chunk) + '\n')
+
+
+def render_dot(lines: Iterable[str], output_file: str, fmt: str = "svg") -> None:
+    """Передача DOT напрямую в stdin процесса dot (без промежуточного файла)
+
+       Требует программы dot из Graphviz в PATH. Сообщения dot пишутся во
+       временный файл, а не в канал: иначе при большом количестве
+       предупреждений dot блокируется на записи в stderr, пока мы пишем в stdin."""
+
+    with tempfile.TemporaryFile(mode="w+", encoding="utf-8") as errors:
+        try:
+            process = subprocess.Popen(["dot", f"-T{fmt}", "-o", output_file],
+                                       stdin=subprocess.PIPE, stderr=errors,
+                                       text=True, encoding="utf-8")
+        except FileNotFoundError:
+            raise RuntimeError("Не найдена программа dot: установите Graphviz и добавьте dot в PATH")
+
+        try:
+            write_dot(lines, process.stdin)
+        except BrokenPipeError:
+            # dot завершился раньше времени - причина будет в stderr
+            pass
+        finally:
+            try:
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+
+        if process.wait() != 0:
+            errors.seek(0)
+            raise RuntimeError(f"Ошибка Graphviz при построении {output_file}: {errors.read().strip()}")
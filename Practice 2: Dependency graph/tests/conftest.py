@@ -0,0 +1,28 @@
+import os
+import sys
+
+import pytest
+
+# Модули проекта лежат в src/ и импортируются по имени (как в cli.py)
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src')
+TEST_REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test_repo.txt')
+
+sys.path.insert(0, os.path.abspath(SRC_DIR))
+
+
+@pytest.fixture
+def local_server():
+    """Запуск LocalMavenServer: local_server(content, **параметры); серверы останавливаются после теста"""
+
+    from local_maven_server import LocalMavenServer
+
+    servers = []
+
+    def start(content, **options):
+        server = LocalMavenServer(content, **options).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
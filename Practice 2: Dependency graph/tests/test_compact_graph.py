@@ -0,0 +1,109 @@
+import contextlib
+import io
+
+import pytest
+
+from compact_graph import CompactGraph, COMPACT_MIN_GARBAGE
+from conftest import TEST_REPO
+from dependency_graph import DependencyGraph
+from graph_generator import write_repository
+
+
+def build(repo, roots, max_depth=None, **options):
+    graph = DependencyGraph(repo, test_mode=True, **options)
+    with contextlib.redirect_stdout(io.StringIO()):
+        graph.build_graphs(roots, max_depth)
+    return graph
+
+
+def outputs(graph, roots):
+    result = {'dot': graph.to_dot()}
+    for fmt in ('json', 'ndjson'):
+        out = io.StringIO()
+        graph.write_graph(fmt, out)
+        result[fmt] = out.getvalue()
+    for package, version in roots:
+        out = io.StringIO()
+        graph.print_graph(package, version, out=out)
+        result[package] = out.getvalue()
+    return result
+
+
+@pytest.fixture(scope='module')
+def cycles_repo(tmp_path_factory):
+    path = tmp_path_factory.mktemp('repo') / 'cycles.txt'
+    write_repository(str(path), 'cycles', 300, degree=3, seed=6)
+    return str(path)
+
+
+@pytest.mark.parametrize('roots, max_depth', [
+    ([('H', None), ('A', None)], None),
+    ([('H', None), ('A', None)], 2),
+    ([('N7', None), ('N0', None), ('N150', None)], None),
+    ([('N7', None), ('N0', None)], 3),
+])
+def test_backends_write_identical_output(roots, max_depth, cycles_repo):
+    repo = cycles_repo if roots[0][0].startswith('N') else TEST_REPO
+    plain = build(repo, roots, max_depth=max_depth)
+    compact = build(repo, roots, max_depth=max_depth, compact=True)
+
+    # Порядок узлов (DOT, json) - порядок добавления в граф, как у словаря
+    assert list(compact.graph) == list(plain.graph)
+    assert list(compact.meta) == list(plain.meta)
+    assert outputs(compact, roots) == outputs(plain, roots)
+
+
+def test_order_after_interrupted_traversal(cycles_repo):
+    # Прерванный обход (--find) оставляет найденные, но не раскрытые узлы: в граф
+    # они попадают позже и в другом порядке, чем были интернированы
+    results = []
+    for compact in (False, True):
+        graph = DependencyGraph(cycles_repo, test_mode=True, compact=compact)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for count, _ in enumerate(graph.iter_graph('N0')):
+                if count == 20:
+                    break
+            graph.build_graphs([('N200', None)])
+        results.append((list(graph.graph), outputs(graph, [('N200', None)])))
+
+    assert results[1] == results[0]
+
+
+def test_node_sets_use_compact_flags():
+    graph = build(TEST_REPO, [('A', None)], compact=True)
+
+    assert 'B:B:1.0.0' in graph.visited and 'unknown:node' not in graph.visited
+    assert sorted(graph._expanded) == sorted(graph.graph)
+    assert len(graph.visited) == len(graph.graph)
+
+
+def test_memory_usage_counts_session_data():
+    for compact in (False, True):
+        graph = build(TEST_REPO, [('A', None)], compact=compact)
+
+        graph_bytes, session_bytes = graph.memory_usage()
+
+        # memo зависимостей и множества узлов - тоже память на узел
+        assert graph_bytes > 0 and session_bytes > 0
+
+
+def test_set_edges_reuses_blocks_and_compacts():
+    store = CompactGraph()
+    store.graph['a'] = ['b', 'c', 'd']
+    store.graph['b'] = ['c']
+    start = store.edge_start[store.intern('a')]
+
+    # Меньший блок пишется на прежнее место, последний блок - перезаписывается в конце
+    store.graph['a'] = ['c']
+    store.graph['b'] = ['a', 'c', 'd']
+    assert store.edge_start[store.intern('a')] == start
+    assert len(store.targets) == 6
+
+    for _ in range(COMPACT_MIN_GARBAGE):
+        store.graph['a'] = ['b', 'c']
+        store.graph['a'] = ['b', 'c', 'd', 'a']
+        store.graph['b'] = ['c', 'd']
+
+    assert len(store.targets) < 2 * COMPACT_MIN_GARBAGE
+    assert store.graph['a'] == ['b', 'c', 'd', 'a'] and store.graph['b'] == ['c', 'd']
+    assert list(store.graph) == ['a', 'b']
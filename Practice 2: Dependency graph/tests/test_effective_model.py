@@ -0,0 +1,199 @@
+import pytest
+
+from effective_model import EffectiveModelBuilder, interpolate
+from pom_parser import Dependency
+
+
+def pom(group, artifact, version, parent=None, properties=None, managed=(), dependencies=()):
+    """Текст POM-файла: managed и dependencies - кортежи (group, artifact, version[, scope[, прочее]])"""
+
+    def entries(items):
+        result = []
+        for item in items:
+            group_id, artifact_id, version_id = item[:3]
+            scope = f"<scope>{item[3]}</scope>" if len(item) > 3 and item[3] else ""
+            extra = item[4] if len(item) > 4 else ""
+            version_tag = f"<version>{version_id}</version>" if version_id else ""
+            result.append(f"<dependency><groupId>{group_id}</groupId><artifactId>{artifact_id}</artifactId>"
+                          f"{version_tag}{scope}{extra}</dependency>")
+        return "".join(result)
+
+    parent_tag = ""
+    if parent is not None:
+        parent_tag = (f"<parent><groupId>{parent[0]}</groupId><artifactId>{parent[1]}</artifactId>"
+                      f"<version>{parent[2]}</version></parent>")
+    props = "".join(f"<{name}>{value}</{name}>" for name, value in (properties or {}).items())
+    return (f'<?xml version="1.0"?><project xmlns="http://maven.apache.org/POM/4.0.0">'
+            f"<modelVersion>4.0.0</modelVersion>{parent_tag}"
+            f"<groupId>{group}</groupId><artifactId>{artifact}</artifactId><version>{version}</version>"
+            f"<properties>{props}</properties>"
+            f"<dependencyManagement><dependencies>{entries(managed)}</dependencies></dependencyManagement>"
+            f"<dependencies>{entries(dependencies)}</dependencies></project>").encode('utf-8')
+
+
+EXCLUDE_X = "<exclusions><exclusion><groupId>org.x</groupId><artifactId>*</artifactId></exclusion></exclusions>"
+
+POMS = {
+    ('org.p', 'parent', '1'): pom(
+        'org.p', 'parent', '1',
+        properties={'lib.version': '1.0', 'bom.version': '3'},
+        managed=[('org.lib', 'a', '${lib.version}'),
+                 ('org.lib', 'b', '2.0', 'runtime', EXCLUDE_X),
+                 ('org.b', 'bom', '${bom.version}', 'import', '<type>pom</type>')],
+        dependencies=[('org.lib', 'log', '1')]),
+    ('org.b', 'bom', '3'): pom(
+        'org.b', 'bom', '3',
+        properties={'c.version': '3.1'},
+        managed=[('org.lib', 'c', '${c.version}'), ('org.lib', 'a', '9.9')]),
+}
+
+
+class Fetcher:
+    def __init__(self, poms):
+        self.poms = poms
+        self.calls = []
+
+    def __call__(self, group, artifact, version):
+        self.calls.append((group, artifact, version))
+        try:
+            return self.poms[(group, artifact, version)]
+        except KeyError:
+            raise ValueError(f"POM-файл для {group}:{artifact}:{version} не найден")
+
+
+def resolve(data, coordinates=('org.app', 'app', '1'), poms=POMS):
+    builder = EffectiveModelBuilder(Fetcher(poms))
+    deps, lineage = builder.resolve(data, *coordinates)
+    return {(dep.group, dep.artifact): dep for dep in deps}, lineage
+
+
+def test_versions_come_from_parent_properties_and_bom():
+    data = pom('org.app', 'app', '1', parent=('org.p', 'parent', '1'),
+               dependencies=[('org.lib', 'a', ''), ('org.lib', 'b', ''), ('org.lib', 'c', ''),
+                             ('org.lib', 'd', '${project.version}'), ('${project.groupId}', 'e', '5')])
+
+    deps, lineage = resolve(data)
+
+    # Явная запись родителя важнее записи импортированного BOM
+    assert deps[('org.lib', 'a')].version == '1.0'
+    assert deps[('org.lib', 'c')].version == '3.1'
+    assert deps[('org.lib', 'd')].version == '1'
+    assert deps[('org.app', 'e')].version == '5'
+    # Зависимости родителя наследуются
+    assert deps[('org.lib', 'log')] == Dependency('org.lib', 'log', '1')
+    assert lineage == {('org.p', 'parent', '1'), ('org.b', 'bom', '3')}
+
+
+def test_managed_scope_and_exclusions_apply_to_undeclared_attributes():
+    data = pom('org.app', 'app', '1', parent=('org.p', 'parent', '1'),
+               dependencies=[('org.lib', 'b', ''), ('org.lib', 'a', '', 'test')])
+
+    deps, _ = resolve(data)
+
+    assert deps[('org.lib', 'b')] == Dependency('org.lib', 'b', '2.0', 'runtime', False, frozenset({('org.x', '*')}))
+    assert deps[('org.lib', 'a')].scope == 'test'
+
+
+def test_child_property_overrides_parent_management():
+    data = pom('org.app', 'app', '1', parent=('org.p', 'parent', '1'),
+               properties={'lib.version': '1.5'},
+               dependencies=[('org.lib', 'a', ''), ('org.lib', 'c', '')])
+
+    deps, _ = resolve(data)
+
+    assert deps[('org.lib', 'a')].version == '1.5'
+    assert deps[('org.lib', 'c')].version == '3.1'
+
+
+def test_unresolved_version_is_unknown():
+    data = pom('org.app', 'app', '1', dependencies=[('org.lib', 'z', '${missing.version}'), ('org.lib', 'y', '')])
+
+    deps, lineage = resolve(data)
+
+    assert deps[('org.lib', 'z')].version == 'unknown'
+    assert deps[('org.lib', 'y')].version == 'unknown'
+    assert lineage == frozenset()
+
+
+def test_parent_and_bom_models_are_shared():
+    fetcher = Fetcher(POMS)
+    builder = EffectiveModelBuilder(fetcher)
+    for artifact in ('one', 'two', 'three'):
+        data = pom('org.app', artifact, '1', parent=('org.p', 'parent', '1'), dependencies=[('org.lib', 'c', '')])
+        deps = builder.dependencies(data, 'org.app', artifact, '1')
+        assert deps[0].version == '3.1'
+
+    assert sorted(fetcher.calls) == [('org.b', 'bom', '3'), ('org.p', 'parent', '1')]
+    assert builder.summary()['parent_models'] == 2
+
+
+def test_missing_parent_and_parent_cycle_do_not_fail():
+    poms = {
+        ('org.c', 'one', '1'): pom('org.c', 'one', '1', parent=('org.c', 'two', '1')),
+        ('org.c', 'two', '1'): pom('org.c', 'two', '1', parent=('org.c', 'one', '1')),
+    }
+    missing = pom('org.app', 'app', '1', parent=('org.none', 'parent', '1'), dependencies=[('org.lib', 'a', '2')])
+    cyclic = pom('org.app', 'app', '1', parent=('org.c', 'one', '1'), dependencies=[('org.lib', 'a', '2')])
+
+    for data in (missing, cyclic):
+        deps, _ = resolve(data, poms=poms)
+        assert deps[('org.lib', 'a')].version == '2'
+
+
+class FlakyFetcher(Fetcher):
+    """Первая загрузка каждого из failing POM-файлов завершается сетевой ошибкой"""
+
+    def __init__(self, poms, failing):
+        super().__init__(poms)
+        self.failing = set(failing)
+
+    def __call__(self, group, artifact, version):
+        if (group, artifact, version) in self.failing:
+            self.failing.discard((group, artifact, version))
+            self.calls.append((group, artifact, version))
+            raise ConnectionError(f"Ошибка HTTP 503 для {group}:{artifact}:{version}")
+        return super().__call__(group, artifact, version)
+
+
+@pytest.mark.parametrize('failing', [('org.p', 'parent', '1'), ('org.b', 'bom', '3')], ids=['parent', 'bom'])
+def test_transient_parent_failure_is_not_cached(failing):
+    fetcher = FlakyFetcher(POMS, [failing])
+    builder = EffectiveModelBuilder(fetcher)
+    data = pom('org.app', 'app', '1', parent=('org.p', 'parent', '1'),
+               dependencies=[('org.lib', 'a', ''), ('org.lib', 'c', '')])
+
+    # Временная ошибка пробрасывается, а не превращается в версию «unknown»
+    with pytest.raises(ConnectionError):
+        builder.resolve(data, 'org.app', 'app', '1')
+
+    deps, lineage = builder.resolve(data, 'org.app', 'app', '1')
+
+    assert [(dep.artifact, dep.version) for dep in deps] == [('a', '1.0'), ('c', '3.1'), ('log', '1')]
+    assert lineage == {('org.p', 'parent', '1'), ('org.b', 'bom', '3')}
+    assert fetcher.calls.count(failing) == 2
+
+
+def test_interpolate_nested_and_unknown_properties():
+    properties = {'a': '${b}', 'b': '${c}', 'c': 'value', 'loop': '${loop}'}
+
+    assert interpolate('x-${a}-y', properties) == 'x-value-y'
+    assert interpolate('${unknown}', properties) == '${unknown}'
+    assert interpolate('${loop}', properties) == '${loop}'
+
+
+def test_sections_after_dependencies_are_still_read():
+    # parse_model останавливается после <dependencies>, только если дальше нет нужных разделов
+    data = (b'<project><modelVersion>4.0.0</modelVersion><groupId>org.app</groupId>'
+            b'<artifactId>app</artifactId><version>1</version>'
+            b'<dependencies><dependency><groupId>org.lib</groupId><artifactId>a</artifactId></dependency>'
+            b'<dependency><groupId>org.lib</groupId><artifactId>b</artifactId>'
+            b'<version>${b.version}</version></dependency></dependencies>'
+            b'<properties><b.version>4.2</b.version></properties>'
+            b'<dependencyManagement><dependencies><dependency><groupId>org.lib</groupId>'
+            b'<artifactId>a</artifactId><version>7</version></dependency></dependencies></dependencyManagement>'
+            b'<build><plugins/></build></project>')
+
+    deps, _ = resolve(data)
+
+    assert deps[('org.lib', 'a')].version == '7'
+    assert deps[('org.lib', 'b')].version == '4.2'
@@ -0,0 +1,143 @@
+import random
+
+import pytest
+
+from graph_analysis import (strongly_connected_components, is_cyclic, component_cycle, condensation,
+                            ReachabilityIndex)
+
+
+# Граф tests/test_repo.txt
+REPO_GRAPH = {
+    'A': ['B', 'C'],
+    'B': ['D', 'E'],
+    'C': ['F', 'G'],
+    'D': ['H'],
+    'E': [],
+    'F': ['B', 'G'],
+    'G': [],
+    'H': ['A'],
+}
+
+
+def reachable(graph, start):
+    """Множество узлов, достижимых из start (включая его самого) - эталон для проверок"""
+
+    seen = {start}
+    stack = [start]
+    while stack:
+        for child in graph.get(stack.pop(), []):
+            if child not in seen:
+                seen.add(child)
+                stack.append(child)
+    return seen
+
+
+def random_graph(rnd, nodes, edges):
+    graph = {f"n{i}": [] for i in range(nodes)}
+    for _ in range(edges):
+        graph[f"n{rnd.randrange(nodes)}"].append(f"n{rnd.randrange(nodes)}")
+    return graph
+
+
+def test_components_of_repo_graph():
+    components = strongly_connected_components(REPO_GRAPH)
+
+    assert sorted(map(sorted, components)) == [['A', 'B', 'C', 'D', 'F', 'H'], ['E'], ['G']]
+
+
+def test_components_match_mutual_reachability():
+    rnd = random.Random(8)
+    for _ in range(50):
+        graph = random_graph(rnd, rnd.randint(1, 30), rnd.randint(0, 60))
+        closure = {node: reachable(graph, node) for node in graph}
+
+        components = strongly_connected_components(graph)
+
+        assert sorted(node for component in components for node in component) == sorted(graph)
+        for component in components:
+            for node in graph:
+                same = component[0] in closure[node] and node in closure[component[0]]
+                assert same == (node in component)
+
+
+def test_components_are_in_reverse_topological_order():
+    rnd = random.Random(9)
+    for _ in range(50):
+        graph = random_graph(rnd, rnd.randint(1, 30), rnd.randint(0, 60))
+        components = strongly_connected_components(graph)
+
+        dag = condensation(components, graph)
+
+        # Компоненты - от стоков к истокам: ребро DAG ведет к компоненте с меньшим номером
+        assert all(target < source for source, targets in dag.items() for target in targets)
+
+
+def test_condensation_keeps_edges_between_components():
+    graph = {'a': ['b'], 'b': ['a', 'c'], 'c': ['d'], 'd': ['c', 'e'], 'e': []}
+    components = strongly_connected_components(graph)
+    component_of = {node: i for i, component in enumerate(components) for node in component}
+
+    dag = condensation(components, graph)
+
+    assert dag == {
+        component_of['a']: [component_of['c']],
+        component_of['c']: [component_of['e']],
+        component_of['e']: [],
+    }
+
+
+def test_targets_without_own_entry_are_leaves():
+    components = strongly_connected_components({'a': ['b', 'c'], 'b': ['a']})
+
+    assert sorted(map(sorted, components)) == [['a', 'b'], ['c']]
+
+
+def test_deep_chain_does_not_recurse():
+    graph = {f"n{i}": [f"n{i + 1}"] for i in range(100000)}
+    graph['n100000'] = ['n0']
+
+    components = strongly_connected_components(graph)
+
+    assert len(components) == 1 and len(components[0]) == 100001
+
+
+def test_is_cyclic():
+    assert is_cyclic(['a', 'b'], {'a': ['b'], 'b': ['a']})
+    assert is_cyclic(['a'], {'a': ['a']})
+    assert not is_cyclic(['a'], {'a': ['b']})
+
+
+def test_component_cycle_is_a_cycle_inside_the_component():
+    for component in strongly_connected_components(REPO_GRAPH):
+        cycle = component_cycle(component, REPO_GRAPH)
+        if len(component) == 1:
+            assert cycle is None
+            continue
+        assert cycle[0] == cycle[-1] == component[0]
+        assert set(cycle) <= set(component)
+        assert all(b in REPO_GRAPH[a] for a, b in zip(cycle, cycle[1:]))
+
+
+@pytest.mark.parametrize('limit', [None, 0])
+def test_reachability_index_matches_search(limit):
+    rnd = random.Random(10)
+    for _ in range(30):
+        graph = random_graph(rnd, rnd.randint(1, 30), rnd.randint(0, 50))
+        # Достижимость по пути хотя бы из одного ребра (узел достижим из себя только в цикле)
+        strict = {node: set().union(*(reachable(graph, child) for child in graph[node])) for node in graph}
+
+        index = ReachabilityIndex(graph, limit=limit)
+
+        assert index.labeled == (limit is None)
+        for a in graph:
+            assert sorted(index.descendants(a)) == sorted(strict[a] - {a})
+            assert sorted(index.ancestors(a)) == sorted(b for b in graph if a in strict[b] and b != a)
+            for b in graph:
+                assert index.reaches(a, b) == (b in strict[a])
+
+
+def test_unlabeled_index_refuses_bitsets():
+    index = ReachabilityIndex({'a': ['b'], 'b': []}, limit=1)
+
+    with pytest.raises(ValueError):
+        index.component_descendants(0)
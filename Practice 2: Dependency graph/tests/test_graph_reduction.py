@@ -0,0 +1,99 @@
+import random
+
+import pytest
+
+from graph_analysis import MAX_LABELED_COMPONENTS
+from graph_reduction import transitive_reduction, top_k_by_fan_in, reduce_graph, edge_count
+from test_graph_analysis import REPO_GRAPH, reachable, random_graph
+
+
+def closure(graph):
+    nodes = set(graph) | {child for children in graph.values() for child in children}
+    return {node: reachable(graph, node) for node in nodes}
+
+
+def random_dag(rnd, nodes, edges):
+    graph = {f"n{i}": [] for i in range(nodes)}
+    for _ in range(edges):
+        a, b = sorted(rnd.sample(range(nodes), 2)) if nodes > 1 else (0, 0)
+        if a != b:
+            graph[f"n{a}"].append(f"n{b}")
+    return graph
+
+
+def test_reduction_of_a_diamond_drops_the_shortcut():
+    graph = {'a': ['b', 'c', 'd'], 'b': ['d'], 'c': ['d'], 'd': []}
+
+    assert transitive_reduction(graph) == {'a': ['b', 'c'], 'b': ['d'], 'c': ['d'], 'd': []}
+
+
+# 0 - без битовых меток, обходом графа конденсации (как для больших графов)
+LIMITS = pytest.mark.parametrize('limit', [MAX_LABELED_COMPONENTS, 0], ids=['labeled', 'search'])
+
+
+@LIMITS
+def test_reduction_of_a_dag_is_minimal_and_keeps_reachability(limit):
+    rnd = random.Random(12)
+    for _ in range(50):
+        graph = random_dag(rnd, rnd.randint(1, 25), rnd.randint(0, 80))
+
+        reduced = transitive_reduction(graph, limit=limit)
+
+        assert closure(reduced) == closure(graph)
+        for node, children in reduced.items():
+            assert len(set(children)) == len(children)
+            for child in children:
+                # Ни одно оставшееся ребро не выводится из остальных
+                others = {**reduced, node: [c for c in children if c != child]}
+                assert child not in reachable(others, node)
+
+
+@LIMITS
+def test_reduction_keeps_reachability_with_cycles(limit):
+    rnd = random.Random(13)
+    for _ in range(50):
+        graph = random_graph(rnd, rnd.randint(1, 25), rnd.randint(0, 60))
+
+        reduced = transitive_reduction(graph, limit=limit)
+
+        assert closure(reduced) == closure(graph)
+        assert edge_count(reduced) <= edge_count(graph)
+
+
+def test_reduction_without_labels_matches_labeled():
+    rnd = random.Random(14)
+    for _ in range(50):
+        graph = random_graph(rnd, rnd.randint(1, 40), rnd.randint(0, 90))
+
+        assert transitive_reduction(graph, limit=0) == transitive_reduction(graph)
+
+
+def test_reduction_keeps_edges_inside_cycles():
+    reduced = transitive_reduction(REPO_GRAPH)
+
+    cycle = {'A', 'B', 'C', 'D', 'F', 'H'}
+    inner = [(node, child) for node in cycle for child in REPO_GRAPH[node] if child in cycle]
+    outer = sorted((node, child) for node in cycle for child in reduced[node] if child not in cycle)
+
+    assert all(child in reduced[node] for node, child in inner)
+    # Между парой компонент остается одно представительное ребро
+    assert outer == [('B', 'E'), ('C', 'G')]
+    assert reduced['E'] == [] and reduced['G'] == []
+
+
+def test_top_k_summary_keeps_transitive_dependencies():
+    graph = {'root': ['a', 'b'], 'a': ['lib'], 'b': ['lib', 'util'], 'lib': ['util'], 'util': []}
+
+    summary = top_k_by_fan_in(graph, ['root'], 2)
+
+    assert summary == {'root': ['lib'], 'lib': ['util'], 'util': []}
+
+
+def test_reduce_graph_collapses_versions_before_reduction():
+    graph = {'g:a:1': ['g:b:1', 'g:b:2'], 'g:b:1': ['h:c:1'], 'g:b:2': [], 'h:c:1': []}
+
+    def coordinates(node):
+        return tuple(node.split(':'))
+
+    assert reduce_graph(graph, coordinates, ['versions']) == {'g:a': ['g:b'], 'g:b': ['h:c'], 'h:c': []}
+    assert reduce_graph(graph, coordinates, ['groups', 'transitive']) == {'g': ['h'], 'h': []}
@@ -0,0 +1,238 @@
+import threading
+import time
+import urllib.error
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import http_pool
+from http_pool import HttpConnectionPool, TokenBucket, parse_retry_after
+
+
+class SlowContent:
+    """Содержимое сервера, отдающее файл с задержкой и считающее запросы
+
+       Статистика сервера (summary) пишется после отправки ответа и может отстать от клиента."""
+
+    def __init__(self, files, delay=0.0):
+        self.files = files
+        self.delay = delay
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+            return self.files.get(path)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def run_parallel(count, target):
+    results = [None] * count
+
+    def work(i):
+        results[i] = target(i)
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_keep_alive_connection_is_reused(local_server):
+    server = local_server({f'/f{i}': b'x' * i for i in range(5)})
+    pool = HttpConnectionPool()
+
+    bodies = [pool.get(f"{server.url}/f{i}").body for i in range(5)]
+
+    assert bodies == [b'x' * i for i in range(5)]
+    assert (pool.connections_opened, pool.connections_reused) == (1, 4)
+    pool.close()
+
+
+def test_connections_per_host_are_limited(local_server):
+    content = SlowContent({f'/f{i}': b'data' for i in range(8)}, delay=0.05)
+    server = local_server(content)
+    pool = HttpConnectionPool(max_per_host=2)
+
+    bodies = run_parallel(8, lambda i: pool.get(f"{server.url}/f{i}").body)
+
+    assert bodies == [b'data'] * 8
+    assert content.peak == 2
+    assert pool.connections_opened == 2 and pool.requests == 8
+    pool.close()
+
+
+def test_gzip_responses_are_decoded(local_server):
+    body = b'<project>' + b'<dependency/>' * 1000 + b'</project>'
+    server = local_server({'/a.pom': body})
+    pool = HttpConnectionPool()
+
+    response = pool.get(f"{server.url}/a.pom")
+
+    assert response.body == body
+    assert response.headers.get('Content-Encoding') == 'gzip'
+    assert pool.gzip_responses == 1
+    assert pool.bytes_received < pool.bytes_decoded == len(body)
+    pool.close()
+
+
+def test_missing_file_raises_http_error(local_server):
+    server = local_server({})
+    pool = HttpConnectionPool()
+
+    with pytest.raises(urllib.error.HTTPError) as error:
+        pool.get(f"{server.url}/missing.pom")
+
+    assert error.value.code == 404
+    assert pool.retried == 0
+    pool.close()
+
+
+@pytest.fixture
+def scripted_server():
+    """HTTP-сервер, отвечающий по сценарию: (код, заголовки) по очереди, затем 200 с телом"""
+
+    servers = []
+
+    def start(script, body=b'ok'):
+        requests = []
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                requests.append(time.monotonic())
+                status, headers = script.pop(0) if script else (200, {})
+                payload = body if status == 200 else b''
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+        servers.append(server)
+        host, port = server.server_address[:2]
+        return f"http://{host}:{port}", requests
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_identical_concurrent_requests_are_coalesced(local_server):
+    content = SlowContent({'/a.pom': b'<project/>'}, delay=0.2)
+    server = local_server(content)
+    pool = HttpConnectionPool()
+
+    bodies = run_parallel(6, lambda i: pool.get(f"{server.url}/a.pom").body)
+
+    assert bodies == [b'<project/>'] * 6
+    assert content.calls == 1
+    assert pool.coalesced == 5
+    # Запросы с другими заголовками - отдельные
+    pool.get(f"{server.url}/a.pom", {'If-None-Match': '"x"'})
+    assert content.calls == 2
+    pool.close()
+
+
+def test_coalesced_requests_share_the_error(local_server):
+    content = SlowContent({}, delay=0.2)
+    server = local_server(content)
+    pool = HttpConnectionPool()
+
+    def get(i):
+        try:
+            pool.get(f"{server.url}/missing.pom")
+        except urllib.error.HTTPError as e:
+            return e.code
+
+    assert run_parallel(4, get) == [404] * 4
+    assert content.calls == 1
+    pool.close()
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=50, burst=2)
+    started = time.monotonic()
+
+    waits = [bucket.acquire() for _ in range(7)]
+
+    # Запас burst проходит сразу, остальные 5 запросов - по одному в 1/50 с
+    assert waits[:2] == [0.0, 0.0] and all(wait > 0 for wait in waits[2:])
+    assert time.monotonic() - started >= 5 / 50 * 0.9
+
+
+def test_unlimited_bucket_and_defer():
+    bucket = TokenBucket(rate=None, burst=1)
+    assert [bucket.acquire() for _ in range(100)] == [0.0] * 100
+
+    bucket.defer(0.1)
+
+    assert 0.05 < bucket.acquire() <= 0.1
+
+
+def test_pool_rate_limit(scripted_server):
+    url, requests = scripted_server([])
+    pool = HttpConnectionPool(rate=20, max_per_host=1)
+
+    for _ in range(4):
+        pool.get(url)
+
+    # Запас - max_per_host запросов, далее интервал 1/20 с
+    gaps = [b - a for a, b in zip(requests, requests[1:])]
+    assert all(gap >= 0.04 for gap in gaps)
+    pool.close()
+
+
+def test_retry_after_is_respected(scripted_server):
+    url, requests = scripted_server([(503, {'Retry-After': '1'})])
+    pool = HttpConnectionPool(retries=2)
+
+    assert pool.get(url).body == b'ok'
+
+    assert len(requests) == 2 and requests[1] - requests[0] >= 0.9
+    assert (pool.retried, pool.throttled) == (1, 1)
+    pool.close()
+
+
+def test_retries_with_backoff_and_gives_up(scripted_server, monkeypatch):
+    monkeypatch.setattr(http_pool, 'BACKOFF_BASE', 0.01)
+    url, requests = scripted_server([(500, {}), (429, {})])
+    pool = HttpConnectionPool(retries=3)
+
+    assert pool.get(url).body == b'ok'
+    assert len(requests) == 3 and pool.retried == 2
+
+    url, requests = scripted_server([(502, {})] * 5)
+    with pytest.raises(urllib.error.HTTPError) as error:
+        pool.get(url)
+    # retries=3: первая попытка и три повтора
+    assert error.value.code == 502 and len(requests) == 4
+    pool.close()
+
+
+def test_parse_retry_after():
+    assert parse_retry_after('5') == 5.0
+    assert parse_retry_after(None) is None and parse_retry_after('soon') is None
+    assert 25 < parse_retry_after(formatdate(time.time() + 30, usegmt=True)) <= 30
+    assert parse_retry_after(formatdate(time.time() - 30, usegmt=True)) == 0.0
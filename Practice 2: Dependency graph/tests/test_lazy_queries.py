@@ -0,0 +1,134 @@
+import contextlib
+import io
+from collections import deque
+
+import pytest
+
+from dependency_graph import DependencyGraph
+from graph_generator import write_repository
+
+
+SHAPES = ('cycles', 'diamond', 'fanout')
+
+
+@pytest.fixture(scope='module')
+def repos(tmp_path_factory):
+    directory = tmp_path_factory.mktemp('repos')
+    result = {}
+    for shape in SHAPES:
+        path = directory / f"{shape}.txt"
+        write_repository(str(path), shape, 2000, degree=3, seed=4)
+        result[shape] = str(path)
+    return result
+
+
+def build(repo, root='N0'):
+    graph = DependencyGraph(repo, test_mode=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        graph.build_graph(root)
+    return graph
+
+
+def query(repo, method, *args, **kwargs):
+    """Запрос на новом графе: (результат, число загруженных узлов)"""
+
+    graph = DependencyGraph(repo, test_mode=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = getattr(graph, method)(*args, **kwargs)
+    return result, graph.fetches
+
+
+def depths(graph, root_id):
+    result = {root_id: 0}
+    queue = deque([root_id])
+    while queue:
+        node = queue.popleft()
+        for child in graph.graph.get(node, []):
+            if child not in result:
+                result[child] = result[node] + 1
+                queue.append(child)
+    return result
+
+
+@pytest.mark.parametrize('shape', SHAPES)
+def test_contains_stops_fetching_early(repos, shape):
+    full = build(repos[shape])
+    distance = depths(full, 'N0:N0:unknown')
+    near = [node for node, depth in distance.items() if depth == 2][:5]
+
+    for target in near:
+        found, fetches = query(repos[shape], 'contains', 'N0', target.split(':')[0])
+        node_id, parent, depth = found
+
+        assert node_id == target and depth == 2
+        assert target in full.graph[parent] and distance[parent] == 1
+        # Найденная зависимость сама не загружается: только корень и часть первого уровня
+        assert fetches <= 1 + len(full.graph['N0:N0:unknown']) < full.fetches
+
+
+def test_missing_dependency_needs_full_traversal(repos):
+    full = build(repos['cycles'])
+
+    found, fetches = query(repos['cycles'], 'contains', 'N0', 'log4j:log4j-core')
+
+    assert found is None and fetches == full.fetches
+
+
+def test_find_dependency_predicate_and_max_depth(repos):
+    found, _ = query(repos['fanout'], 'find_dependency', 'N0', lambda group, artifact, version: group == 'N0')
+    assert found == ('N0:N0:unknown', None, 0)
+
+    distance = depths(build(repos['fanout']), 'N0:N0:unknown')
+    deep = max(distance, key=distance.get)
+    name = deep.split(':')[0]
+    assert query(repos['fanout'], 'contains', 'N0', name, max_depth=distance[deep] - 1)[0] is None
+    assert query(repos['fanout'], 'contains', 'N0', name, max_depth=distance[deep])[0][2] == distance[deep]
+
+
+def test_graph_is_complete_after_early_exit(repos):
+    graph = DependencyGraph(repos['cycles'], test_mode=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        graph.contains('N0', 'N5')
+        graph.build_graph('N0')
+
+    full = build(repos['cycles'])
+    assert dict(graph.graph) == dict(full.graph)
+    assert graph.fetches == full.fetches
+
+
+def is_path(graph, path):
+    return all(child in graph.graph[parent] for parent, child in zip(path, path[1:]))
+
+
+@pytest.mark.parametrize('shape', SHAPES)
+def test_lazy_path_matches_bidirectional_search(repos, shape):
+    full = build(repos[shape])
+    distance = depths(full, 'N0:N0:unknown')
+
+    # N0:N0:1.0.0 (цикл обратно к корню) совпадает по имени с самим корнем
+    for target in [node for node in full.graph if not node.startswith('N0:')][::97]:
+        name = target.split(':')[0]
+        lazy, fetches = query(repos[shape], 'find_paths', 'N0', name)
+        paths = full.find_paths('N0', name, k=3)
+
+        # Граф не построен и k == 1 - ленивый BFS; по построенному графу - k_shortest_paths
+        assert lazy == paths[:1]
+        assert len(lazy[0]) - 1 == distance[target] and is_path(full, lazy[0])
+        assert fetches <= full.fetches
+        assert [len(path) for path in paths] == sorted(len(path) for path in paths)
+        assert len(set(map(tuple, paths))) == len(paths) and all(is_path(full, path) for path in paths)
+
+
+def test_lazy_path_stops_early_and_respects_max_depth(repos):
+    full = build(repos['fanout'])
+    distance = depths(full, 'N0:N0:unknown')
+    near = next(node for node, depth in distance.items() if depth == 2)
+    deep = max(distance, key=distance.get)
+
+    path, fetches = query(repos['fanout'], 'find_paths', 'N0', near.split(':')[0])
+    assert len(path[0]) == 3 and fetches < full.fetches
+
+    name = deep.split(':')[0]
+    assert query(repos['fanout'], 'find_paths', 'N0', name, max_depth=distance[deep] - 1)[0] == []
+    assert query(repos['fanout'], 'find_paths', 'N0', 'absent')[0] == []
+    assert full.find_paths('N0', name, k=2, max_depth=distance[deep] - 1) == []
@@ -0,0 +1,98 @@
+import pytest
+
+from maven_version import ComparableVersion, VersionIndex, is_version_range, parse_range
+
+
+# Порядок из тестов ComparableVersion самого Maven (каждая версия меньше следующей)
+QUALIFIER_ORDER = [
+    "1-alpha2snapshot", "1-alpha2", "1-alpha-123", "1-beta-2", "1-beta123", "1-m2", "1-m11", "1-rc", "1-cr2",
+    "1-rc123", "1-SNAPSHOT", "1", "1-sp", "1-sp2", "1-sp123", "1-abc", "1-def", "1-pom-1", "1-1-snapshot",
+    "1-1", "1-2", "1-123",
+]
+
+NUMBER_ORDER = [
+    "2.0", "2-1", "2.0.a", "2.0.0.a", "2.0.2", "2.0.123", "2.1.0", "2.1-a", "2.1b", "2.1-c", "2.1-1", "2.1.0.1",
+    "2.2", "2.123", "11.a2", "11.a11", "11.b2", "11.b11", "11.m2", "11.m11", "11", "11.a", "11b", "11c", "11m",
+]
+
+# «a», «b», «m» - сокращения alpha, beta, milestone, только если сразу за ними цифра
+EQUAL_GROUPS = [
+    ["1", "1.0", "1.0.0", "1-0", "1-ga", "1-final", "1.0-ga"],
+    ["1a1", "1-a1", "1-alpha-1", "1alpha1"],
+    ["1b2", "1-beta-2", "1-b2"],
+    ["1m3", "1-m3", "1-milestone-3"],
+    ["1cr", "1rc", "1-cr", "1-rc"],
+    ["1X", "1x", "1-x"],
+]
+
+
+@pytest.mark.parametrize('order', [QUALIFIER_ORDER, NUMBER_ORDER], ids=['qualifiers', 'numbers'])
+def test_ordering(order):
+    versions = [ComparableVersion(v) for v in order]
+
+    for i, low in enumerate(versions):
+        for high in versions[i + 1:]:
+            assert low < high, (low, high)
+            assert high > low and low != high
+
+    assert sorted(reversed(versions)) == versions
+
+
+@pytest.mark.parametrize('group', EQUAL_GROUPS, ids=lambda group: group[0])
+def test_equivalent_spellings(group):
+    versions = [ComparableVersion(v) for v in group]
+
+    assert all(v == versions[0] for v in versions)
+    assert len({hash(v) for v in versions}) == 1
+
+
+def test_numeric_segments_are_not_compared_as_text():
+    assert ComparableVersion("1.9") < ComparableVersion("1.10")
+    assert ComparableVersion("1.0.9") < ComparableVersion("1.0.10")
+    assert ComparableVersion("2.0.0-rc1") < ComparableVersion("2.0.0")
+
+
+def test_is_version_range():
+    assert is_version_range("[1.0,2.0)") and is_version_range("(,1.0]")
+    assert not is_version_range("1.0") and not is_version_range(None) and not is_version_range("")
+
+
+@pytest.mark.parametrize('spec, inside, outside', [
+    ("[1.0,2.0)", ["1.0", "1.5", "1.99"], ["0.9", "2.0", "2.1"]),
+    ("(1.0,2.0]", ["1.0.1", "2.0"], ["1.0", "2.0.1"]),
+    ("[1.5]", ["1.5", "1.5.0"], ["1.4", "1.6"]),
+    ("(,1.0]", ["0.1", "1.0"], ["1.0.1"]),
+    ("[1.2,)", ["1.2", "99"], ["1.1"]),
+    ("(,1.0],[1.2,)", ["0.5", "1.0", "1.2", "3"], ["1.1"]),
+])
+def test_range_parsing(spec, inside, outside):
+    restrictions = parse_range(spec)
+
+    def contains(version):
+        return any(r.contains(ComparableVersion(version)) for r in restrictions)
+
+    assert all(contains(v) for v in inside)
+    assert not any(contains(v) for v in outside)
+
+
+@pytest.mark.parametrize('spec', ["1.0", "[1.0", "[1.0,2.0", "(1.0)", "[]", "[1.0],x"])
+def test_invalid_ranges(spec):
+    with pytest.raises(ValueError):
+        parse_range(spec)
+
+
+def test_version_index_selection():
+    index = VersionIndex(["1.10", "1.9", "2.0-SNAPSHOT", "1.2", "2.0-rc1", "1.9", ""])
+
+    assert index.versions() == ["1.2", "1.9", "1.10", "2.0-rc1", "2.0-SNAPSHOT"]
+    assert index.latest() == "2.0-SNAPSHOT"
+    assert index.latest_release() == "2.0-rc1"
+    assert index.resolve(None) == "2.0-rc1"
+    assert index.resolve("[1.0,1.10)") == "1.9"
+    assert index.resolve("[1.0,1.10]") == "1.10"
+    assert index.resolve("(,1.2),[1.3,1.9]") == "1.9"
+    # SNAPSHOT выбирается, только если релиза в диапазоне нет; 2.0-SNAPSHOT < 2.0
+    assert index.resolve("[2.0-rc1,)") == "2.0-rc1"
+    assert index.resolve("[2.0-SNAPSHOT,)") == "2.0-SNAPSHOT"
+    assert index.resolve("[2.0,)") is None
+    assert index.resolve("1.2") == "1.2"
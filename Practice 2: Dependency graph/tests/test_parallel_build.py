@@ -0,0 +1,69 @@
+import contextlib
+import io
+import random
+import time
+
+import pytest
+
+import test_repository
+from conftest import TEST_REPO
+from dependency_graph import DependencyGraph
+from graph_generator import write_repository
+
+
+class ShuffledRepository(test_repository.TestRepository):
+    """Тестовый репозиторий со случайной задержкой ответа: при --jobs потоки
+       завершаются не в порядке уровня BFS"""
+
+    def get_dependencies(self, package_name, version=None):
+        time.sleep(random.Random(package_name).random() / 2000)
+        return super().get_dependencies(package_name, version)
+
+
+@pytest.fixture(scope='module')
+def repos(tmp_path_factory):
+    directory = tmp_path_factory.mktemp('repos')
+    result = {'test': TEST_REPO}
+    for shape in ('cycles', 'diamond'):
+        path = directory / f"{shape}.txt"
+        write_repository(str(path), shape, 400, degree=4, seed=1)
+        result[shape] = str(path)
+    return result
+
+
+def snapshot(repo, roots, jobs, max_depth=None):
+    """Всё, что должно совпадать при любом jobs: порядок выдачи, граф, метаданные, вывод"""
+
+    graph = DependencyGraph(repo, test_mode=True, jobs=jobs)
+    graph.repo_client = ShuffledRepository(repo)
+    order = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for package in roots:
+            order.append([(node, depth, children) for node, depth, children in graph.iter_graph(package, None, max_depth)])
+    trees = []
+    for package in roots:
+        out = io.StringIO()
+        graph.print_graph(package, out=out)
+        trees.append(out.getvalue())
+    return order, list(graph.graph.items()), list(graph.meta.items()), graph.to_dot(), trees
+
+
+@pytest.mark.parametrize('repo, roots', [
+    ('test', ['A', 'H']),
+    ('cycles', ['N0', 'N17']),
+    ('diamond', ['N0', 'N5']),
+])
+@pytest.mark.parametrize('max_depth', [None, 3])
+def test_parallel_build_matches_sequential(repos, repo, roots, max_depth):
+    expected = snapshot(repos[repo], roots, 1, max_depth)
+
+    for jobs in (2, 8):
+        assert snapshot(repos[repo], roots, jobs, max_depth) == expected
+
+
+def test_shared_subtrees_are_fetched_once(repos):
+    graph = DependencyGraph(repos['diamond'], test_mode=True, jobs=8)
+    with contextlib.redirect_stdout(io.StringIO()):
+        graph.build_graphs([('N0', None), ('N5', None)])
+
+    assert graph.fetches == len(graph.graph)
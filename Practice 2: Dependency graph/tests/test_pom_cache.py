@@ -0,0 +1,130 @@
+import os
+import threading
+
+import pytest
+
+from http_pool import HttpConnectionPool
+from pom_cache import PomCache
+from repository_source import RemoteSource
+
+
+POM_PATH = 'org/lib/a/1.0/a-1.0.pom'
+
+
+class CountingContent(dict):
+    """Содержимое сервера, запоминающее запрошенные пути
+
+       Статистика сервера (summary) пишется после отправки ответа и может отстать от клиента."""
+
+    def __init__(self, files):
+        super().__init__(files)
+        self.requested = []
+
+    def get(self, path, default=None):
+        self.requested.append(path)
+        return super().get(path, default)
+
+
+def age(cache, url, mtime):
+    """Время последнего доступа к записи (mtime файла тела) - для проверки LRU"""
+
+    _, body_path = cache._paths(url)
+    os.utime(body_path, (mtime, mtime))
+
+
+def test_entry_round_trip(tmp_path):
+    cache = PomCache(str(tmp_path))
+    cache.put('http://repo/a.pom', b'<project/>', '"abc"', 'Mon, 01 Jan 2024 00:00:00 GMT')
+
+    entry = PomCache(str(tmp_path)).get('http://repo/a.pom')
+
+    assert entry.body == b'<project/>'
+    assert entry.conditional_headers() == {'If-None-Match': '"abc"',
+                                           'If-Modified-Since': 'Mon, 01 Jan 2024 00:00:00 GMT'}
+    assert cache.get('http://repo/other.pom') is None
+
+
+def test_corrupted_entry_is_a_miss(tmp_path):
+    cache = PomCache(str(tmp_path))
+    cache.put('http://repo/a.pom', b'<project/>')
+    _, body_path = cache._paths('http://repo/a.pom')
+    with open(body_path, 'wb') as f:
+        f.write(b'\x1f\x8b\x08\x00garbage')
+
+    assert cache.get('http://repo/a.pom') is None
+
+
+def test_lru_eviction_keeps_recently_used_entries(tmp_path):
+    body = os.urandom(4000)
+    cache = PomCache(str(tmp_path), max_size=10000)
+    cache.put('http://repo/a', body)
+    cache.put('http://repo/b', body)
+    age(cache, 'http://repo/a', 1000)
+    age(cache, 'http://repo/b', 2000)
+    # Обращение к a делает ее самой свежей - вытесняется b
+    assert cache.get('http://repo/a') is not None
+
+    cache.put('http://repo/c', body)
+
+    assert cache.evicted == 1
+    assert cache.get('http://repo/b') is None
+    assert cache.get('http://repo/a').body == body and cache.get('http://repo/c').body == body
+    assert cache.summary()['size_bytes'] == cache._scan_size() <= 10000
+
+
+def test_parallel_gets(tmp_path):
+    cache = PomCache(str(tmp_path))
+    bodies = {f'http://repo/{i}': os.urandom(64) * 100 for i in range(20)}
+    for url, body in bodies.items():
+        cache.put(url, body)
+    errors = []
+
+    def read():
+        for url, body in bodies.items():
+            if cache.get(url).body != body:
+                errors.append(url)
+
+    threads = [threading.Thread(target=read) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+
+
+def test_conditional_revalidation(tmp_path, local_server):
+    content = CountingContent({'/' + POM_PATH: b'<project>1</project>'})
+    server = local_server(content)
+    cache = PomCache(str(tmp_path))
+    source = RemoteSource(server.url, cache, HttpConnectionPool())
+
+    first, etag = source.fetch(POM_PATH)
+    second, _ = source.fetch(POM_PATH)
+
+    # Второй запрос - условный, ответ 304 без тела
+    assert first == second == b'<project>1</project>' and etag
+    assert (cache.misses, cache.revalidated) == (1, 1)
+    assert len(content.requested) == 2
+
+    content['/' + POM_PATH] = b'<project>2</project>'
+    third, new_etag = source.fetch(POM_PATH)
+
+    assert third == b'<project>2</project>' and new_etag != etag
+    assert cache.get(f"{server.url}/{POM_PATH}").body == third
+
+
+def test_offline_mode_uses_only_the_cache(tmp_path, local_server):
+    content = CountingContent({'/' + POM_PATH: b'<project/>'})
+    server = local_server(content)
+    RemoteSource(server.url, PomCache(str(tmp_path)), HttpConnectionPool()).fetch(POM_PATH)
+    offline = PomCache(str(tmp_path), offline=True)
+    source = RemoteSource(server.url, offline, HttpConnectionPool())
+
+    body, _ = source.fetch(POM_PATH)
+    with pytest.raises(ConnectionError):
+        source.fetch('org/lib/b/1.0/b-1.0.pom')
+
+    assert body == b'<project/>'
+    assert (offline.hits, offline.misses) == (1, 1)
+    assert content.requested == ['/' + POM_PATH]
@@ -0,0 +1,102 @@
+import contextlib
+import io
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+import pytest
+
+from conftest import SRC_DIR, TEST_REPO
+from dependency_graph import DependencyGraph
+from graph_generator import write_repository
+from resolver_daemon import ResolverDaemon, DaemonServer, DaemonClient
+
+
+@pytest.fixture
+def socket_path():
+    # Путь к Unix-сокету ограничен ~100 символами - каталог pytest может быть длиннее
+    with tempfile.TemporaryDirectory(prefix='daemon') as tmp:
+        yield os.path.join(tmp, 'd.sock')
+
+
+def make_daemon():
+    return ResolverDaemon(lambda: DependencyGraph(TEST_REPO, test_mode=True))
+
+
+def test_queries_over_socket_and_http(socket_path):
+    daemon = make_daemon()
+    with contextlib.redirect_stdout(io.StringIO()):
+        daemon.warm_up([('A', None)])
+
+    with DaemonServer(daemon, http_port=0, socket_path=socket_path) as server:
+        with DaemonClient(socket_path=socket_path) as client:
+            first = client.query({'op': 'forward', 'root': 'A'})
+            again = client.query({'op': 'forward', 'root': 'A'})
+            reverse = client.query({'op': 'reverse', 'target': 'G:G:1.0.0'})
+            bad = client.query({'op': 'unknown'})
+        with DaemonClient(url=server.url) as client:
+            path = client.query({'op': 'path', 'root': 'A', 'target': 'G:G:1.0.0'})
+
+    assert first['ok'] and not first['cached'] and again['cached']
+    assert again['result'] == first['result']
+    assert len(first['result']['nodes']) == 9
+    assert sorted(reverse['result']['dependents']) == ['A:A:1.0.0', 'A:A:unknown', 'B:B:1.0.0', 'C:C:1.0.0',
+                                                       'D:D:1.0.0', 'F:F:1.0.0', 'H:H:1.0.0']
+    assert not bad['ok'] and 'unknown' in bad['error']
+    assert path['ok'] and path['result']['paths'][0][-1] == 'G:G:1.0.0'
+    assert daemon.errors == 1
+    assert not os.path.exists(socket_path)
+
+
+def start_daemon(repo, package, socket_path):
+    return subprocess.Popen(
+        [sys.executable, '-u', 'cli.py', '-p', package, '--repo', repo, '--test-mode', '--daemon-socket', socket_path],
+        cwd=SRC_DIR, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+
+
+def wait_for(predicate, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+
+
+@pytest.mark.skipif(not hasattr(signal, 'SIGTERM') or os.name != 'posix', reason='нужны сигналы POSIX')
+def test_repeated_sigterm_stops_daemon_cleanly(socket_path):
+    process = start_daemon(TEST_REPO, 'A', socket_path)
+    try:
+        wait_for(lambda: os.path.exists(socket_path))
+
+        # Второй сигнал приходит, пока демон уже останавливается
+        process.send_signal(signal.SIGTERM)
+        time.sleep(0.01)
+        process.send_signal(signal.SIGTERM)
+        output, _ = process.communicate(timeout=30)
+    finally:
+        process.kill()
+
+    assert process.returncode == 0
+    assert "Демон остановлен" in output and "Traceback" not in output
+    assert not os.path.exists(socket_path)
+
+
+@pytest.mark.skipif(not hasattr(signal, 'SIGTERM') or os.name != 'posix', reason='нужны сигналы POSIX')
+def test_sigterm_during_warm_up(socket_path, tmp_path):
+    repo = str(tmp_path / 'chain.txt')
+    write_repository(repo, 'chain', 100000, degree=2)
+    process = start_daemon(repo, 'N0', socket_path)
+    try:
+        for line in process.stdout:
+            if line.startswith("Построение графов"):
+                break
+        process.send_signal(signal.SIGTERM)
+        output, _ = process.communicate(timeout=30)
+    finally:
+        process.kill()
+
+    assert process.returncode == 130
+    assert "Прервано пользователем" in output and "Traceback" not in output
+    assert not os.path.exists(socket_path)
@@ -0,0 +1,110 @@
+import contextlib
+import io
+
+import pytest
+
+from dependency_graph import DependencyGraph
+from test_effective_model import pom
+
+
+OPTIONAL = "<optional>true</optional>"
+EXCLUDE_X = "<exclusions><exclusion><groupId>org.x</groupId><artifactId>*</artifactId></exclusion></exclusions>"
+
+# Артефакты org.t:<имя>:1 и их зависимости (имя, scope, прочее)
+ARTIFACTS = {
+    'app': [('lib', None, EXCLUDE_X), ('junit', 'test'), ('servlet', 'provided'), ('opt', None, OPTIONAL),
+            ('rt', 'runtime')],
+    'lib': [('org.x:bad', None), ('shared', None), ('lib-test', 'test'), ('lib-opt', None, OPTIONAL),
+            ('lib-prov', 'provided')],
+    'shared': [('org.x:deep', None), ('leaf', None)],
+    'rt': [('rt-dep', None)],
+    'junit': [('hamcrest', None)],
+    'other': [('shared', None)],
+}
+LEAVES = ['servlet', 'opt', 'lib-test', 'lib-opt', 'lib-prov', 'leaf', 'rt-dep', 'hamcrest',
+          'org.x:bad', 'org.x:deep']
+
+
+def coordinates(name):
+    return tuple(name.split(':')) if ':' in name else ('org.t', name)
+
+
+def node(name):
+    return ':'.join(coordinates(name)) + ':1'
+
+
+@pytest.fixture(scope='module')
+def repo(tmp_path_factory):
+    """Локальный репозиторий в раскладке Maven"""
+
+    root = tmp_path_factory.mktemp('m2')
+    for name in list(ARTIFACTS) + LEAVES:
+        group, artifact = coordinates(name)
+        dependencies = [coordinates(dep) + ('1',) + tuple(rest) for dep, *rest in ARTIFACTS.get(name, [])]
+        directory = root.joinpath(*group.split('.'), artifact, '1')
+        directory.mkdir(parents=True)
+        (directory / f"{artifact}-1.pom").write_bytes(pom(group, artifact, '1', dependencies=dependencies))
+    return str(root)
+
+
+def build(repo, roots, scopes):
+    graph = DependencyGraph(repo, scopes=scopes)
+    with contextlib.redirect_stdout(io.StringIO()):
+        graph.build_graphs([(f"org.t:{name}", '1') for name in roots])
+    assert not graph.failed
+    return graph
+
+
+def edges(graph, name):
+    return sorted(graph.graph[node(name)])
+
+
+def tree(graph, name):
+    out = io.StringIO()
+    graph.print_graph(f"org.t:{name}", '1', out=out)
+    return out.getvalue()
+
+
+def test_runtime_scopes_prune_before_fetching(repo):
+    graph = build(repo, ['app'], {'compile', 'runtime'})
+
+    # Прямая optional-зависимость корня берется, транзитивные test/provided/optional - нет;
+    # исключение org.x:* из app -> lib действует и на зависимости shared
+    assert edges(graph, 'app') == [node('lib'), node('opt'), node('rt')]
+    assert edges(graph, 'lib') == [node('shared')]
+    assert edges(graph, 'shared') == [node('leaf')]
+    assert edges(graph, 'rt') == [node('rt-dep')]
+    assert sorted(graph.graph) == sorted(map(node, ['app', 'lib', 'opt', 'rt', 'shared', 'leaf', 'rt-dep']))
+    assert graph.fetches == len(graph.graph)
+    assert graph.pruned == 7
+
+
+def test_test_scope_is_not_transitive(repo):
+    graph = build(repo, ['app'], {'compile', 'runtime', 'test'})
+
+    # junit - прямая test-зависимость, hamcrest наследует ее scope; lib-test - транзитивная
+    assert node('junit') in graph.graph[node('app')]
+    assert edges(graph, 'junit') == [node('hamcrest')]
+    assert node('lib-test') not in graph.graph
+
+
+def test_without_scopes_only_exclusions_prune(repo):
+    graph = build(repo, ['app'], None)
+
+    assert len(graph.graph[node('app')]) == 5
+    assert edges(graph, 'lib') == sorted(map(node, ['shared', 'lib-test', 'lib-opt', 'lib-prov']))
+    assert edges(graph, 'shared') == [node('leaf')]
+    assert graph.edge_attributes[(node('app'), node('junit'))] == ('test', False)
+    assert graph.edge_attributes[(node('lib'), node('lib-opt'))] == ('compile', True)
+    assert graph.pruned == 2
+
+
+@pytest.mark.parametrize('roots', [['app', 'other'], ['other', 'app']])
+def test_node_edges_depend_on_context(repo, roots):
+    graph = build(repo, roots, {'compile', 'runtime'})
+
+    # shared раскрывается один раз, но для other (без исключений) у нее есть ребро на org.x:deep
+    assert edges(graph, 'shared') == [node('leaf'), node('org.x:deep')]
+    assert graph.fetches == len(graph.graph)
+    assert node('org.x:deep') not in tree(graph, 'app')
+    assert node('org.x:deep') in tree(graph, 'other')
@@ -0,0 +1,49 @@
+import contextlib
+import io
+
+from conftest import TEST_REPO
+from dependency_graph import DependencyGraph
+import test_repository
+
+
+class CountingRepository(test_repository.TestRepository):
+    """Тестовый репозиторий, считающий разборы списков зависимостей"""
+
+    def __init__(self, file_path):
+        super().__init__(file_path)
+        self.parsed = 0
+
+    def get_dependencies(self, package_name, version=None):
+        self.parsed += 1
+        return super().get_dependencies(package_name, version)
+
+
+def build(snapshot=None):
+    graph = DependencyGraph(TEST_REPO, test_mode=True)
+    graph.repo_client = CountingRepository(TEST_REPO)
+    with contextlib.redirect_stdout(io.StringIO()):
+        if snapshot is not None:
+            graph.load_snapshot(snapshot)
+        graph.build_graph('A')
+    return graph
+
+
+def test_validators_are_not_computed_without_snapshot():
+    graph = build()
+
+    # Один разбор на узел: валидатор без снимка не вычисляется
+    assert graph.repo_client.parsed == len(graph.graph)
+    assert graph.validators is None
+
+
+def test_snapshot_round_trip_revalidates_unchanged_nodes(tmp_path):
+    path = str(tmp_path / 'graph.json')
+    first = build(path)
+    saved = first.save_snapshot(path)
+
+    second = build(path)
+
+    assert saved == len(first.graph)
+    # Корень без версии («latest») не ревалидируется, а разрешается заново
+    assert second.unchanged == saved - 1 and second.changed == 0
+    assert dict(second.graph) == dict(first.graph)
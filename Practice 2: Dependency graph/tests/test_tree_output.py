@@ -0,0 +1,92 @@
+import contextlib
+import io
+import json
+
+import pytest
+
+from conftest import TEST_REPO
+from dependency_graph import DependencyGraph
+
+
+# Вывод исходной (рекурсивной) реализации print_graph на tests/test_repo.txt
+BASELINE_A = """
+Полный граф зависимостей для A:latest:
+------------------------------------------------------------
+A:A:unknown
+   B:B:1.0.0
+      D:D:1.0.0
+         H:H:1.0.0
+            A:A:1.0.0
+               ↳ B:B:1.0.0  (повтор)
+               C:C:1.0.0
+                  F:F:1.0.0
+                     ↳ B:B:1.0.0  (повтор)
+                     G:G:1.0.0
+                  ↳ G:G:1.0.0  (повтор)
+      E:E:1.0.0
+   ↳ C:C:1.0.0  (повтор)
+------------------------------------------------------------
+Всего узлов: 9
+"""
+
+BASELINE_H = """
+Полный граф зависимостей для H:latest:
+------------------------------------------------------------
+H:H:unknown
+   A:A:1.0.0
+      B:B:1.0.0
+         D:D:1.0.0
+            H:H:1.0.0
+               ↳ A:A:1.0.0  (повтор)
+         E:E:1.0.0
+      C:C:1.0.0
+         F:F:1.0.0
+            ↳ B:B:1.0.0  (повтор)
+            G:G:1.0.0
+         ↳ G:G:1.0.0  (повтор)
+------------------------------------------------------------
+Всего узлов: 9
+"""
+
+
+def build(package, **options):
+    graph = DependencyGraph(TEST_REPO, test_mode=True, **options)
+    with contextlib.redirect_stdout(io.StringIO()):
+        graph.build_graph(package)
+    return graph
+
+
+def tree(graph, package):
+    out = io.StringIO()
+    graph.print_graph(package, out=out)
+    return out.getvalue()
+
+
+@pytest.mark.parametrize('options', [{}, {'jobs': 4}, {'compact': True}])
+@pytest.mark.parametrize('package, expected', [('A', BASELINE_A), ('H', BASELINE_H)])
+def test_tree_matches_baseline(package, expected, options):
+    assert tree(build(package, **options), package) == expected
+
+
+def test_lazy_traversal_matches_build():
+    graph = DependencyGraph(TEST_REPO, test_mode=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        order = [node for node, _, _ in graph.iter_graph('A')]
+
+    assert order == ['A:A:unknown', 'B:B:1.0.0', 'C:C:1.0.0', 'D:D:1.0.0', 'E:E:1.0.0',
+                     'F:F:1.0.0', 'G:G:1.0.0', 'H:H:1.0.0', 'A:A:1.0.0']
+    assert tree(graph, 'A') == BASELINE_A
+
+
+def test_json_output_has_every_tree_node():
+    graph = build('A')
+    out = io.StringIO()
+
+    graph.write_graph('json', out)
+
+    document = json.loads(out.getvalue())
+    assert document['roots'] == ['A:A:unknown']
+    assert {node['id']: node['dependencies'] for node in document['nodes']} == {
+        node: list(children) for node, children in graph.graph.items()
+    }
+    assert len(document['nodes']) == 9